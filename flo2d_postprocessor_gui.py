@@ -1,26 +1,86 @@
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-import sys
-import io
 import os
+import contextlib
 from main import batch_process_flo2d, process_flo2d
+from modules.utilities import set_pdf_pool_size
 import shutil
 import threading
 import json
+import queue
+import multiprocessing
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, wait
 from ttkthemes import ThemedStyle
 
 CONFIG_FILE = "config.json"
-
-class RedirectText(io.StringIO):
-    def __init__(self, text_widget):
-        super().__init__()
-        self.text_widget = text_widget
+LOG_DRAIN_INTERVAL_MS = 50  # How often queued output is flushed to the Text widget
+MAX_LOG_LINES = 5000  # Oldest lines are trimmed from the Text widget beyond this count
+SQUEEZE_THRESHOLD = 2000  # Lines longer than this are collapsed into a placeholder
+LOG_CHUNK_SIZE = 65536  # Approximate number of characters inserted into the log per drain tick
+DEFAULT_MAX_WORKERS = 1  # Default number of folders processed in parallel worker processes
+CONFIG_FLUSH_DELAY_MS = 2000  # Delay before pending settings changes are written to disk
+MIN_EPSG_CODE, MAX_EPSG_CODE = 1024, 999999  # Accepted range of EPSG/ESRI coordinate system codes
+
+# Parsed configuration files keyed by (path, modification time)
+_CONFIG_CACHE = {}
+
+# Theme resources are loaded once per Tk root and shared by all GUI instances
+_THEMED_STYLE = None
+
+def get_themed_style(root):
+    """Return the shared 'equilux' ThemedStyle for the given root, creating it on first use."""
+    global _THEMED_STYLE
+    if _THEMED_STYLE is None or _THEMED_STYLE.master is not root:
+        _THEMED_STYLE = ThemedStyle(root)
+        _THEMED_STYLE.set_theme("equilux")  # Set 'equilux' as the exclusive theme
+    return _THEMED_STYLE
+
+def read_config(config_file):
+    """Return the parsed configuration file, reusing the cached copy while the file is unchanged."""
+    key = (config_file, os.stat(config_file).st_mtime_ns)
+    if key not in _CONFIG_CACHE:
+        with open(config_file, 'r') as f:
+            _CONFIG_CACHE[key] = json.load(f)
+    return _CONFIG_CACHE[key]
+
+def invalidate_config_cache(config_file):
+    """Drop all cached copies of the given configuration file."""
+    for key in [key for key in _CONFIG_CACHE if key[0] == config_file]:
+        del _CONFIG_CACHE[key]
+
+class QueueWriter:
+    """Minimal stdout replacement that puts each write on a queue as soon as it arrives."""
+    __slots__ = ('output_queue',)
+
+    def __init__(self, output_queue):
+        self.output_queue = output_queue
 
     def write(self, string):
-        self.text_widget.configure(state='normal')
-        self.text_widget.insert(tk.END, string)
-        self.text_widget.see(tk.END)
-        self.text_widget.configure(state='disabled')
+        if string:
+            self.output_queue.put(string)
+        return len(string)
+
+    def flush(self):
+        pass
+
+def process_folder(file_path, options, output_queue):
+    """
+    Process a single FLO-2D folder in a worker process, streaming its output to output_queue.
+
+    Plotting and logging are not thread-safe, so every folder runs in its own process. Logger
+    output arrives through the log callback and stray print() output through a stdout redirect
+    that is local to the worker process.
+    """
+    def log(message=""):
+        output_queue.put(f"{message}\n")
+
+    with contextlib.redirect_stdout(QueueWriter(output_queue)):
+        log(f"Processing: {file_path}")
+        log("-" * 50)
+        result = process_flo2d(file_path, log=log, **options)
+        log(result)
+        log("\n")
 
 class ToolTip:
     """Tooltip for widgets"""
@@ -69,11 +129,31 @@ class FLO2DPostProcessorGUI:
         self.master.configure(bg="#2E2E2E")
 
         # Initialize ThemedStyle and set to 'equilux'
-        self.style = ThemedStyle(self.master)
-        self.style.set_theme("equilux")  # Set 'equilux' as the exclusive theme
+        self.style = get_themed_style(self.master)
+
+        # Output from the worker thread is queued and drained to the Text widget in batches
+        self.log_queue = queue.Queue()
+        self._squeezed = []  # Full text of log lines collapsed by _insert_log_text
+        self._log_backlog = ''  # Output taken from the queue that did not fit in the last drain tick
+
+        self._folder_set = set()  # Mirrors the folder listbox contents for fast duplicate checks
+
+        # Settings are kept in memory and written to disk by _flush_settings
+        self._config = {}
+        self._config_dirty = False
+        self._flush_scheduled = False
+
+        # A single long-lived worker runs processing jobs so only one run can be active at a time
+        self._job_queue = queue.Queue(maxsize=1)
+        self._busy = threading.Event()
+        self._shutdown = threading.Event()
+        self._worker = threading.Thread(target=self._worker_loop, daemon=True)
+        self._worker.start()
 
         self.create_widgets()
         self.load_settings()
+        self._drain_log()
+        self.master.after_idle(self._validate_folders_async)
 
         # Bind the close event to save settings
         self.master.protocol("WM_DELETE_WINDOW", self.on_close)
@@ -173,17 +253,41 @@ class FLO2DPostProcessorGUI:
         # Customize Text widget with black background and white text
         self.output_text = tk.Text(main_frame, wrap=tk.WORD, width=80, height=15, bg="#000000", fg="#FFFFFF", state='disabled')
         self.output_text.grid(column=0, row=11, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+        self.output_text.tag_configure("squeezed", foreground="#9E9E9E", underline=True)
         ToolTip(self.output_text, "Log output of the processing steps.")
 
         # Progress Bar
-        self.progress = ttk.Progressbar(main_frame, mode='indeterminate')
+        self.progress = ttk.Progressbar(main_frame, mode='determinate')
         self.progress.grid(column=0, row=12, columnspan=2, sticky=(tk.W, tk.E), pady=(10,0))
 
-        # Run Button
-        run_btn = ttk.Button(main_frame, text="Run", command=self.run_process_thread)
-        run_btn.grid(column=1, row=13, sticky=tk.E, pady=(10,0))
+        # Parallel Folders Section
+        workers_frame = ttk.Frame(main_frame)
+        workers_frame.grid(column=0, row=13, sticky=tk.W, pady=(10,0))
+        workers_label = ttk.Label(workers_frame, text="Parallel Folders:")
+        workers_label.grid(column=0, row=0, sticky=tk.W)
+        ToolTip(workers_label, "Number of FLO-2D folders to process at the same time.")
+
+        self.max_workers = tk.IntVar(value=DEFAULT_MAX_WORKERS)
+        self.workers_spinbox = ttk.Spinbox(workers_frame, from_=1, to=os.cpu_count() or 1, width=5, textvariable=self.max_workers)
+        self.workers_spinbox.grid(column=1, row=0, sticky=tk.W, padx=(5,0))
+        ToolTip(self.workers_spinbox, "Enter the number of folders to process in parallel.")
+
+        # Clear and Run Buttons
+        run_buttons_frame = ttk.Frame(main_frame)
+        run_buttons_frame.grid(column=1, row=13, sticky=tk.E, pady=(10,0))
+        clear_btn = ttk.Button(run_buttons_frame, text="Clear", command=self._clear_log)
+        clear_btn.grid(column=0, row=0, sticky=tk.E, padx=(0,5))
+        ToolTip(clear_btn, "Clear the output log.")
+        run_btn = ttk.Button(run_buttons_frame, text="Run", command=self.run_process_thread)
+        run_btn.grid(column=1, row=0, sticky=tk.E)
         ToolTip(run_btn, "Start processing the selected FLO-2D folders.")
 
+        # Widgets that are disabled while processing is running
+        self._stateful_widgets = [
+            self.folder_listbox, add_btn, remove_btn, self.epsg_number, shapefile_cb,
+            shapefile_rb, geopackage_rb, browse_style_btn, self.workers_spinbox, run_btn
+        ]
+
         # Configure grid weights for responsiveness
         main_frame.columnconfigure(0, weight=1)
         main_frame.columnconfigure(1, weight=0)
@@ -192,18 +296,36 @@ class FLO2DPostProcessorGUI:
     def add_folder(self):
         folder_selected = filedialog.askdirectory()
         if folder_selected:
-            if folder_selected not in self.folder_listbox.get(0, tk.END):
+            if folder_selected not in self._folder_set:
                 self.folder_listbox.insert(tk.END, folder_selected)
+                self._folder_set.add(folder_selected)
                 self.save_settings()
             else:
                 messagebox.showinfo("Duplicate Folder", "The selected folder is already in the list.")
 
+    def _validate_folders_async(self):
+        """Check the saved folders off the UI thread and highlight any that no longer exist."""
+        folders = self.folder_listbox.get(0, tk.END)
+
+        def validate():
+            for folder in folders:
+                if not os.path.isdir(folder):
+                    self.master.after(0, lambda folder=folder: self._mark_missing_folder(folder))
+
+        threading.Thread(target=validate, daemon=True).start()
+
+    def _mark_missing_folder(self, folder):
+        folders = self.folder_listbox.get(0, tk.END)
+        if folder in folders:
+            self.folder_listbox.itemconfig(folders.index(folder), fg='red')
+
     def remove_folder(self):
         selected_indices = self.folder_listbox.curselection()
         if not selected_indices:
             messagebox.showwarning("No Selection", "Please select at least one folder to remove.")
             return
         for index in reversed(selected_indices):
+            self._folder_set.discard(self.folder_listbox.get(index))
             self.folder_listbox.delete(index)
         self.save_settings()
 
@@ -217,78 +339,228 @@ class FLO2DPostProcessorGUI:
             self.save_settings()
 
     def run_process_thread(self):
+        if self._busy.is_set():
+            messagebox.showinfo("Processing Running", "Please wait for the current run to finish.")
+            return
+
         # Validate inputs before starting
         if not self.folder_listbox.size():
             messagebox.showerror("No Folders", "Please add at least one FLO-2D folder to process.")
             return
+        # Folders that no longer exist are skipped for this run; the rest are still processed
+        folders = self.folder_listbox.get(0, tk.END)
+        file_paths = [folder for folder in folders if os.path.isdir(folder)]
+        missing_folders = [folder for folder in folders if folder not in file_paths]
+        if not file_paths:
+            messagebox.showerror("Missing Folders", "None of the listed folders exist:\n" + "\n".join(missing_folders))
+            return
+        if missing_folders:
+            messagebox.showwarning("Missing Folders", "The following folders do not exist and will be skipped:\n" + "\n".join(missing_folders))
+            for folder in missing_folders:
+                self._mark_missing_folder(folder)
         epsg = self.epsg_number.get()
         if not epsg.isdigit():
             messagebox.showerror("Invalid EPSG", "Please enter a valid integer for the EPSG number.")
             return
+        epsg_int = int(epsg)
+        if not MIN_EPSG_CODE <= epsg_int <= MAX_EPSG_CODE:
+            messagebox.showerror("Invalid EPSG", f"EPSG numbers must be between {MIN_EPSG_CODE} and {MAX_EPSG_CODE}.")
+            return
         style_folder = self.style_folder.get()
         if style_folder and not os.path.isdir(style_folder):
             messagebox.showerror("Invalid Style Folder", "The specified style files folder does not exist.")
             return
+        max_workers = self._get_max_workers()
+        if not max_workers:
+            messagebox.showerror("Invalid Parallel Folders", "Please enter a positive integer for the number of parallel folders.")
+            return
 
-        # Disable run button and input widgets that support 'state'
-        self.set_widgets_state(main_frame=self.master, state='disabled')
+        # Tk variables and widgets are read here on the main thread; the worker only gets plain values
+        options = dict(
+            coord_system=epsg_int,
+            create_flo2d_points=self.create_shapefile.get(),
+            verbose=True,
+            style_folder=style_folder,
+            output_format=self.output_format.get()  # Pass output format
+        )
 
-        # Start progress bar
-        self.progress.start()
+        # Start each run with an empty log
+        self._clear_log()
 
-        # Run processing in a separate thread to keep GUI responsive
-        threading.Thread(target=self.run_process, daemon=True).start()
+        # Disable run button and input widgets that support 'state'
+        self.set_widgets_state(state='disabled')
 
-    def run_process(self):
-        self.output_text.configure(state='normal')
-        self.output_text.delete('1.0', tk.END)
-        self.output_text.configure(state='disabled')
+        # Reset progress bar; it advances by one step per completed folder
+        self.progress.configure(maximum=len(file_paths), value=0)
 
-        old_stdout = sys.stdout
-        sys.stdout = RedirectText(self.output_text)
+        # Hand the run to the background worker to keep GUI responsive
+        self._busy.set()
+        try:
+            self._job_queue.put_nowait(partial(self.run_process, file_paths, options, max_workers))
+        except queue.Full:
+            self._busy.clear()
+            self.set_widgets_state(state='normal')
+            messagebox.showinfo("Processing Running", "Please wait for the current run to finish.")
+
+    def _worker_loop(self):
+        """Run queued jobs one at a time until a None job or the shutdown event is received."""
+        while not self._shutdown.is_set():
+            job = self._job_queue.get()
+            if job is None:
+                break
+            try:
+                job()
+            finally:
+                self._busy.clear()
 
+    def _get_max_workers(self):
+        """Return the parallel folder count, or None if the entered value is not a positive integer."""
         try:
-            file_paths = list(self.folder_listbox.get(0, tk.END))
-            for file_path in file_paths:
-                print(f"Processing: {file_path}")
-                print("-" * 50)
-                result = process_flo2d(
-                    file_path,
-                    int(self.epsg_number.get()),
-                    self.create_shapefile.get(),
-                    verbose=True,
-                    style_folder=self.style_folder.get(),
-                    output_format=self.output_format.get()  # Pass output format
-                )
-                print(result)
-                print("\n")
-            
+            max_workers = self.max_workers.get()
+        except tk.TclError:
+            return None
+        return max_workers if max_workers >= 1 else None
+
+    def run_process(self, file_paths, options, max_workers):
+        """Process the folders on the background worker; Tk is only touched through master.after."""
+        try:
+            # Process folders in worker processes; their output is forwarded to the log while they run
+            max_workers = min(max_workers, len(file_paths))
+            with multiprocessing.Manager() as manager, ProcessPoolExecutor(max_workers=max_workers, initializer=set_pdf_pool_size, initargs=(max_workers,)) as executor:
+                output_queue = manager.Queue()
+                pending = {executor.submit(process_folder, file_path, options, output_queue)
+                           for file_path in file_paths}
+                completed = 0
+                while pending:
+                    done, pending = wait(pending, timeout=LOG_DRAIN_INTERVAL_MS / 1000)
+                    self._forward_output(output_queue)
+                    for future in done:
+                        future.result()
+                        # Progress is set explicitly because Progressbar.step() wraps to 0 at the maximum
+                        completed += 1
+                        self.master.after(0, lambda completed=completed: self.progress.configure(value=completed))
+
             # Final completion message
             completion_message = "\n" + "=" * 50 + "\n"
             completion_message += "All FLO-2D folders processed successfully\n"
             completion_message += "=" * 50 + "\n"
-            print(completion_message)
+            self.log_queue.put(completion_message + "\n")
         except Exception as e:
-            print(f"An error occurred: {str(e)}")
-            messagebox.showerror("Processing Error", f"An error occurred during processing:\n{str(e)}")
+            self.log_queue.put(f"An error occurred: {str(e)}\n")
+            message = f"An error occurred during processing:\n{str(e)}"
+            self.master.after(0, lambda: messagebox.showerror("Processing Error", message))
         finally:
-            sys.stdout = old_stdout
-            self.progress.stop()
-            self.set_widgets_state(main_frame=self.master, state='normal')
-
-    def set_widgets_state(self, main_frame, state):
-        """Recursively set the state of widgets that support the 'state' option."""
-        for child in main_frame.winfo_children():
-            # Skip frames
-            if isinstance(child, ttk.Frame):
-                self.set_widgets_state(child, state)
+            self.master.after(0, lambda: self.set_widgets_state(state='normal'))
+
+    def _forward_output(self, output_queue):
+        """Move everything the worker processes have written so far onto the log queue."""
+        try:
+            while True:
+                self.log_queue.put(output_queue.get_nowait())
+        except queue.Empty:
+            pass
+
+    def _drain_log(self):
+        """Flush pending output from the log queue into the Text widget with a single insert."""
+        # Take at most LOG_CHUNK_SIZE characters per tick; the rest waits for the next tick
+        chunks = [self._log_backlog] if self._log_backlog else []
+        size = len(self._log_backlog)
+        try:
+            while size < LOG_CHUNK_SIZE:
+                chunk = self.log_queue.get_nowait()
+                chunks.append(chunk)
+                size += len(chunk)
+        except queue.Empty:
+            pass
+
+        text = ''.join(chunks)
+        self._log_backlog = ''
+        if len(text) > LOG_CHUNK_SIZE:
+            # Split on a line boundary where possible and keep the remainder for the next tick
+            end = text.rfind('\n', 0, LOG_CHUNK_SIZE) + 1 or LOG_CHUNK_SIZE
+            text, self._log_backlog = text[:end], text[end:]
+
+        if text:
+            # Only autoscroll if the user has not scrolled away from the bottom
+            at_bottom = self.output_text.yview()[1] > 0.999
+
+            # Enable editing once for the whole batch of inserts and deletes
+            self.output_text.configure(state='normal')
+            self._insert_log_text(text)
+
+            # Trim only the overflow so the widget behaves as a ring buffer
+            line_count = int(self.output_text.index('end-1c').split('.')[0])
+            if line_count > 2 * MAX_LOG_LINES:
+                # A burst this large makes the existing content worthless; start afresh
+                self.output_text.delete('1.0', tk.END)
+            elif line_count > MAX_LOG_LINES:
+                self.output_text.delete('1.0', f'{line_count - MAX_LOG_LINES}.0')
+
+            self.output_text.configure(state='disabled')
+            if at_bottom:
+                self.output_text.see(tk.END)
+
+            # Redraw once per batch; update() is avoided to prevent re-entrant event handling
+            self.master.update_idletasks()
+
+        self.master.after(LOG_DRAIN_INTERVAL_MS, self._drain_log)
+
+    def _clear_log(self):
+        """Discard pending queued output and empty the output log."""
+        try:
+            while True:
+                self.log_queue.get_nowait()
+        except queue.Empty:
+            pass
+        self._log_backlog = ''
+
+        self._squeezed.clear()
+        self.output_text.configure(state='normal')
+        self.output_text.delete('1.0', tk.END)
+        self.output_text.configure(state='disabled')
+
+    def _insert_log_text(self, text):
+        """Insert text at the end of the log, replacing very long lines with a clickable placeholder."""
+        if len(text) <= SQUEEZE_THRESHOLD:
+            self.output_text.insert(tk.END, text)
+            return
+
+        pending = []
+        for line in text.splitlines(keepends=True):
+            if len(line) <= SQUEEZE_THRESHOLD:
+                pending.append(line)
                 continue
-            # Check if widget has 'state' option
-            try:
-                child.configure(state=state)
-            except tk.TclError:
-                # Widget does not support 'state' option
-                pass
+
+            if pending:
+                self.output_text.insert(tk.END, ''.join(pending))
+                pending = []
+
+            index = len(self._squeezed)
+            self._squeezed.append(line)
+            tag = f"squeezed_{index}"
+            placeholder = f"<squeezed {len(line)} chars - double-click to view>"
+            if line.endswith('\n'):
+                placeholder += '\n'
+            self.output_text.insert(tk.END, placeholder, ("squeezed", tag))
+            self.output_text.tag_bind(tag, "<Double-Button-1>", lambda event, i=index: self._show_squeezed(i))
+
+        if pending:
+            self.output_text.insert(tk.END, ''.join(pending))
+
+    def _show_squeezed(self, index):
+        """Display the full text of a squeezed log line in a separate window."""
+        window = tk.Toplevel(self.master)
+        window.title("Squeezed Output")
+        window.configure(bg="#2E2E2E")
+        text = tk.Text(window, wrap=tk.WORD, width=100, height=30, bg="#000000", fg="#FFFFFF")
+        text.pack(fill=tk.BOTH, expand=True)
+        text.insert('1.0', self._squeezed[index])
+        text.configure(state='disabled')
+
+    def set_widgets_state(self, state):
+        """Set the state of the input widgets collected in create_widgets."""
+        for widget in self._stateful_widgets:
+            widget.configure(state=state)
 
     def load_settings(self):
         """Load settings from the configuration file."""
@@ -296,14 +568,15 @@ class FLO2DPostProcessorGUI:
             return  # No settings to load
 
         try:
-            with open(CONFIG_FILE, 'r') as f:
-                config = json.load(f)
+            config = read_config(CONFIG_FILE)
             
             # Load FLO-2D Folders
+            # Folders are checked for existence in the background by _validate_folders_async
             folders = config.get("flo2d_folders", [])
-            for folder in folders:
-                if os.path.isdir(folder):
-                    self.folder_listbox.insert(tk.END, folder)
+            folders = [folder for folder in dict.fromkeys(folders) if folder not in self._folder_set]
+            if folders:
+                self.folder_listbox.insert(tk.END, *folders)
+                self._folder_set.update(folders)
             
             # Load EPSG Number
             epsg = config.get("epsg_number", "")
@@ -322,28 +595,58 @@ class FLO2DPostProcessorGUI:
             # Load Output Format
             output_format = config.get("output_format", "Shapefile")
             self.output_format.set(output_format)
+
+            # Load Parallel Folders
+            max_workers = config.get("max_workers", DEFAULT_MAX_WORKERS)
+            self.max_workers.set(max_workers)
             
         except Exception as e:
             messagebox.showwarning("Load Settings", f"Failed to load settings:\n{str(e)}")
 
     def save_settings(self):
-        """Save current settings to the configuration file."""
-        config = {
+        """Update the in-memory settings and schedule a deferred write to the configuration file."""
+        self._config = {
             "flo2d_folders": list(self.folder_listbox.get(0, tk.END)),
             "epsg_number": self.epsg_number.get(),
             "create_flo2d_points": self.create_shapefile.get(),
             "style_folder": self.style_folder.get(),
-            "output_format": self.output_format.get()  # Save output format
+            "output_format": self.output_format.get(),  # Save output format
+            "max_workers": self._get_max_workers() or DEFAULT_MAX_WORKERS
         }
+        self._config_dirty = True
+
+        # Coalesce bursts of changes into a single write
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.master.after(CONFIG_FLUSH_DELAY_MS, self._flush_settings)
+
+    def _flush_settings(self):
+        """Atomically write the in-memory settings to the configuration file if they have changed."""
+        self._flush_scheduled = False
+        if not self._config_dirty:
+            return
+
+        tmp_file = CONFIG_FILE + ".tmp"
         try:
-            with open(CONFIG_FILE, 'w') as f:
-                json.dump(config, f, indent=4)
+            with open(tmp_file, 'w') as f:
+                json.dump(self._config, f, indent=4)
+            os.replace(tmp_file, CONFIG_FILE)
+            invalidate_config_cache(CONFIG_FILE)
+            self._config_dirty = False
         except Exception as e:
             messagebox.showwarning("Save Settings", f"Failed to save settings:\n{str(e)}")
 
     def on_close(self):
         """Handle the window close event."""
         self.save_settings()
+        self._flush_settings()
+
+        # Stop the background worker once its current job (if any) finishes
+        self._shutdown.set()
+        try:
+            self._job_queue.put_nowait(None)
+        except queue.Full:
+            pass
         self.master.destroy()
 
 def main():
@@ -1,34 +1,44 @@
 # main.py
 
 import os
-import pandas as pd
+import sys
 import time
+import tempfile
+import contextlib
 import argparse
+import hashlib
 import logging
 import shutil
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+# Modules for optional inputs (inflow, cross sections, structures, rain, SWMM) are imported
+# inside their processing steps so projects without those files never load them
 from modules.data_extraction import extractModelDataToDF, extract_super_data  # Import the new function
-from modules.hycross_extraction import extract_fpxsec_results
 from modules.geospatial import convertToGeoDataFrame, calculate_cell_size
-from modules.rasterization import create_raster_from_gdf
-from modules.vectorization import convert_gdf_to_shapefile
-from modules.fpxsec_vectorization import create_fpxsec_shapefile
-from modules.utilities import create_required_folders
-from modules.hystruc_vectorization import create_hystruc_shapefile
-from modules.hystruc_extraction import extract_hystruc_results
-from modules.hystruc_spreadsheet import hystruc_spreadsheet_and_plots, create_rating_curve_spreadsheet, plot_rating_curves_to_pdf
-from modules.fpxsec_spreadsheet import hycross_spreadsheet_and_plots
-from modules.hydrostruct_spreadsheet import hydrostruct_spreadsheet_and_plots, parse_hydrograph_data
-from modules.rain_spreadsheet import rain_spreadsheet_and_plot
-from modules.swmm_extraction import extract_swmm_data, create_swmm_shapefiles
+from modules.rasterization import compute_raster_grid, compute_raster_array, write_raster
+from modules.utilities import create_required_folders, set_pdf_pool_size
 from modules.arf_extraction import extract_area_reduction_factors, merge_arf_with_model_data
-from modules.swmm_inlets_spreadsheets import swmm_inlet_spreadsheets_and_pdf
-from modules.inflow_extraction import extract_inflow_hydrographs
-from modules.inflow_spreadsheets import create_pdf_plots, export_hydrograph_to_excel
-from modules.swmm_rating_tables_extraction import extract_swmm_rating_tables
-from modules.swmm_rating_tables_spreadsheet import swmm_rating_tables_and_plots
 from modules.evacuatedfp_extraction import extract_evacuatedfp_data  # Add this import
 from modules.time_out_extraction import extract_time_out_data  # Add this import
 import geopandas as gpd  # Ensure geopandas is imported
+from pyproj import CRS
+
+# Write vector files through pyogrio's vectorized GDAL bindings rather than Fiona's per-feature loop
+gpd.options.io_engine = "pyogrio"
+
+# Arrow-based writes are only possible when pyarrow is installed
+try:
+    import pyarrow  # noqa: F401
+    USE_ARROW = True
+except ImportError:
+    USE_ARROW = False
+
+# Small inputs read up front on background threads, overlapping model data extraction
+PREFETCH_FILES = ['ARF.DAT', 'SUPER.OUT', 'EVACUATEDFP.OUT', 'TIME.OUT']
+PREFETCH_MAX_SIZE = 64 * 1024 * 1024  # Larger files are not held in memory whole
+
+# Model GeoDataFrames are cached per project in the user's cache directory so repeat runs can skip
+# extraction (needs pyarrow for Parquet); nothing is written to the project folder
+GEO_DF_CACHE_VERSION = 4
 
 class TimingLogger:
     """
@@ -36,23 +46,39 @@ class TimingLogger:
     """
     def __init__(self, logger):
         self.logger = logger
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         self.last_log_time = self.start_time
 
-    def log(self, message):
-        current_time = time.time()
+    def log(self, message, *args):
+        # Like logger.info, message is a %-format string and args are only merged in if the record is emitted
+        current_time = time.perf_counter()
         elapsed = current_time - self.last_log_time
         total_elapsed = current_time - self.start_time
-        self.logger.info(f"{message} (Step Duration: {elapsed:.2f} seconds, Total Elapsed: {total_elapsed:.2f} seconds)")
+        self.logger.info(message + " (Step Duration: %.2f seconds, Total Elapsed: %.2f seconds)", *args, elapsed, total_elapsed)
         self.last_log_time = current_time
 
-def setup_logger(level=logging.INFO, log_file=None):
+class CallbackHandler(logging.Handler):
+    """
+    A logging handler that passes each formatted record to a callback such as a GUI log.
+    """
+    def __init__(self, callback):
+        super().__init__()
+        self.callback = callback
+
+    def emit(self, record):
+        try:
+            self.callback(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+def setup_logger(level=logging.INFO, log_file=None, log=None):
     """
     Sets up the logger with the specified level and log file.
 
     Args:
         level (int): Logging level.
         log_file (str): Path to the log file.
+        log (callable): Receives each formatted message in place of the console handler.
 
     Returns:
         logging.Logger: Configured logger instance.
@@ -65,8 +91,8 @@ def setup_logger(level=logging.INFO, log_file=None):
     if logger.hasHandlers():
         logger.handlers.clear()
 
-    # Console Handler
-    console_handler = logging.StreamHandler()
+    # Console Handler, or the caller's log callback when one is given
+    console_handler = logging.StreamHandler() if log is None else CallbackHandler(log)
     console_handler.setFormatter(formatter)
     logger.addHandler(console_handler)
 
@@ -76,13 +102,161 @@ def setup_logger(level=logging.INFO, log_file=None):
             file_handler = logging.FileHandler(log_file)
             file_handler.setFormatter(formatter)
             logger.addHandler(file_handler)
-            logger.debug(f"Logging initialized. Logs will be saved to: {log_file}")
+            logger.debug("Logging initialized. Logs will be saved to: %s", log_file)
         except IOError as e:
-            logger.warning(f"Unable to create log file at {log_file}. Logging will continue on console only. Error: {e}")
+            logger.warning("Unable to create log file at %s. Logging will continue on console only. Error: %s", log_file, e)
 
     return logger
 
-def process_flo2d(file_path, coord_system, create_flo2d_points, verbose=False, log_file=None, style_folder=None, output_format="Shapefile"):
+def extract_super_out_data(super_out_file, content=None):
+    """Adapts extract_super_data, which takes the project directory, to the OUT_SPECS file-path signature."""
+    return extract_super_data(os.path.dirname(super_out_file), content=content)
+
+# (OUT file name, extractor taking the OUT file path and optional contents, output columns besides grid_id and geometry, output name)
+OUT_SPECS = [
+    ("SUPER.OUT", extract_super_out_data, ['max_froude_no', 'depth_super', 'time_super', 'num_supercritical_timesteps'], "super_out_points"),
+    ("EVACUATEDFP.OUT", extract_evacuatedfp_data, ['num_evacuations'], "evacuatedfp_out_points"),
+    ("TIME.OUT", extract_time_out_data, ['num_time_decrements'], "time_out_points"),
+]
+
+def process_out_file(spec, file_path, geo_points, shp_outpath, output_format, driver, ext, timing_logger, logger, content=None):
+    """
+    Extracts one per-cell OUT file, joins it to the grid geometry and writes it as points.
+
+    Args:
+        spec (tuple): Entry from OUT_SPECS describing the OUT file.
+        file_path (str): Path to the FLO-2D project directory.
+        geo_points (geopandas.GeoSeries): Grid geometry indexed by grid_id.
+        shp_outpath (str): Directory the points output is written to.
+        output_format (str): Desired output format ("Shapefile" or "GeoPackage").
+        driver (str): OGR driver name for output_format.
+        ext (str): File extension for output_format, including the dot.
+        timing_logger (TimingLogger): Step timing logger.
+        logger (logging.Logger): Logger instance.
+        content (bytes): OUT file contents already read from disk, if available.
+    """
+    out_name, extractor, data_columns, output_name = spec
+
+    timing_logger.log("Extracting data from %s", out_name)
+    out_data = extractor(os.path.join(file_path, out_name), content=content)
+    timing_logger.log("%s data extraction completed", out_name)
+
+    # Look up each cell's row position in the shared grid_id index; cells missing from the grid are dropped
+    positions = geo_points.index.get_indexer(out_data['grid_id'])
+    matched = positions >= 0
+    out_data = out_data.loc[matched, ['grid_id'] + data_columns].reset_index(drop=True)
+
+    # Take the matching geometries by position and attach them alongside the OUT columns
+    out_geo_df = gpd.GeoDataFrame(out_data, geometry=geo_points.values.take(positions[matched]), crs=geo_points.crs)
+    logger.debug("%s columns after join: %s", output_name, out_geo_df.columns.tolist())
+
+    # Create a points shapefile or GeoPackage for the OUT data
+    output_file = os.path.join(shp_outpath, f'{output_name}{ext}')
+    try:
+        out_geo_df.to_file(output_file, driver=driver, engine="pyogrio", use_arrow=USE_ARROW and driver == "GPKG")
+        timing_logger.log("%s Points %s created at: %s", out_name, output_format, output_file)
+    except Exception as e:
+        logger.error("Failed to create %s Points %s: %s", out_name, output_format, e)
+
+def read_file_bytes(file_path):
+    """Reads a whole file as bytes; used to prefetch small inputs on a worker thread."""
+    with open(file_path, 'rb') as file:
+        return file.read()
+
+def prefetched_content(prefetched, file_name):
+    """Returns the prefetched bytes of a file, or None when it was not prefetched and must be read by its parser."""
+    future = prefetched.get(file_name)
+    return future.result() if future is not None else None
+
+def scan_project_files(file_path):
+    """
+    Takes a one-time snapshot of the files in a FLO-2D project directory.
+
+    Args:
+        file_path (str): Path to the FLO-2D project directory.
+
+    Returns:
+        dict: File sizes in bytes keyed by file name, case-normalized for the current platform.
+    """
+    with os.scandir(file_path) as entries:
+        return {os.path.normcase(entry.name): entry.stat().st_size for entry in entries if entry.is_file()}
+
+def has_project_file(project_files, file_name):
+    """Checks a snapshot from scan_project_files for a non-empty file, matching case the way the filesystem does."""
+    return project_files.get(os.path.normcase(file_name), 0) > 0
+
+def geo_df_cache_root():
+    """Returns the per-user directory that holds the model GeoDataFrame caches."""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or os.path.expanduser(os.path.join('~', 'AppData', 'Local'))
+    elif sys.platform == 'darwin':
+        base = os.path.expanduser(os.path.join('~', 'Library', 'Caches'))
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.expanduser(os.path.join('~', '.cache'))
+    return os.path.join(base, 'flo2d_postprocessor', 'geodf')
+
+def geo_df_cache_path(file_path):
+    """
+    Builds the cache file path for a project's model GeoDataFrame.
+
+    Each project gets its own subdirectory of geo_df_cache_root(), keyed by its absolute path.
+    The file key hashes the name, size and modification time of every .DAT and .OUT file,
+    so editing or re-running the model invalidates the cache.
+
+    Args:
+        file_path (str): Path to the FLO-2D project directory.
+
+    Returns:
+        str: Path to the Parquet cache file for the current inputs.
+    """
+    with os.scandir(file_path) as entries:
+        stamps = sorted(
+            (entry.name, entry.stat().st_size, entry.stat().st_mtime_ns)
+            for entry in entries
+            if entry.is_file() and entry.name.upper().endswith(('.DAT', '.OUT'))
+        )
+    key = hashlib.sha1(repr((GEO_DF_CACHE_VERSION, stamps)).encode()).hexdigest()
+    project_key = hashlib.sha1(os.path.normcase(os.path.abspath(file_path)).encode()).hexdigest()
+    return os.path.join(geo_df_cache_root(), project_key, f'{key}.parquet')
+
+def load_cached_geo_df(cache_file, logger):
+    """Reads a cached model GeoDataFrame, returning None when it is missing or unreadable."""
+    if not os.path.exists(cache_file):
+        return None
+    try:
+        return gpd.read_parquet(cache_file)
+    except Exception as e:
+        logger.warning("Failed to read GeoDataFrame cache %s. Rebuilding it. Error: %s", cache_file, e)
+        return None
+
+def save_cached_geo_df(geo_df, cache_file, logger):
+    """Writes the model GeoDataFrame cache atomically and removes this project's caches for older inputs."""
+    cache_dir = os.path.dirname(cache_file)
+    temp_file = None
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        # A uniquely named temp file keeps concurrent runs from writing over each other's partial caches
+        fd, temp_file = tempfile.mkstemp(suffix='.tmp', dir=cache_dir)
+        os.close(fd)
+        geo_df.to_parquet(temp_file)
+        os.replace(temp_file, cache_file)
+        temp_file = None
+
+        # Only finished caches are stale; .tmp files belong to runs that are still writing
+        with os.scandir(cache_dir) as entries:
+            stale_files = [entry.path for entry in entries
+                           if entry.name.endswith('.parquet') and entry.path != cache_file]
+        for stale_file in stale_files:
+            with contextlib.suppress(FileNotFoundError):  # Another run may have removed it first
+                os.remove(stale_file)
+    except Exception as e:
+        logger.warning("Failed to write GeoDataFrame cache %s. Error: %s", cache_file, e)
+    finally:
+        if temp_file is not None:
+            with contextlib.suppress(OSError):
+                os.remove(temp_file)
+
+def process_flo2d(file_path, coord_system, create_flo2d_points, verbose=False, log_file=None, style_folder=None, output_format="Shapefile", log=None, use_cache=True):
     """
     Processes a single FLO-2D project directory.
 
@@ -94,6 +268,8 @@ def process_flo2d(file_path, coord_system, create_flo2d_points, verbose=False, l
         log_file (str): Path to the log file.
         style_folder (str): Path to the folder containing style files.
         output_format (str): Desired output format ("Shapefile" or "GeoPackage").
+        log (callable): Receives the progress and timing messages instead of the console (default: None).
+        use_cache (bool): Reuse the cached model GeoDataFrame when the inputs are unchanged (default: True).
 
     Returns:
         str: Status message upon completion.
@@ -103,9 +279,12 @@ def process_flo2d(file_path, coord_system, create_flo2d_points, verbose=False, l
         log_file = os.path.join(file_path, "flo2d_postprocessor.log")
 
     # Initialize logging
-    logger = setup_logger(level=logging.DEBUG if verbose else logging.INFO, log_file=log_file)
+    logger = setup_logger(level=logging.DEBUG if verbose else logging.INFO, log_file=log_file, log=log)
     timing_logger = TimingLogger(logger)
 
+    # Resolve the vector driver and extension once for every OUT-file output
+    driver, ext = ("ESRI Shapefile", ".shp") if output_format == "Shapefile" else ("GPKG", ".gpkg")
+
     # Define output directories
     raster_outpath = os.path.join(file_path, 'flo2d_rasters')
     shp_outpath = os.path.join(file_path, 'flo2d_shp')
@@ -113,252 +292,198 @@ def process_flo2d(file_path, coord_system, create_flo2d_points, verbose=False, l
     output_folders = [raster_outpath, shp_outpath, plots_outpath]
 
     logger.info("=== FLO-2D Postprocessor Started ===")
-    logger.info(f"Project Directory: {file_path}")
-    logger.info(f"Coordinate System: EPSG:{coord_system}")
+    logger.info("Project Directory: %s", file_path)
+    logger.info("Coordinate System: EPSG:%s", coord_system)
     if style_folder:
-        logger.info(f"Style Files Directory: {style_folder}")
+        logger.info("Style Files Directory: %s", style_folder)
     else:
         logger.info("No Style Files Directory provided.")
 
-    # Step 1: Create required output directories
-    timing_logger.log("Creating necessary output directories")
-    create_required_folders(output_folders)
-    timing_logger.log("Output directories successfully created")
-
-    # Step 2: Extract model data
-    timing_logger.log("Extracting model data from FLO-2D files")
-    model_data = extractModelDataToDF(file_path)
-    fpxsec_grids = model_data[pd.notna(model_data['fpxsec'])]
-    timing_logger.log("Model data extraction completed")
-
-    # Step 3: Extract Area Reduction Factors (ARF)
-    arf_file = os.path.join(file_path, 'ARF.DAT')
-    if os.path.exists(arf_file):
-        timing_logger.log("Extracting Area Reduction Factors (ARF)")
-        arf_df = extract_area_reduction_factors(arf_file)
-        model_data = merge_arf_with_model_data(model_data, arf_df)
-        timing_logger.log("ARF data successfully merged with model data")
-    else:
-        logger.warning(f"ARF file not found at {arf_file}. Skipping ARF extraction.")
-
-    # Step 4: Convert DataFrame to GeoDataFrame
-    timing_logger.log("Converting model data to GeoDataFrame for spatial processing")
-    geo_df = convertToGeoDataFrame(model_data)
-    timing_logger.log("Conversion to GeoDataFrame completed")
-
-    # Step 5: Create FLO-2D Points Output (Shapefile or GeoPackage)
-    if create_flo2d_points:
-        timing_logger.log("Initiating creation of FLO-2D Points Output")
-
-        if 'flow_direction' not in geo_df.columns:
-            logger.error("'flow_direction' column is missing in the GeoDataFrame. Output creation aborted.")
-        else:
-            geo_df_subset = geo_df[['grid_id', 'flow_direction', 'geometry']]
-
-            gpkg_file = os.path.join(shp_outpath, 'flow_direction.gpkg')
-            try:
-                geo_df_subset.to_file(gpkg_file, driver="GPKG", crs=f"EPSG:{coord_system}")
-                timing_logger.log(f"FLO-2D Points GeoPackage created at: {gpkg_file}")
-            except Exception as e:
-                logger.error(f"Failed to create GeoPackage: {str(e)}")
-
-    # Step 6: Extract and Process SUPER.OUT Data
-    super_out_file = os.path.join(file_path, 'SUPER.OUT')
-    if os.path.exists(super_out_file):
-        timing_logger.log("Extracting data from SUPER.OUT")
-        super_data = extract_super_data(file_path)
-        timing_logger.log("SUPER.OUT data extraction completed")
-
-        # Ensure grid_id is of the same type in both DataFrames
-        super_data['grid_id'] = super_data['grid_id'].astype(geo_df['grid_id'].dtype)
-
-        # Merge the super_data with the main GeoDataFrame
-        super_geo_df = geo_df.merge(super_data, on='grid_id', how='left')
-        print("Columns in super_geo_df after merge:", super_geo_df.columns)  # Debug print
-
-        # Filter rows to include only those with non-null values in the super_data columns
-        super_geo_df = super_geo_df.dropna(subset=['max_froude_no', 'depth_super', 'time_super', 'num_supercritical_timesteps'])
-
-        # Select only the relevant columns for the output file
-        columns_to_select = ['grid_id', 'max_froude_no', 'depth_super', 'time_super', 'num_supercritical_timesteps', 'geometry']
-        super_geo_df = super_geo_df[columns_to_select]
-
-        # Create a points shapefile or GeoPackage for the SUPER.OUT data
-        if output_format == "Shapefile":
-            super_file = os.path.join(shp_outpath, 'super_out_points.shp')
-            driver = "ESRI Shapefile"
-        else:
-            super_file = os.path.join(shp_outpath, 'super_out_points.gpkg')
-            driver = "GPKG"
-
-        try:
-            super_geo_df.to_file(super_file, driver=driver, crs=f"EPSG:{coord_system}")
-            timing_logger.log(f"SUPER.OUT Points {output_format} created at: {super_file}")
-        except Exception as e:
-            logger.error(f"Failed to create SUPER.OUT Points {output_format}: {str(e)}")
-    else:
-        logger.info("SUPER.OUT file not found. Skipping SUPER.OUT data extraction.")
-
-    # New Step: Extract and Process EVACUATEDFP.OUT Data
-    evacuatedfp_file = os.path.join(file_path, 'EVACUATEDFP.OUT')
-    if os.path.exists(evacuatedfp_file):
-        timing_logger.log("Extracting data from EVACUATEDFP.OUT")
-        evacuatedfp_data = extract_evacuatedfp_data(evacuatedfp_file)
-        timing_logger.log("EVACUATEDFP.OUT data extraction completed")
-
-        # Ensure grid_id is of the same type in both DataFrames
-        evacuatedfp_data['grid_id'] = evacuatedfp_data['grid_id'].astype(geo_df['grid_id'].dtype)
-
-        # Merge the evacuatedfp_data with the main GeoDataFrame
-        evacuatedfp_geo_df = geo_df.merge(evacuatedfp_data, on='grid_id', how='left')
-        print("Columns in evacuatedfp_geo_df after merge:", evacuatedfp_geo_df.columns)  # Debug print
-
-        # Filter rows to include only those with non-null values in the evacuatedfp_data columns
-        evacuatedfp_geo_df = evacuatedfp_geo_df.dropna(subset=['num_evacuations'])
-
-        # Select only the relevant columns for the output file
-        columns_to_select = ['grid_id', 'num_evacuations', 'geometry']
-        evacuatedfp_geo_df = evacuatedfp_geo_df[columns_to_select]
-
-        # Create a points shapefile or GeoPackage for the EVACUATEDFP.OUT data
-        if output_format == "Shapefile":
-            evacuatedfp_file = os.path.join(shp_outpath, 'evacuatedfp_out_points.shp')
-            driver = "ESRI Shapefile"
-        else:
-            evacuatedfp_file = os.path.join(shp_outpath, 'evacuatedfp_out_points.gpkg')
-            driver = "GPKG"
-
-        try:
-            evacuatedfp_geo_df.to_file(evacuatedfp_file, driver=driver, crs=f"EPSG:{coord_system}")
-            timing_logger.log(f"EVACUATEDFP.OUT Points {output_format} created at: {evacuatedfp_file}")
-        except Exception as e:
-            logger.error(f"Failed to create EVACUATEDFP.OUT Points {output_format}: {str(e)}")
-    else:
-        logger.info("EVACUATEDFP.OUT file not found. Skipping EVACUATEDFP.OUT data extraction.")
-
-    # New Step: Extract and Process TIME.OUT Data
-    time_out_file = os.path.join(file_path, 'TIME.OUT')
-    if os.path.exists(time_out_file):
-        timing_logger.log("Extracting data from TIME.OUT")
-        time_out_data = extract_time_out_data(time_out_file)
-        timing_logger.log("TIME.OUT data extraction completed")
-
-        # Ensure grid_id is of the same type in both DataFrames
-        time_out_data['grid_id'] = time_out_data['grid_id'].astype(geo_df['grid_id'].dtype)
-
-        # Merge the time_out_data with the main GeoDataFrame
-        time_out_geo_df = geo_df.merge(time_out_data, on='grid_id', how='left')
-        print("Columns in time_out_geo_df after merge:", time_out_geo_df.columns)  # Debug print
-
-        # Filter rows to include only those with non-null values in the time_out_data columns
-        time_out_geo_df = time_out_geo_df.dropna(subset=['num_time_decrements'])
-
-        # Select only the relevant columns for the output file
-        columns_to_select = ['grid_id', 'num_time_decrements', 'geometry']
-        time_out_geo_df = time_out_geo_df[columns_to_select]
+    # Snapshot the project directory once for all of the input file checks below
+    project_files = scan_project_files(file_path)
+
+    # Step 1: Create required output directories (already present on re-runs)
+    if not all(os.path.isdir(folder) for folder in output_folders):
+        timing_logger.log("Creating necessary output directories")
+        create_required_folders(output_folders)
+        timing_logger.log("Output directories successfully created")
+
+    # Steps 2-4 are skipped when a cached GeoDataFrame exists for the current inputs
+    cache_file = geo_df_cache_path(file_path) if use_cache and USE_ARROW else None
+    geo_df = load_cached_geo_df(cache_file, logger) if cache_file else None
+    if geo_df is not None:
+        timing_logger.log("Loaded cached GeoDataFrame from: %s", cache_file)
+        model_data = geo_df.drop(columns='geometry')  # Dropping the geometry yields the plain model DataFrame
+
+    # Read the small inputs in the background while the model data is extracted; ARF.DAT is only needed without a cache.
+    # Files above PREFETCH_MAX_SIZE (SUPER.OUT on large models) are left for their parser to read itself
+    prefetch_names = [name for name in PREFETCH_FILES
+                      if 0 < project_files.get(os.path.normcase(name), 0) <= PREFETCH_MAX_SIZE
+                      and (geo_df is None or name != 'ARF.DAT')]
+    # Results are collected where each file is parsed; leaving the block waits for any read still running,
+    # including when a step in between raises
+    with ThreadPoolExecutor(max_workers=4) as prefetch_pool:
+        prefetched = {name: prefetch_pool.submit(read_file_bytes, os.path.join(file_path, name)) for name in prefetch_names}
+
+        if geo_df is None:
+            # Step 2: Extract model data
+            timing_logger.log("Extracting model data from FLO-2D files")
+            model_data = extractModelDataToDF(file_path)
+            timing_logger.log("Model data extraction completed")
+
+            # Step 3: Extract Area Reduction Factors (ARF)
+            arf_file = os.path.join(file_path, 'ARF.DAT')
+            if has_project_file(project_files, 'ARF.DAT'):
+                timing_logger.log("Extracting Area Reduction Factors (ARF)")
+                arf_df = extract_area_reduction_factors(arf_file, content=prefetched_content(prefetched, 'ARF.DAT'))
+                model_data = merge_arf_with_model_data(model_data, arf_df)
+                timing_logger.log("ARF data successfully merged with model data")
+            else:
+                logger.warning("ARF file not found at %s. Skipping ARF extraction.", arf_file)
+
+            # Step 4: Convert DataFrame to GeoDataFrame
+            timing_logger.log("Converting model data to GeoDataFrame for spatial processing")
+            geo_df = convertToGeoDataFrame(model_data)
+            if cache_file:
+                save_cached_geo_df(geo_df, cache_file, logger)
+
+        # Parse the EPSG code once; the CRS object is shared by the GeoDataFrame and every module output
+        crs = CRS.from_epsg(coord_system)
+        geo_df = geo_df.set_crs(crs)  # Set once so every derived output inherits it
+        geo_df['grid_id'] = geo_df['grid_id'].astype('int32')  # Canonical grid_id dtype; the OUT-file extractors return int32 too
+        # Narrow grid_id -> geometry lookup shared by every OUT-file join below
+        geo_points = geo_df[['grid_id', 'geometry']].set_index('grid_id').geometry
+        timing_logger.log("Conversion to GeoDataFrame completed")
+
+        # Step 5: Create FLO-2D Points Output (Shapefile or GeoPackage)
+        if create_flo2d_points:
+            timing_logger.log("Initiating creation of FLO-2D Points Output")
+
+            if 'flow_direction' not in geo_df.columns:
+                logger.error("'flow_direction' column is missing in the GeoDataFrame. Output creation aborted.")
+            else:
+                geo_df_subset = geo_df[['grid_id', 'flow_direction', 'geometry']]
 
-        # Create a points shapefile or GeoPackage for the TIME.OUT data
-        if output_format == "Shapefile":
-            time_out_file = os.path.join(shp_outpath, 'time_out_points.shp')
-            driver = "ESRI Shapefile"
-        else:
-            time_out_file = os.path.join(shp_outpath, 'time_out_points.gpkg')
-            driver = "GPKG"
+                gpkg_file = os.path.join(shp_outpath, 'flow_direction.gpkg')
+                try:
+                    geo_df_subset.to_file(gpkg_file, driver="GPKG", engine="pyogrio", use_arrow=USE_ARROW)
+                    timing_logger.log("FLO-2D Points GeoPackage created at: %s", gpkg_file)
+                except Exception as e:
+                    logger.error("Failed to create GeoPackage: %s", e)
 
-        try:
-            time_out_geo_df.to_file(time_out_file, driver=driver, crs=f"EPSG:{coord_system}")
-            timing_logger.log(f"TIME.OUT Points {output_format} created at: {time_out_file}")
-        except Exception as e:
-            logger.error(f"Failed to create TIME.OUT Points {output_format}: {str(e)}")
-    else:
-        logger.info("TIME.OUT file not found. Skipping TIME.OUT data extraction.")
+        # Step 6: Extract and Process SUPER.OUT, EVACUATEDFP.OUT and TIME.OUT Data
+        for spec in OUT_SPECS:
+            if has_project_file(project_files, spec[0]):
+                process_out_file(spec, file_path, geo_points, shp_outpath, output_format, driver, ext, timing_logger, logger, content=prefetched_content(prefetched, spec[0]))
+            else:
+                logger.info("%s file not found. Skipping %s data extraction.", spec[0], spec[0])
 
     # Step 7: Process Inflow Data
-    if "INFLOW.DAT" in os.listdir(file_path):
+    if has_project_file(project_files, 'INFLOW.DAT'):
+        from modules.inflow_extraction import extract_inflow_hydrographs
+        from modules.inflow_spreadsheets import create_pdf_plots, export_hydrograph_to_excel
+
         timing_logger.log("Extracting inflow data")
         inflow_data = extract_inflow_hydrographs(file_path)
         output_excel_path = os.path.join(plots_outpath, 'inflow_data.xlsx')
         export_hydrograph_to_excel(inflow_data, output_excel_path)
-        timing_logger.log(f"Inflow data spreadsheet created: {output_excel_path}")
+        timing_logger.log("Inflow data spreadsheet created: %s", output_excel_path)
         # Uncomment below lines if PDF plots are desired
         # create_pdf_plots(inflow_data, os.path.join(plots_outpath, 'inflow_plots.pdf'))
         # timing_logger.log(f"Inflow plots PDF created: {os.path.join(plots_outpath, 'inflow_plots.pdf')}")
 
     # Step 8: Process Floodplain Cross Sections
-    if "FPXSEC.DAT" in os.listdir(file_path) and "HYCROSS.OUT" in os.listdir(file_path):
+    if has_project_file(project_files, 'FPXSEC.DAT') and has_project_file(project_files, 'HYCROSS.OUT'):
+        from modules.hycross_extraction import extract_fpxsec_results
+        from modules.fpxsec_vectorization import create_fpxsec_shapefile
+        from modules.fpxsec_spreadsheet import hycross_spreadsheet_and_plots
+
         timing_logger.log("Processing Floodplain Cross Sections")
         fpxsec_results = extract_fpxsec_results(file_path)
-        fpxsec_shp = create_fpxsec_shapefile(f_path=file_path, coord_system=coord_system, model_data=model_data, fpxsec_results=fpxsec_results, output_format=output_format)
-        timing_logger.log(f"Floodplain Cross Sections Output created at: {fpxsec_shp}")
+        fpxsec_shp = create_fpxsec_shapefile(f_path=file_path, coord_system=crs, model_data=model_data[['fpxsec', 'x', 'y']], fpxsec_results=fpxsec_results, output_format=output_format)
+        timing_logger.log("Floodplain Cross Sections Output created at: %s", fpxsec_shp)
         hycross_files = hycross_spreadsheet_and_plots(file_path)
-        timing_logger.log(f"HYCROSS Spreadsheet and Plots generated: {hycross_files}")
+        timing_logger.log("HYCROSS Spreadsheet and Plots generated: %s", hycross_files)
     else:
         logger.info("Floodplain Cross Sections data not found. Skipping this step.")
 
     # Step 9: Process Hydraulic Structures
-    if "HYSTRUC.DAT" in os.listdir(file_path):
+    if has_project_file(project_files, 'HYSTRUC.DAT'):
+        from modules.hystruc_extraction import extract_hystruc_results
+        from modules.hystruc_vectorization import create_hystruc_shapefile
+        from modules.hystruc_spreadsheet import create_rating_curve_spreadsheet, plot_rating_curves_to_pdf
+        from modules.hydrostruct_spreadsheet import hydrostruct_spreadsheet_and_plots, parse_hydrograph_data
+
         timing_logger.log("Processing Hydraulic Structures")
         hystruc_df, rating_curves = extract_hystruc_results(file_path)
-        hystruc_shp = create_hystruc_shapefile(hystruc_df, model_data, coord_system, shp_outpath, output_format=output_format)
-        timing_logger.log(f"Hydraulic Structures Output created at: {hystruc_shp}")
+        hystruc_shp = create_hystruc_shapefile(hystruc_df, model_data[['grid_id', 'x', 'y']], crs, shp_outpath, output_format=output_format)
+        timing_logger.log("Hydraulic Structures Output created at: %s", hystruc_shp)
         hydrograph_data = parse_hydrograph_data(file_path)
         hydrostruct_files = hydrostruct_spreadsheet_and_plots(file_path, hydrograph_data)
-        timing_logger.log(f"Hydrostruct Spreadsheet and Plots generated: {hydrostruct_files}")
+        timing_logger.log("Hydrostruct Spreadsheet and Plots generated: %s", hydrostruct_files)
         rating_curve_excel = os.path.join(plots_outpath, 'hystruc_rating_curves.xlsx')
         rating_curve_pdf = os.path.join(plots_outpath, 'hystruc_rating_curves.pdf')
         create_rating_curve_spreadsheet(rating_curves, rating_curve_excel)
-        timing_logger.log(f"Rating Curves Spreadsheet created at: {rating_curve_excel}")
+        timing_logger.log("Rating Curves Spreadsheet created at: %s", rating_curve_excel)
         plot_rating_curves_to_pdf(rating_curves, rating_curve_pdf)
-        timing_logger.log(f"Rating Curves PDF report generated at: {rating_curve_pdf}")
+        timing_logger.log("Rating Curves PDF report generated at: %s", rating_curve_pdf)
     else:
         logger.info("Hydraulic Structures data not found. Skipping this step.")
 
     # Step 10: Create Rainfall Spreadsheet and Plot
-    if "RAIN.DAT" in os.listdir(file_path):
+    if has_project_file(project_files, 'RAIN.DAT'):
+        from modules.rain_spreadsheet import rain_spreadsheet_and_plot
+
         timing_logger.log("Generating Rainfall Spreadsheet and Plot")
         rain_files = rain_spreadsheet_and_plot(file_path)
-        timing_logger.log(f"Rainfall Spreadsheet and Plot created at: {rain_files}")
+        timing_logger.log("Rainfall Spreadsheet and Plot created at: %s", rain_files)
     else:
         logger.info("Rainfall data not found. Skipping this step.")
 
     # Step 11: Process SWMM Data
     swmm_file = os.path.join(file_path, 'SWMM.inp')
-    if os.path.exists(swmm_file):
+    if has_project_file(project_files, 'SWMM.inp'):
+        from modules.swmm_extraction import extract_swmm_data, create_swmm_shapefiles
+        from modules.swmm_inlets_spreadsheets import swmm_inlet_spreadsheets_and_pdf
+
         timing_logger.log("Extracting SWMM Data from SWMM.inp")
-        swmm_data = extract_swmm_data(swmm_file, coord_system)
+        swmm_data = extract_swmm_data(swmm_file, crs)
 
         swmm_qin_file = os.path.join(file_path, 'SWMMQIN.OUT')
-        if os.path.exists(swmm_qin_file):
+        if has_project_file(project_files, 'SWMMQIN.OUT'):
             timing_logger.log("Generating SWMM Inlet Spreadsheets and PDF")
             swmm_inlet_files = swmm_inlet_spreadsheets_and_pdf(file_path)
-            timing_logger.log(f"SWMM Inlet Spreadsheets and PDF created at: {swmm_inlet_files}")
+            timing_logger.log("SWMM Inlet Spreadsheets and PDF created at: %s", swmm_inlet_files)
         else:
-            logger.warning(f"SWMMQIN.OUT file not found at {swmm_qin_file}. Skipping SWMM Inlet Spreadsheet and PDF creation.")
+            logger.warning("SWMMQIN.OUT file not found at %s. Skipping SWMM Inlet Spreadsheet and PDF creation.", swmm_qin_file)
 
         # Create SWMM Shapefiles and GeoPackages
         timing_logger.log("Creating SWMM Shapefiles and GeoPackages")
         swmm_files = create_swmm_shapefiles(swmm_data, shp_outpath, output_format=output_format)
         for swmm_file_created in swmm_files:
-            timing_logger.log(f"SWMM File created at: {swmm_file_created}")
+            timing_logger.log("SWMM File created at: %s", swmm_file_created)
         timing_logger.log("SWMM Data Extraction and File Creation completed successfully")
     else:
         logger.info("SWMM Input File (SWMM.inp) not found. Skipping SWMM Data Extraction.")
 
     # Step 12: Extract SWMM Rating Tables
-    if "SWMMFLORT.DAT" in os.listdir(file_path):
+    if has_project_file(project_files, 'SWMMFLORT.DAT'):
+        from modules.swmm_rating_tables_extraction import extract_swmm_rating_tables
+        from modules.swmm_rating_tables_spreadsheet import swmm_rating_tables_and_plots
+
         timing_logger.log("Extracting SWMM Rating Tables")
         swmm_rating_tables = extract_swmm_rating_tables(file_path)
         timing_logger.log("SWMM Rating Tables extraction completed")
         swmm_rating_tables_and_plots(file_path, swmm_rating_tables)
         rating_tables_excel = os.path.join(plots_outpath, 'swmm_rating_tables.xlsx')
-        timing_logger.log(f"SWMM Rating Tables Spreadsheet created at: {rating_tables_excel}")
+        timing_logger.log("SWMM Rating Tables Spreadsheet created at: %s", rating_tables_excel)
     else:
         logger.info("SWMM Rating Tables data not found. Skipping this step.")
 
     # Step 13: Calculate Cell Size for Raster Creation
     timing_logger.log("Calculating cell size for raster generation")
-    cell_size = calculate_cell_size(geo_df)
-    timing_logger.log(f"Calculated cell size: {cell_size} units")
+    cell_size = calculate_cell_size(model_data)
+    timing_logger.log("Calculated cell size: %s units", cell_size)
 
     # Step 14: Create Rasters for Specified Columns
     desired_columns = [
@@ -370,16 +495,41 @@ def process_flo2d(file_path, coord_system, create_flo2d_points, verbose=False, l
     raster_columns = [col for col in desired_columns if col in model_data.columns]
 
     timing_logger.log("Initiating raster creation for available data columns")
-    logger.debug(f"Available Columns in GeoDataFrame: {list(geo_df.columns)}")
+    logger.debug("Available Columns in GeoDataFrame: %s", geo_df.columns.tolist())
 
-    for column in raster_columns:
-        logger.debug(f"Processing Column: '{column}' (Data Type: {geo_df[column].dtype})")
-        raster_file = os.path.join(raster_outpath, f'{column}.tif')
+    # The raster layout is the same for every column, so cell positions are computed once
+    raster_grid = compute_raster_grid(geo_df, cell_size)
+
+    def report_raster(future):
+        column = futures.pop(future)
         try:
-            create_raster_from_gdf(geo_df, column, raster_file, cell_size, logger)
-            timing_logger.log(f"Raster successfully created: {raster_file}")
+            raster_file = future.result()
+            timing_logger.log("Raster successfully created: %s", raster_file)
         except Exception as e:
-            logger.error(f"Failed to create raster for column '{column}'. Error: {e}")
+            logger.error("Failed to create raster for column '%s'. Error: %s", column, e)
+
+    # Arrays are filled on this thread while GDAL writes earlier ones in the background;
+    # the number of arrays waiting to be written is capped to bound memory use
+    max_raster_writers = 2
+    with ThreadPoolExecutor(max_workers=max_raster_writers) as executor:
+        futures = {}
+        for column in raster_columns:
+            logger.debug("Processing Column: '%s' (Data Type: %s)", column, geo_df[column].dtype)
+            raster_file = os.path.join(raster_outpath, f'{column}.tif')
+            try:
+                raster = compute_raster_array(raster_grid, geo_df[column].to_numpy())
+            except Exception as e:
+                logger.error("Failed to create raster for column '%s'. Error: %s", column, e)
+                continue
+
+            if len(futures) >= 2 * max_raster_writers:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    report_raster(future)
+            futures[executor.submit(write_raster, raster, raster_file, raster_grid)] = column
+
+        for future in as_completed(list(futures)):
+            report_raster(future)
 
     # Step 15: Apply Styles to Shapefiles and Rasters (if provided)
     if style_folder:
@@ -405,29 +555,55 @@ def apply_styles(file_path, style_folder, logger):
         os.path.join(file_path, 'flo2d_shp')
     ]
 
+    if not os.path.isdir(style_folder):
+        logger.warning("Style folder does not exist: %s. Skipping style application.", style_folder)
+        return
+
+    # Index the available style files by output name once, instead of probing the style folder per file
+    with os.scandir(style_folder) as entries:
+        style_map = {
+            os.path.normcase(os.path.splitext(entry.name)[0]): entry.path
+            for entry in entries
+            if entry.is_file() and entry.name.lower().endswith('.qml')
+        }
+
+    # Plan every copy up front; the sidecar files of a shapefile share one destination
+    copy_plan = {}
     for folder in output_folders:
         if not os.path.isdir(folder):
-            logger.warning(f"Output folder does not exist: {folder}. Skipping style application for this folder.")
+            logger.warning("Output folder does not exist: %s. Skipping style application for this folder.", folder)
             continue
 
-        for file in os.listdir(folder):
-            file_name, file_ext = os.path.splitext(file)
-            style_file = os.path.join(style_folder, f"{file_name}.qml")
-            if os.path.exists(style_file):
-                destination = os.path.join(folder, f"{file_name}.qml")
-                try:
-                    shutil.copy(style_file, destination)
-                    logger.info(f"Applied style file: {style_file} to {file}")
-                except Exception as e:
-                    logger.error(f"Failed to apply style file: {style_file} to {file}. Error: {e}")
-            else:
-                logger.warning(f"Style file not found for: {file_name}. Skipping style application for this file.")
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if not entry.is_file():
+                    continue
+                file_name = os.path.splitext(entry.name)[0]
+                style_file = style_map.get(os.path.normcase(file_name))
+                if style_file is None:
+                    logger.warning("Style file not found for: %s. Skipping style application for this file.", file_name)
+                    continue
+                copy_plan.setdefault(os.path.join(folder, f"{file_name}.qml"), (style_file, entry.name))
+
+    # Style files are small, so the copies are I/O bound and can run side by side
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = {
+            executor.submit(shutil.copyfile, style_file, destination): (style_file, file)
+            for destination, (style_file, file) in copy_plan.items()
+        }
+        for future in as_completed(futures):
+            style_file, file = futures[future]
+            try:
+                future.result()
+                logger.info("Applied style file: %s to %s", style_file, file)
+            except Exception as e:
+                logger.error("Failed to apply style file: %s to %s. Error: %s", style_file, file, e)
 
     logger.info("Style application process completed.")
 
-def batch_process_flo2d(file_paths, coord_system, create_flo2d_points, verbose=False, style_folder=None, output_format="Shapefile"):
+def batch_process_flo2d(file_paths, coord_system, create_flo2d_points, verbose=False, style_folder=None, output_format="Shapefile", max_workers=None, use_cache=True):
     """
-    Processes multiple FLO-2D project directories sequentially.
+    Processes multiple FLO-2D project directories in parallel worker processes.
 
     Args:
         file_paths (list): List of FLO-2D project directory paths.
@@ -436,24 +612,58 @@ def batch_process_flo2d(file_paths, coord_system, create_flo2d_points, verbose=F
         verbose (bool): Flag to enable verbose logging.
         style_folder (str): Path to the folder containing style files.
         output_format (str): Desired output format ("Shapefile" or "GeoPackage").
+        max_workers (int): Maximum number of directories processed at once (default: 1). Each worker
+            process caps its PDF rendering pool at cpu_count // max_workers processes, so the
+            total stays at about the CPU count.
+        use_cache (bool): Reuse cached model GeoDataFrames when the inputs are unchanged (default: True).
 
     Returns:
         str: Aggregated status messages for all processed directories.
     """
-    results = []
-    for file_path in file_paths:
-        logger = logging.getLogger('FLO2D_Postprocessor')
-        logger.info(f"Initiating processing for project directory: {file_path}")
-        result = process_flo2d(
-            file_path,
-            coord_system,
-            create_flo2d_points,
-            verbose,
-            style_folder=style_folder,
-            output_format=output_format  # Pass output_format
-        )
-        results.append(f"{file_path}: {result}")
-    return "\n".join(results)
+    logger = logging.getLogger('FLO2D_Postprocessor')
+    max_workers = min(len(file_paths), max_workers or 1)
+
+    # A single worker gains nothing from a process pool, so run in this process
+    if max_workers <= 1:
+        results = []
+        for file_path in file_paths:
+            logger.info("Initiating processing for project directory: %s", file_path)
+            result = process_flo2d(
+                file_path,
+                coord_system,
+                create_flo2d_points,
+                verbose,
+                style_folder=style_folder,
+                output_format=output_format,  # Pass output_format
+                use_cache=use_cache
+            )
+            results.append(f"{file_path}: {result}")
+        return "\n".join(results)
+
+    # Each worker process configures its own logger in process_flo2d, so handlers are not shared
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=set_pdf_pool_size, initargs=(max_workers,)) as executor:
+        futures = {}
+        for file_path in file_paths:
+            logger.info("Initiating processing for project directory: %s", file_path)
+            future = executor.submit(
+                process_flo2d,
+                file_path,
+                coord_system,
+                create_flo2d_points,
+                verbose,
+                style_folder=style_folder,
+                output_format=output_format,  # Pass output_format
+                use_cache=use_cache
+            )
+            futures[future] = file_path
+
+        for future in as_completed(futures):
+            file_path = futures[future]
+            results[file_path] = f"{file_path}: {future.result()}"
+
+    # Report in the order the directories were given
+    return "\n".join(results[file_path] for file_path in file_paths)
 
 def main():
     """
@@ -492,6 +702,18 @@ def main():
         default="Shapefile",
         help="Desired output format for vector data (default: Shapefile)."
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of project directories to process in parallel (default: 1)."
+    )
+    parser.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Rebuild the model GeoDataFrame instead of reusing the cached copy."
+    )
     args = parser.parse_args()
 
     if args.verbose:
@@ -511,7 +733,9 @@ def main():
         args.create_flo2d_points,
         verbose=args.verbose,
         style_folder=args.style_folder,
-        output_format=args.output_format  # Pass output_format
+        output_format=args.output_format,  # Pass output_format
+        max_workers=args.workers,
+        use_cache=args.use_cache
     )
     logger.info("=== FLO-2D Postprocessor Execution Completed ===")
     logger.info(result)
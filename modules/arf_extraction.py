@@ -1,34 +1,34 @@
 import sys
 import pandas as pd
 import numpy as np
-from modules.utilities import time_function
+from modules.utilities import time_function, read_text_lines
 
 @time_function
-def extract_area_reduction_factors(file_path):
+def extract_area_reduction_factors(file_path, content=None):
     '''
     Extracts grid IDs and Area Reduction Factors from a file.
 
     Parameters:
         file_path (str): The path to the file to be processed.
+        content (bytes): File contents already read from file_path, if available.
 
     Returns:
         pd.DataFrame: A DataFrame containing 'grid_id' and 'arf' columns.
     '''
     data = []
-    with open(file_path, 'r') as file:
-        for line in file:
-            parts = line.split()
-            if parts:
-                if parts[0] == 'T':
-                    grid_id = int(parts[1]) - 1  # Adjust to 0-based index
-                    arf = 1.0
-                else:
-                    try:
-                        grid_id = int(parts[0]) - 1  # Adjust to 0-based index
-                        arf = float(parts[1])
-                    except ValueError:
-                        continue
-                data.append((grid_id, arf))
+    for line in read_text_lines(file_path, content):
+        parts = line.split()
+        if parts:
+            if parts[0] == 'T':
+                grid_id = int(parts[1]) - 1  # Adjust to 0-based index
+                arf = 1.0
+            else:
+                try:
+                    grid_id = int(parts[0]) - 1  # Adjust to 0-based index
+                    arf = float(parts[1])
+                except ValueError:
+                    continue
+            data.append((grid_id, arf))
 
     df = pd.DataFrame(data, columns=['grid_id', 'arf'])
     return df
@@ -1,75 +1,93 @@
 import pandas as pd
 import numpy as np
 import os
-from modules.utilities import time_function
+import re
+from concurrent.futures import ThreadPoolExecutor
+from modules.utilities import time_function, mapped_file
+
+# XSEC.DAT section header ("X <number> ..."); splitting on it leaves the station/elevation block of each section
+XSEC_HEADER_PATTERN = re.compile(rb'^X[ \t]+(\d+)[^\n]*\n?', re.MULTILINE)
+
+# CHAN.DAT segment records start with an alphabetic type code followed by four numeric fields
+CHAN_RECORD_PATTERN = re.compile(rb'^([A-Za-z]\S*)[ \t]+(\S+)[ \t]+(\S+)[ \t]+(\S+)[ \t]+(\S+)', re.MULTILINE)
+
+CHANMAX_COLUMNS = ['NODE', 'Max Discharge (CFS)', 'Time of Max Discharge (Hrs)', 'Max Stage', 'Time of Max Stage (Hrs)']
 
 @time_function
 def extract_xsec_data(file_path):
-    data = []
-    with open(file_path, 'r') as file:
-        cross_section = None
-        for line in file:
-            if line.startswith('X'):
-                cross_section = int(line.split()[1])
-            elif line.strip():
-                station, elevation = map(float, line.split())
-                data.append((cross_section, station, elevation))
-    return pd.DataFrame(data, columns=['Cross Section Number', 'Station', 'Elevation'])
+    # The patterns are byte patterns, so they scan the mapped file directly
+    with mapped_file(file_path) as buffer:
+        parts = XSEC_HEADER_PATTERN.split(buffer)
+
+    # parts alternates section number / station-elevation block after the text before the first header
+    blocks = [np.fromstring(block, sep=' ') for block in parts[2::2]]
+    counts = [len(block) // 2 for block in blocks]
+    values = np.concatenate(blocks).reshape(-1, 2) if blocks else np.empty((0, 2))
+    return pd.DataFrame({
+        'Cross Section Number': np.repeat(np.array(list(map(int, parts[1::2])), dtype=np.int64), counts),
+        'Station': values[:, 0],
+        'Elevation': values[:, 1],
+    })
 
 @time_function
 def extract_chanmax_data(file_path):
-    data = []
-    with open(file_path, 'r', encoding='ISO-8859-1') as file:
-        for line in file:
-            if line.strip() and not line.startswith('CHANNEL SEGMENT NO'):
-                try:
-                    node, max_discharge, time_max_discharge, max_stage, time_max_stage = line.split()
-                    data.append((int(node), float(max_discharge), float(time_max_discharge),
-                                 float(max_stage), float(time_max_stage)))
-                except ValueError:
-                    continue
-    return pd.DataFrame(data, columns=['NODE', 'Max Discharge (CFS)', 'Time of Max Discharge (Hrs)',
-                                       'Max Stage', 'Time of Max Stage (Hrs)'])
+    # Header and other non-numeric lines come through as NaN and are dropped, as are rows with extra fields
+    df = pd.read_csv(file_path, sep=r'\s+', header=None, names=CHANMAX_COLUMNS, engine='c',
+                     encoding='ISO-8859-1', on_bad_lines='skip')
+    df = df.apply(pd.to_numeric, errors='coerce').dropna().reset_index(drop=True)
+    return df.astype({'NODE': 'int64'})
 
 @time_function
 def extract_chan_data(file_path):
-    data = []
-    with open(file_path, 'r') as file:
-        for line in file:
-            if line.strip() and line[0].isalpha():
-                parts = line.split()
-                data.append((parts[0], int(parts[1]), float(parts[2]), float(parts[3]), int(parts[4])))
-    return pd.DataFrame(data, columns=['Cross Section Type', 'FLO-2D Grid ID', 'N-Value',
-                                       'Length to Next Cross Section', 'Cross Section Number'])
+    with mapped_file(file_path) as buffer:
+        records = np.array(CHAN_RECORD_PATTERN.findall(buffer), dtype=bytes).reshape(-1, 5)
+
+    # NumPy converts the matched byte fields column by column
+    return pd.DataFrame({
+        'Cross Section Type': records[:, 0].astype(str),
+        'FLO-2D Grid ID': records[:, 1].astype(np.int64),
+        'N-Value': records[:, 2].astype(np.float64),
+        'Length to Next Cross Section': records[:, 3].astype(np.float64),
+        'Cross Section Number': records[:, 4].astype(np.int64),
+    })
 
 @time_function
 def extract_veloc_depch_data(file_path, relevant_grid_ids):
-    data = []
-    with open(file_path, 'r') as file:
-        for line in file:
-            parts = line.split()
-            grid_id = int(parts[0])
-            if grid_id in relevant_grid_ids:
-                data.append((grid_id, float(parts[3])))
-    return pd.DataFrame(data, columns=['FLO-2D Grid ID', os.path.basename(file_path).split('.')[0].upper()])
+    value_column = os.path.basename(file_path).split('.')[0].upper()
+    # Values stay float64: they are written to the channel workbook, where float32 would show as e.g. 0.100000001
+    df = pd.read_csv(file_path, sep=r'\s+', header=None, usecols=[0, 3], names=['FLO-2D Grid ID', value_column],
+                     engine='c', dtype={'FLO-2D Grid ID': 'int32', value_column: 'float64'})
+    relevant_ids = np.fromiter(relevant_grid_ids, dtype=np.int32, count=len(relevant_grid_ids))
+    mask = np.isin(df['FLO-2D Grid ID'].to_numpy(), relevant_ids)
+    return df[mask].reset_index(drop=True)
 
 @time_function
 def combine_channel_data(xsec_df, chanmax_df, chan_df, depch_df, veloc_df):
-    combined_df = pd.merge(xsec_df, chan_df, on='Cross Section Number')
-    combined_df = pd.merge(combined_df, chanmax_df.rename(columns={'NODE': 'FLO-2D Grid ID'}),
-                           on='FLO-2D Grid ID', how='left')
-    combined_df = pd.merge(combined_df, veloc_df, on='FLO-2D Grid ID', how='left')
-    combined_df = pd.merge(combined_df, depch_df, on='FLO-2D Grid ID', how='left')
-    return combined_df
+    combined_df = xsec_df.join(chan_df.set_index('Cross Section Number'), on='Cross Section Number', how='inner')
+
+    # Each grid node appears once on the right, so these left joins never fan out rows
+    chanmax_df = chanmax_df.drop_duplicates('NODE').set_index('NODE').rename_axis('FLO-2D Grid ID')
+    veloc_df = veloc_df.drop_duplicates('FLO-2D Grid ID').set_index('FLO-2D Grid ID')
+    depch_df = depch_df.drop_duplicates('FLO-2D Grid ID').set_index('FLO-2D Grid ID')
+    for right_df in (chanmax_df, veloc_df, depch_df):
+        combined_df = combined_df.join(right_df, on='FLO-2D Grid ID', how='left')
+    return combined_df.reset_index(drop=True)
 
 @time_function
 def extract_channel_data(file_path):
-    xsec_df = extract_xsec_data(os.path.join(file_path, 'XSEC.DAT'))
-    chanmax_df = extract_chanmax_data(os.path.join(file_path, 'CHANMAX.OUT'))
-    chan_df = extract_chan_data(os.path.join(file_path, 'CHAN.DAT'))
-    relevant_grid_ids = set(chan_df['FLO-2D Grid ID'])
-    depch_df = extract_veloc_depch_data(os.path.join(file_path, 'DEPCH.OUT'), relevant_grid_ids)
-    veloc_df = extract_veloc_depch_data(os.path.join(file_path, 'VELOC.OUT'), relevant_grid_ids)
-    
+    # The readers release the GIL while parsing, so the files are read side by side;
+    # DEPCH/VELOC wait only for CHAN.DAT, which supplies the grid ids they keep
+    with ThreadPoolExecutor(max_workers=5) as executor:
+        xsec_future = executor.submit(extract_xsec_data, os.path.join(file_path, 'XSEC.DAT'))
+        chanmax_future = executor.submit(extract_chanmax_data, os.path.join(file_path, 'CHANMAX.OUT'))
+        chan_df = executor.submit(extract_chan_data, os.path.join(file_path, 'CHAN.DAT')).result()
+        relevant_grid_ids = set(chan_df['FLO-2D Grid ID'])
+        depch_future = executor.submit(extract_veloc_depch_data, os.path.join(file_path, 'DEPCH.OUT'), relevant_grid_ids)
+        veloc_future = executor.submit(extract_veloc_depch_data, os.path.join(file_path, 'VELOC.OUT'), relevant_grid_ids)
+        xsec_df = xsec_future.result()
+        chanmax_df = chanmax_future.result()
+        depch_df = depch_future.result()
+        veloc_df = veloc_future.result()
+
     combined_df = combine_channel_data(xsec_df, chanmax_df, chan_df, depch_df, veloc_df)
     return combined_df
@@ -1,20 +1,25 @@
-import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 import os
 import xlsxwriter
-from modules.utilities import time_function
+from modules.utilities import time_function, write_sheet_rows
 
 @time_function
 def create_channel_excel(file_path, combined_df):
     output_excel_path = os.path.join(file_path, 'flo2d_plots', 'channel_results.xlsx')
-    with pd.ExcelWriter(output_excel_path, engine='xlsxwriter') as writer:
-        # Full summary sheet
-        combined_df.to_excel(writer, sheet_name='Full Summary', index=False)
+    # Rows are flushed to disk as they are written instead of holding the whole workbook in memory
+    workbook = xlsxwriter.Workbook(output_excel_path, {'constant_memory': True, 'strings_to_numbers': False})
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    try:
+        # Full summary sheet (the large one) first
+        write_sheet_rows(workbook, 'Full Summary', combined_df, header_format)
         
         # Unique cross section summary sheet
-        unique_df = combined_df.drop_duplicates(subset=['Cross Section Number'])
-        unique_df.to_excel(writer, sheet_name='Unique Cross Section Summary', index=False)
+        # First row of each section; a boolean mask over one column instead of hashing the full frame
+        unique_df = combined_df.loc[~combined_df['Cross Section Number'].duplicated()]
+        write_sheet_rows(workbook, 'Unique Cross Section Summary', unique_df, header_format)
+    finally:
+        workbook.close()
     
     print(f"Excel file created: {output_excel_path}")
 
@@ -23,48 +28,52 @@ def create_channel_plots(combined_df, output_pdf_path):
     unique_cross_sections = combined_df['Cross Section Number'].unique()
     num_plots = len(unique_cross_sections)
     
-    cs_data_dict = {cs_num: combined_df[combined_df['Cross Section Number'] == cs_num] for cs_num in unique_cross_sections}
+    # One hashed pass groups the rows and computes the per-section maxima used in the annotations
+    groups = combined_df.groupby('Cross Section Number', sort=False)
+    agg_df = groups[['Max Stage', 'Max Discharge (CFS)', 'Time of Max Discharge (Hrs)', 'VELOC', 'DEPCH']].max()
     
     with PdfPages(output_pdf_path) as pdf:
         fig, axs = plt.subplots(2, 2, figsize=(8.5, 11))
         fig.subplots_adjust(hspace=0.4, wspace=0.3)
         axs = axs.flatten()
         
+        # Build the artists once and only update their data on each page
+        lines, hlines, texts = [], [], []
+        for ax in axs:
+            lines.append(ax.plot([], [], 'k-', linewidth=1.25)[0])
+            hlines.append(ax.axhline(y=0, color='b', linestyle='--', label='Max Water Surface'))
+            texts.append(ax.text(0.05, 0.95, '', transform=ax.transAxes, verticalalignment='top', fontsize=7,
+                                 bbox=dict(facecolor='white', alpha=0.7)))
+            ax.set_xlabel('Station')
+            ax.set_ylabel('Elevation')
+            ax.legend(fontsize=7, loc='upper right')
+        
         for i in range(0, num_plots, 4):
             for j in range(4):
+                ax = axs[j]
                 if i + j < num_plots:
                     cross_section_number = unique_cross_sections[i + j]
-                    cs_data = cs_data_dict[cross_section_number]
-                    
-                    ax = axs[j]
-                    ax.plot(cs_data['Station'], cs_data['Elevation'], 'k-', linewidth=1.25)
-                    max_stage = cs_data['Max Stage'].max()
-                    ax.axhline(y=max_stage, color='b', linestyle='--', label='Max Water Surface')
+                    station_elevation = groups.get_group(cross_section_number)[['Station', 'Elevation']].to_numpy()
+                    max_stage, max_discharge, time_to_peak, max_velocity, max_depth = agg_df.loc[cross_section_number].to_numpy()
                     
+                    lines[j].set_data(station_elevation[:, 0], station_elevation[:, 1])
+                    hlines[j].set_ydata([max_stage, max_stage])
                     ax.set_title(f'Cross-Section {cross_section_number}')
-                    ax.set_xlabel('Station')
-                    ax.set_ylabel('Elevation')
-                    
-                    max_discharge = cs_data['Max Discharge (CFS)'].max()
-                    time_to_peak = cs_data['Time of Max Discharge (Hrs)'].max()
-                    max_velocity = cs_data['VELOC'].max()
-                    max_depth = cs_data['DEPCH'].max()
-                    
-                    ax.text(0.05, 0.95, (f'Max Q: {max_discharge:.2f} cfs\n'
-                                         f'Max Stage: {max_stage:.2f} ft\n'
-                                         f'Time to Peak: {time_to_peak:.2f} hrs\n'
-                                         f'Max Velocity: {max_velocity:.2f} ft/s\n'
-                                         f'Max Depth: {max_depth:.2f} ft'),
-                            transform=ax.transAxes, verticalalignment='top', fontsize=7,
-                            bbox=dict(facecolor='white', alpha=0.7))
-                    
-                    ax.legend(fontsize=7, loc='upper right')
+                    texts[j].set_text(f'Max Q: {max_discharge:.2f} cfs\n'
+                                      f'Max Stage: {max_stage:.2f} ft\n'
+                                      f'Time to Peak: {time_to_peak:.2f} hrs\n'
+                                      f'Max Velocity: {max_velocity:.2f} ft/s\n'
+                                      f'Max Depth: {max_depth:.2f} ft')
+                    ax.relim()
+                    ax.autoscale_view()
+                    ax.set_visible(True)
                 else:
-                    axs[j].clear()  # Clear the axis if no data for it
+                    ax.set_visible(False)  # Hide the axis if no data for it
             
             fig.tight_layout()
             pdf.savefig(fig)
-            plt.clf()  # Clear the figure to reuse the axes
+        
+        plt.close(fig)
     
     print(f"PDF file created: {output_pdf_path}")
 
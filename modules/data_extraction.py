@@ -1,16 +1,22 @@
 import dask.dataframe as dd
 import pandas as pd
 import numpy as np
+import io
 import os
+import re
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 import psutil
 import traceback
+from modules.utilities import read_text_lines, READ_BUFFER_SIZE
 
 def log_time(message, start_time):
     elapsed_time = time.time() - start_time
     print(f"{message} took {elapsed_time:.2f} seconds")
 
+# Below this size a plain pandas read beats Dask's task-graph and scheduler overhead
+DASK_MIN_FILE_SIZE = 128 * 1024 * 1024
+
 def read_with_dask_optimized(file_path, column_names=None, **kwargs):
     file_size = os.path.getsize(file_path)
     chunk_size = max(min(file_size // 100, 256 * 1024 * 1024), 32 * 1024 * 1024)  # Between 32MB and 256MB
@@ -32,23 +38,25 @@ def read_file_with_line_number(file_path, column_names, skiprows=0):
 
 def extract_rain_data(file_path):
     rain_file = os.path.join(file_path, 'RAIN.DAT')
-    with open(rain_file, 'r') as file:
+    with open(rain_file, 'r', buffering=READ_BUFFER_SIZE) as file:
         lines = file.readlines()
 
     multiplier_value = float(lines[1].split()[0])
     last_r_index = max(i for i, line in enumerate(lines) if line.startswith('R'))
     data_lines = lines[last_r_index + 1:]
     
-    data = [line.split() for line in data_lines if line.strip()]
-    df = pd.DataFrame(data, columns=['grid_id', 'rain_depth'])
-    
-    df['grid_id'] = pd.to_numeric(df['grid_id'], errors='coerce').astype('Int64')
-    df['rain_depth'] = pd.to_numeric(df['rain_depth'], errors='coerce') * multiplier_value
+    # The remaining lines are "grid_id rain_depth" pairs; each line is split on its own, so a short,
+    # long or non-numeric line only affects that row, and the columns are then converted in one pass
+    pairs = [(parts + [None])[:2] for parts in (line.split() for line in data_lines) if parts]
+    df = pd.DataFrame(pairs, columns=['grid_id', 'rain_depth'])
+    df = df.apply(pd.to_numeric, errors='coerce').dropna(subset=['grid_id'])
+    df['grid_id'] = df['grid_id'].astype('Int64')
+    df['rain_depth'] = df['rain_depth'] * multiplier_value
     
-    return df
+    return df.reset_index(drop=True)
 
 def read_infil_dat(file_path):
-    with open(file_path, 'r') as file:
+    with open(file_path, 'r', buffering=READ_BUFFER_SIZE) as file:
         for _ in range(3):
             next(file)
         
@@ -62,32 +70,66 @@ def read_infil_dat(file_path):
     df = pd.DataFrame(data, columns=columns)
     return df.apply(pd.to_numeric, errors='coerce')
 
+# FPXSEC.DAT cross section line: "X <flow direction> <cell count> <grid ids...>"; the group is the grid id list
+FPXSEC_LINE_PATTERN = re.compile(r'^[ \t]*X(?=[ \t]|$)(?:[ \t]+\S+){0,2}(.*)$', re.MULTILINE)
+DIGIT_TOKEN_PATTERN = re.compile(r'(?<!\S)\d+(?!\S)')
+
 def read_fpxsec_data_as_df(file_path):
     fpxsec_file = os.path.join(file_path, 'FPXSEC.DAT')
     if not os.path.exists(fpxsec_file):
         return pd.DataFrame()
 
-    rows = []
-    with open(fpxsec_file, 'r') as file:
-        line_number = 0
-        for line in file:
-            parts = line.split()
-            if parts and parts[0] == 'X':
-                line_number += 1
-                for grid_id in parts[3:]:
-                    if grid_id.isdigit():
-                        rows.append({'grid_id': int(grid_id) - 1, 'fpxsec': line_number})
-    
-    return pd.DataFrame(rows)
+    with open(fpxsec_file, 'r', buffering=READ_BUFFER_SIZE) as file:
+        tails = FPXSEC_LINE_PATTERN.findall(file.read())
+
+    # Each X line is one cross section; only its all-digit tokens are grid ids
+    id_tokens = [DIGIT_TOKEN_PATTERN.findall(tail) for tail in tails]
+    counts = [len(tokens) for tokens in id_tokens]
+    if not any(counts):
+        return pd.DataFrame()
+
+    # Converted token by token so the ids always line up with the per-section counts
+    grid_ids = np.array([token for tokens in id_tokens for token in tokens]).astype(np.int64) - 1
+    fpxsec = np.repeat(np.arange(1, len(tails) + 1, dtype=np.int32), counts)
+    return pd.DataFrame({'grid_id': grid_ids, 'fpxsec': fpxsec})
 
 def ensure_unique_columns(df):
-    cols = df.columns.to_series()
-    for dup in cols[cols.duplicated()].unique():
-        mask = cols.eq(dup)
-        cols[mask] = [dup + '_' + str(i) if i != 0 else dup for i in range(mask.sum())]
-    df.columns = cols.tolist()
+    # The n-th repeat of a name (counting from 0) becomes "<name>_<n>"; first occurrences keep their name
+    cols = pd.Series(df.columns, dtype=object)
+    counts = cols.groupby(cols).cumcount()
+    df.columns = np.where(counts > 0, cols.astype(str) + '_' + counts.astype(str), cols).tolist()
     return df
 
+# Per-file dtypes applied after parsing. Values are float32 (about 7 significant digits, enough
+# for depths, velocities, times and elevations to well under 0.01 ft); x/y stay float64
+# because state plane coordinates need more digits than float32 can hold.
+FILE_DTYPES = {
+    'DEPTH.OUT': {'grid_id': 'int32', 'depth_max': 'float32'},
+    'MANNINGS_N.DAT': {'grid_id': 'int32', 'mannings_n': 'float32'},
+    'TOPO.DAT': {'grid_id': 'int32', 'topo': 'float32'},
+    'VELFP.OUT': {'grid_id': 'int32', 'velocity': 'float32'},
+    'MAXQHYD.OUT': {'grid_id': 'int32', 'q_max': 'float32'},
+    'MAXWSELEV.OUT': {'grid_id': 'int32', 'wse_max': 'float32'},
+    'INFIL_DEPTH.OUT': {'grid_id': 'int32', 'infil_depth': 'float32', 'infil_stop': 'float32'},
+    'TIMEONEFT.OUT': {'grid_id': 'int32', 'time_of_oneft': 'float32'},
+    'TIMETWOFT.OUT': {'grid_id': 'int32', 'time_of_twoft': 'float32'},
+    'TIMETOPEAK.OUT': {'grid_id': 'int32', 'time_to_peak': 'float32'},
+    'FINALVEL.OUT': {'grid_id': 'int32', 'final_velocity': 'float32'},
+    'FINALDEP.OUT': {'grid_id': 'int32', 'final_depth': 'float32'},
+    'RAIN.DAT': {'grid_id': 'int32', 'rain_depth': 'float32'},
+    'SUPER.OUT': {'grid_id': 'int32', 'max_froude_no': 'float32', 'depth_super': 'float32',
+                  'time_super': 'float32', 'num_supercritical_timesteps': 'int32'},
+    'INFIL.DAT': {'grid_id': 'int32', 'xksat': 'float32', 'psif': 'float32', 'dtheta': 'float32',
+                  'abstrinf': 'float32', 'rtimpf': 'float32', 'soil_depth': 'float32'},
+    'FPXSEC.DAT': {'grid_id': 'int32', 'fpxsec': 'int32'},
+}
+
+def downcast_columns(name, df):
+    # Integer columns holding NaN (unparseable rows) are left as they are rather than failing the cast
+    dtypes = {col: dtype for col, dtype in FILE_DTYPES.get(name, {}).items()
+              if col in df.columns and not (dtype.startswith('int') and df[col].isna().any())}
+    return df.astype(dtypes) if dtypes else df
+
 def process_file(name, params, file_path):
     file_path_full = os.path.join(file_path, name)
     if not os.path.exists(file_path_full):
@@ -102,8 +144,11 @@ def process_file(name, params, file_path):
             df = read_file_with_line_number(file_path_full, column_names, skiprows=skiprows)
         else:
             column_names = params.pop('column_names', None)
-            df = read_with_dask_optimized(file_path_full, column_names=column_names, **params)
-            df = df.compute()  # Compute only when necessary
+            if os.path.getsize(file_path_full) < DASK_MIN_FILE_SIZE:
+                df = pd.read_csv(file_path_full, sep=r'\s+', header=None, names=column_names, engine='c', **params)
+            else:
+                df = read_with_dask_optimized(file_path_full, column_names=column_names, **params)
+                df = df.compute()  # Compute only when necessary
 
         if 'grid_id' in df.columns and name not in ['TOPO.DAT', 'INFIL_DEPTH.OUT']:
             df['grid_id'] = df['grid_id'] - 1  # Adjust to 0-based index
@@ -123,47 +168,58 @@ def verify_grid_ids(data_frames):
 
 def controlled_merge(main_df, data_frames):
     print("Starting controlled merge...")
-    result = main_df.copy()
-    total_rows = len(result)
-    
+    total_rows = len(main_df)
+
+    # Index every frame on grid_id once; a multi-way join takes no suffixes, so overlapping
+    # columns are given the same '_<file name>' suffix the pairwise merges used to add
+    main_ids = main_df['grid_id'].to_numpy()
+    main_indexed = main_df.set_index('grid_id')
+    seen_columns = set(main_df.columns)
+    aligned_frames = [main_indexed]
+    right_frames = []
     for name, df in data_frames.items():
-        if name != 'DEPTH.OUT' and not df.empty:
-            if 'grid_id' in df.columns:
-                print(f"Merging {name}...")
-                result = pd.merge(result, df, on='grid_id', how='left', suffixes=('', f'_{name}'))
-                if len(result) != total_rows:
-                    print(f"Warning: Row count changed after merging {name}. Expected {total_rows}, got {len(result)}")
-                    total_rows = len(result)
-            elif name == 'FPXSEC.DAT':
-                print(f"Merging {name}...")
-                result = pd.merge(result, df, left_on='grid_id', right_on='grid_id', how='left')
-                result['fpxsec'] = result['fpxsec'].fillna(0)
-        print(f"Current dataframe shape after merging {name}: {result.shape}")
+        if name != 'DEPTH.OUT' and not df.empty and 'grid_id' in df.columns:
+            print(f"Merging {name}...")
+            df = df.rename(columns={col: f'{col}_{name}' for col in df.columns if col != 'grid_id' and col in seen_columns})
+            seen_columns.update(df.columns)
+            if len(df) == len(main_ids) and np.array_equal(df['grid_id'].to_numpy(), main_ids):
+                # Same cells in the same order as DEPTH.OUT (the usual case): take the columns as they are, no hash lookup
+                aligned_frames.append(df.drop(columns='grid_id').set_axis(main_indexed.index))
+            else:
+                right_frames.append(df.set_index('grid_id'))
+
+    result = pd.concat(aligned_frames, axis=1) if len(aligned_frames) > 1 else main_indexed
+    if right_frames:
+        result = result.join(right_frames, how='left')
+    result = result.reset_index()
+    if 'fpxsec' in result.columns:
+        # Cells outside every cross section get the sentinel 0 so the column stays int32
+        result['fpxsec'] = result['fpxsec'].fillna(0).astype('int32')
+    if len(result) != total_rows:
+        print(f"Warning: Row count changed after merging. Expected {total_rows}, got {len(result)}")
+    print(f"Current dataframe shape after merging: {result.shape}")
     
     print("Merge complete.")
     return result
 
-def extract_super_data(file_path):
+def extract_super_data(file_path, content=None):
     super_file = os.path.join(file_path, 'SUPER.OUT')
-    with open(super_file, 'r') as file:
-        lines = file.readlines()
+    lines = read_text_lines(super_file, content)
 
     # Skip header lines
-    data_lines = lines[7:]
-
-    data = []
-    for line in data_lines:
-        parts = line.split()
-        if len(parts) == 5:
-            data.append({
-                'grid_id': int(parts[0]) - 1,  # Adjust to 0-based index
-                'max_froude_no': float(parts[1]),
-                'depth_super': float(parts[2]),  # Changed from 'depth' to 'depth_super'
-                'time_super': float(parts[3]),   # Changed from 'time' to 'time_super'
-                'num_supercritical_timesteps': int(parts[4])
-            })
-
-    return pd.DataFrame(data)
+    text = ''.join(lines[7:])
+
+    columns = ['grid_id', 'max_froude_no', 'depth_super', 'time_super', 'num_supercritical_timesteps']
+    # Integer dtypes come from FILE_DTYPES; the float columns are narrowed later by downcast_columns
+    int_dtypes = {col: dtype for col, dtype in FILE_DTYPES['SUPER.OUT'].items() if dtype.startswith('int')}
+    if not text.strip():
+        return pd.DataFrame(columns=columns).astype(int_dtypes)
+
+    # Rows that are not exactly five numeric fields are skipped or come through as NaN and are dropped
+    df = pd.read_csv(io.StringIO(text), sep=r'\s+', header=None, names=columns, engine='c', on_bad_lines='skip')
+    df = df.apply(pd.to_numeric, errors='coerce').dropna().reset_index(drop=True)
+    df['grid_id'] = df['grid_id'] - 1  # Adjust to 0-based index
+    return df.astype(int_dtypes)
 
 def extractModelDataToDF(file_path):
     print("Started extracting model data")
@@ -221,6 +277,8 @@ def extractModelDataToDF(file_path):
     if len(fpxsec_df.columns) > 0:
         data_frames['FPXSEC.DAT'] = fpxsec_df
 
+    data_frames = {name: downcast_columns(name, df) for name, df in data_frames.items()}
+
     # Verify grid_ids
     verify_grid_ids(data_frames)
 
@@ -228,14 +286,9 @@ def extractModelDataToDF(file_path):
     main_df = data_frames['DEPTH.OUT']
     print(f"Main dataframe (DEPTH.OUT) shape: {main_df.shape}")
     
+    # SUPER.OUT is part of data_frames, so it is joined along with the other files
     main_df = controlled_merge(main_df, data_frames)
 
-    # Ensure SUPER.OUT data is included in the merge
-    if 'SUPER.OUT' in data_frames:
-        print("Merging SUPER.OUT data...")
-        main_df = pd.merge(main_df, data_frames['SUPER.OUT'], on='grid_id', how='left')
-        print(f"Dataframe shape after merging SUPER.OUT: {main_df.shape}")
-
     main_df = ensure_unique_columns(main_df)
     
     log_time("Extracting model data", start_time)
@@ -1,31 +1,30 @@
 import pandas as pd
+import numpy as np
+import re
+from contextlib import nullcontext
+from modules.utilities import mapped_file
 
-def extract_evacuatedfp_data(file_path):
+EVACUATEDFP_HEADER = b"ELEMENT    NUMBER OF EVACUATIONS"
+
+# Data rows are exactly two integer fields: element (grid id) and number of evacuations
+EVACUATION_ROW_PATTERN = re.compile(rb'^[ \t]*(-?\d+)[ \t]+(-?\d+)[ \t]*\r?$', re.MULTILINE)
+
+def extract_evacuatedfp_data(file_path, content=None):
     """
     Extracts data from the EVACUATEDFP.OUT file.
 
     Args:
         file_path (str): Path to the EVACUATEDFP.OUT file.
+        content (bytes): File contents already read from file_path, if available.
 
     Returns:
         pandas.DataFrame: DataFrame containing the extracted data.
     """
-    grid_ids = []
-    num_evacuations = []
-
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-        
-    extract_data = False
-    for line in lines:
-        if line.strip().startswith("ELEMENT    NUMBER OF EVACUATIONS"):
-            extract_data = True
-            continue
-        
-        if extract_data and line.strip():
-            parts = line.split()
-            if len(parts) == 2:
-                grid_ids.append(int(parts[0]))
-                num_evacuations.append(int(parts[1]))
+    with (nullcontext(content) if content is not None else mapped_file(file_path)) as buffer:
+        # Rows are only read after the header line; scanning starts at the byte following it
+        header_pos = buffer.find(EVACUATEDFP_HEADER)
+        data_start = buffer.find(b"\n", header_pos) + 1 if header_pos >= 0 else 0
+        rows = EVACUATION_ROW_PATTERN.findall(buffer, data_start) if data_start > 0 else []
 
-    return pd.DataFrame({'grid_id': grid_ids, 'num_evacuations': num_evacuations})
+    values = np.array(rows, dtype=bytes).reshape(-1, 2).astype(np.int64)
+    return pd.DataFrame({'grid_id': values[:, 0].astype(np.int32), 'num_evacuations': values[:, 1]})
@@ -1,10 +1,39 @@
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 import os
 import re
+from concurrent.futures import ThreadPoolExecutor
 import xlsxwriter
 
+NUMBER = r'[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?'
+
+# One alternation covers the HYCROSS.OUT header and summary lines; finditer walks the text once and
+# the outer group name (match.lastgroup) says which kind of line was found
+HYCROSS_PATTERN = re.compile(
+    r'(?P<max_discharge>THE MAXIMUM DISCHARGE FROM CROSS SECTION[ \t]*(?P<q_section>\d+) IS:[ \t]*(?P<q_value>[\d.]+) CFS AT TIME:[ \t]*(?P<q_time>[\d.]+))'
+    r'|(?P<max_wse>MAXIMUM WATER SURFACE ELEVATION AT CROSS SECTION[ \t]*(?P<wse_section>\d+)[ \t]*IS:[ \t]*(?P<wse_value>[\d.]+))'
+    r'|(?P<section>HYDROGRAPH AND FLOODPLAIN HYDRAULICS[^\n]*?FOR CROSS SECTION NO:[ \t]*(?P<section_no>\d+))')
+
+# Hydrograph data rows: TIME is field 0, WS ELEV field 3 and DISCHARGE field 5
+HYDROGRAPH_ROW_PATTERN = re.compile(
+    rf'^[ \t]*({NUMBER})[ \t]+\S+[ \t]+\S+[ \t]+({NUMBER})[ \t]+\S+[ \t]+({NUMBER})(?!\S)', re.MULTILINE)
+
+# Chart options shared by every section's hydrograph chart
+CHART_TYPE = {'type': 'line'}
+CHART_X_AXIS = {'name': 'Time (hours)'}
+CHART_Y_AXIS = {'name': 'Discharge (cfs)'}
+CHART_SIZE = {'width': 600, 'height': 400}
+CHART_LEGEND = {'position': 'none'}
+
+def parse_hydrograph_rows(text, start, end):
+    """
+    Parses the hydrograph data rows in text[start:end] into an (n, 3) array of time, WS elevation and discharge.
+    """
+    rows = HYDROGRAPH_ROW_PATTERN.findall(text, start, end)
+    return np.array(rows, dtype=str).reshape(-1, 3).astype(np.float64)
+
 def extract_hydrograph_data(file_path):
     """
     Extracts hydrograph data (time and discharge) from the specified file, integrating the maximum discharge
@@ -17,99 +46,80 @@ def extract_hydrograph_data(file_path):
     current_wse = -float('inf')  # Initialize the current_wse variable
 
     with open(file_path, 'r') as file:
-        for line in file:
-            # Check for the line with maximum discharge information
-            if 'THE MAXIMUM DISCHARGE FROM CROSS SECTION' in line:
-                match = re.search(r'THE MAXIMUM DISCHARGE FROM CROSS SECTION\s*(\d+) IS:\s*([\d.]+) CFS AT TIME:\s*([\d.]+)', line)
-                if match:
-                    section = int(match.group(1))
-                    max_discharge = float(match.group(2))
-                    max_time = float(match.group(3))
-                    max_discharge_info[section] = (max_time, max_discharge)
-                continue
-
-            # Check for the line with maximum water surface elevation information
-            if 'MAXIMUM WATER SURFACE ELEVATION AT CROSS SECTION' in line:
-                match = re.search(r'MAXIMUM WATER SURFACE ELEVATION AT CROSS SECTION\s*(\d+)\s*IS:\s*([\d.]+)', line)
-                if match:
-                    section = int(match.group(1))
-                    max_wse = float(match.group(2))
-                    max_wse_info[section] = max_wse
-                continue
-
-            # Check for the start of a hydrograph section
-            if 'HYDROGRAPH AND FLOODPLAIN HYDRAULICS' in line:
-                match = re.search(r'FOR CROSS SECTION NO:\s*(\d+)', line)
-                if match:
-                    current_section = int(match.group(1))
-                    hydrograph_data[current_section] = []
-                    current_wse = -float('inf')  # Reset for new section
-                continue
-
-            # Detect the start of the data (after the column headers)
-            if 'TIME' in line and 'DISCHARGE' in line:
-                continue  # Skip the header line
-
-            # Extract data if in a data section
-            if current_section is not None:
-                try:
-                    parts = line.split()
-                    time = float(parts[0])
-                    wse = float(parts[3])  # Extract WS ELEV
-                    discharge = float(parts[5])
-                    hydrograph_data[current_section].append((time, discharge))
-                    if wse > current_wse:
-                        current_wse = wse
-                    max_wse_info[current_section] = current_wse
-                except (IndexError, ValueError):
-                    # Handle lines that do not contain valid data
-                    continue
-
-    # Convert lists to pandas DataFrames and integrate max discharge
-    for section in hydrograph_data:
-        df = pd.DataFrame(hydrograph_data[section], columns=['Time', 'Discharge'])
+        text = file.read()
+
+    # Data rows lie between the header/summary lines; each stretch is converted by NumPy in one go
+    position = 0
+    for match in [*HYCROSS_PATTERN.finditer(text), None]:
+        if current_section is not None:
+            rows = parse_hydrograph_rows(text, position, match.start() if match else len(text))
+            if len(rows):
+                hydrograph_data[current_section].append(rows)
+                current_wse = max(current_wse, rows[:, 1].max())
+                max_wse_info[current_section] = current_wse
+
+        if match is None:
+            break
+        position = match.end()
+        kind = match.lastgroup
+
+        # Line with maximum discharge information
+        if kind == 'max_discharge':
+            max_discharge_info[int(match['q_section'])] = (float(match['q_time']), float(match['q_value']))
+
+        # Line with maximum water surface elevation information
+        elif kind == 'max_wse':
+            max_wse_info[int(match['wse_section'])] = float(match['wse_value'])
+
+        # Start of a hydrograph section
+        elif kind == 'section':
+            current_section = int(match['section_no'])
+            hydrograph_data[current_section] = []
+            current_wse = -float('inf')  # Reset for new section
+
+    # Integrate max discharge into the raw arrays, then build each DataFrame once
+    for section, blocks in hydrograph_data.items():
+        rows = np.concatenate(blocks) if blocks else np.empty((0, 3))
+        times, discharge = rows[:, 0], rows[:, 2]
         if section in max_discharge_info:
-            df = integrate_max_discharge_in_df(df, max_discharge_info[section])
-        hydrograph_data[section] = df
+            times, discharge = integrate_max_discharge(times, discharge, max_discharge_info[section])
+        hydrograph_data[section] = pd.DataFrame({'Time': times, 'Discharge': discharge})
 
     return hydrograph_data, max_wse_info
 
-def integrate_max_discharge_in_df(hydrograph_data, max_discharge_info):
+def integrate_max_discharge(times, discharge, max_discharge_info):
     """
-    Integrates the maximum discharge information into the DataFrame at its correct time position.
+    Integrates the maximum discharge information into the time and discharge arrays at its correct time position.
     """
     max_time, max_discharge = max_discharge_info
 
-    # Check if the max time already exists in the DataFrame
-    if max_time in hydrograph_data['Time'].values:
-        hydrograph_data.loc[hydrograph_data['Time'] == max_time, 'Discharge'] = max_discharge
-    else:
-        # Insert a new row for the maximum discharge
-        new_row = pd.DataFrame({'Time': [max_time], 'Discharge': [max_discharge]})
-        hydrograph_data = pd.concat([hydrograph_data, new_row], ignore_index=True)
-        hydrograph_data = hydrograph_data.sort_values(by='Time').reset_index(drop=True)
-
-    return hydrograph_data
+    # If the max time is already reported, its discharge is replaced; otherwise a row is inserted in time order
+    at_max_time = times == max_time
+    if at_max_time.any():
+        return times, np.where(at_max_time, max_discharge, discharge)
+    order = np.argsort(np.append(times, max_time), kind='stable')
+    return np.append(times, max_time)[order], np.append(discharge, max_discharge)[order]
 
 def export_hydrographs_to_excel_with_plots(hydrograph_data, max_wse_info, file_path):
     """
     Exports hydrograph data to an Excel file with each cross section's data and an integrated plot on the same sheet.
     """
-    with pd.ExcelWriter(file_path, engine='xlsxwriter') as writer:
+    # Columns go straight to xlsxwriter instead of through pandas' per-cell Excel formatter
+    workbook = xlsxwriter.Workbook(file_path)
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    try:
         for section, data in hydrograph_data.items():
             # Export data
             sheet_name = f"Section {section}"
-            data.to_excel(writer, sheet_name=sheet_name, index=False)
-
-            # Access the workbook and the sheet
-            workbook = writer.book
-            worksheet = writer.sheets[sheet_name]
+            worksheet = workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, list(data.columns), header_format)
+            worksheet.write_column(1, 0, data['Time'].to_numpy().tolist())
+            worksheet.write_column(1, 1, data['Discharge'].to_numpy().tolist())
 
             # Create a chart object
-            line_chart = workbook.add_chart({'type': 'line'})
-            line_chart.set_title({'name': f"Hydrograph for Section {section}"})
-            line_chart.set_y_axis({'name': 'Discharge (cfs)'})
-            line_chart.set_x_axis({'name': 'Time (hours)'})
+            line_chart = workbook.add_chart(CHART_TYPE)
+            line_chart.set_y_axis(CHART_Y_AXIS)
+            line_chart.set_x_axis(CHART_X_AXIS)
 
             # Data for the chart
             line_chart.add_series({
@@ -118,21 +128,25 @@ def export_hydrographs_to_excel_with_plots(hydrograph_data, max_wse_info, file_p
                 'name': 'Discharge'
             })
 
-            # Find max discharge and its time
-            max_discharge = data['Discharge'].max()
-            max_time = data[data['Discharge'] == max_discharge]['Time'].iloc[0]
+            # Find max discharge and its time (first peak) in one scan
+            discharge = data['Discharge'].to_numpy()
+            peak_idx = discharge.argmax()
+            max_discharge = discharge[peak_idx]
+            max_time = data['Time'].to_numpy()[peak_idx]
             max_wse = max_wse_info.get(section, 'N/A')
 
             # Add labels to the chart
             peak_discharge_label = f"Qp = {max_discharge:.2f} cfs"
             time_to_peak_label = f"Tp = {max_time:.2f} hrs"
             max_wse_label = f"Max WSE = {max_wse:.2f} ft"
-            line_chart.set_size({'width': 600, 'height': 400})
-            line_chart.set_legend({'position': 'none'})
+            line_chart.set_size(CHART_SIZE)
+            line_chart.set_legend(CHART_LEGEND)
             line_chart.set_title({'name': f"Hydrograph for Section {section}\n{peak_discharge_label}, {time_to_peak_label}, {max_wse_label}"})
 
             # Place the chart on the sheet
             worksheet.insert_chart('E2', line_chart)
+    finally:
+        workbook.close()
 
 def create_pdf_plots(hydrograph_data, max_wse_info, output_pdf_path):
     """
@@ -142,22 +156,29 @@ def create_pdf_plots(hydrograph_data, max_wse_info, output_pdf_path):
         sections = list(hydrograph_data.keys())
         num_pages = (len(sections) + 3) // 4
 
-        for page in range(num_pages):
-            fig, axs = plt.subplots(2, 2, figsize=(8.5, 11))
-            fig.subplots_adjust(hspace=0.4, wspace=0.3)
-            axs = axs.flatten()
+        # One figure is reused for every page; its axes are cleared and redrawn per page
+        fig, axs = plt.subplots(2, 2, figsize=(8.5, 11))
+        fig.subplots_adjust(hspace=0.4, wspace=0.3)
+        axs = axs.flatten()
 
+        for page in range(num_pages):
             for i in range(4):
+                axs[i].cla()
                 idx = page * 4 + i
                 if idx >= len(sections):
-                    break
+                    axs[i].set_visible(False)  # Hide unused subplots
+                    continue
+                axs[i].set_visible(True)
                 section = sections[idx]
                 data = hydrograph_data[section]
-                max_discharge = data['Discharge'].max()
-                max_time = data[data['Discharge'] == max_discharge]['Time'].iloc[0]
+                times = data['Time'].to_numpy()
+                discharge = data['Discharge'].to_numpy()
+                peak_idx = discharge.argmax()
+                max_discharge = discharge[peak_idx]
+                max_time = times[peak_idx]
                 max_wse = max_wse_info.get(section, 'N/A')
                 
-                axs[i].plot(data['Time'], data['Discharge'], label='Discharge', color='blue')
+                axs[i].plot(times, discharge, label='Discharge', color='blue')
                 axs[i].set_title(f'Cross Section {section}')
                 axs[i].set_xlabel('Time (hours)')
                 axs[i].set_ylabel('Discharge (cfs)')
@@ -169,12 +190,9 @@ def create_pdf_plots(hydrograph_data, max_wse_info, output_pdf_path):
                 axs[i].text(0.05, 0.95, label, ha='left', va='top', transform=axs[i].transAxes, fontsize=8,
                             bbox=dict(facecolor='white', alpha=0.6))
 
-            # Remove unused subplots
-            for j in range(i + 1, 4):
-                fig.delaxes(axs[j])
-
             pdf.savefig(fig)
-            plt.close(fig)
+
+        plt.close(fig)
 
 # Main function to process the data and generate outputs
 def hycross_spreadsheet_and_plots(folder_path):
@@ -186,9 +204,10 @@ def hycross_spreadsheet_and_plots(folder_path):
     # Extracting hydrograph data
     hydrograph_data, max_wse_info = extract_hydrograph_data(file_path)
 
-    # Exporting to Excel
-    export_hydrographs_to_excel_with_plots(hydrograph_data, max_wse_info, output_excel_path)
-
-    # Creating and saving plots to PDF
-    create_pdf_plots(hydrograph_data, max_wse_info, output_pdf_path)
+    # Exporting to Excel and creating the PDF plots are independent, so they run side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        excel_future = executor.submit(export_hydrographs_to_excel_with_plots, hydrograph_data, max_wse_info, output_excel_path)
+        pdf_future = executor.submit(create_pdf_plots, hydrograph_data, max_wse_info, output_pdf_path)
+        excel_future.result()
+        pdf_future.result()
 
@@ -1,41 +1,44 @@
 # fpxsec_vectorization.py
 
 import os
-import pandas as pd
+import numpy as np
 import geopandas as gpd
-from shapely.geometry import Point, LineString
+from shapely.geometry import LineString
 from modules.utilities import time_function
 import logging
 
 def filter_model_data(model_data):
     """Filter model data for non-zero fpxsec values and return sorted unique fpxsec IDs."""
-    fpxsec_grids = model_data[pd.notna(model_data['fpxsec'])]
-    fpxsec_grids['fpxsec'] = fpxsec_grids['fpxsec'].astype(int)
+    # fpxsec is int32 with 0 marking cells outside every cross section
+    fpxsec_grids = model_data[model_data['fpxsec'].to_numpy() > 0]
     fpxsec_ids = fpxsec_grids['fpxsec'].drop_duplicates().sort_values()
     return fpxsec_ids
 
 
 def create_linestring_from_data(df, fpxsec_id):
     """Create a LineString geometry from dataframe coordinates."""
-    points = [Point(float(row['x']), float(row['y'])) for _, row in df.iterrows()]
-    if len(points) > 1:
-        return LineString(points)
+    # LineString takes the (n, 2) coordinate array directly; no per-row Point objects
+    coords = df[['x', 'y']].to_numpy(dtype=np.float64)
+    if len(coords) > 1:
+        return LineString(coords)
     else:
         return None
 
 
 def create_geodataframe(fpxsec_ids, model_data, fpxsec_results):
     """Create a GeoDataFrame with LineStrings and corresponding attributes."""
+    # Results are looked up by id (first row per id) and the cells are grouped in one pass
+    results_idx = fpxsec_results[~fpxsec_results['fpxs_id'].duplicated()].set_index('fpxs_id', drop=False)
+    sections = model_data[model_data['fpxsec'].isin(fpxsec_ids)].groupby('fpxsec', sort=True)
+
     rows = []
-    for fpxsec_id in fpxsec_ids:
-        df = model_data[model_data['fpxsec'] == fpxsec_id]
+    for fpxsec_id, df in sections:
+        if fpxsec_id not in results_idx.index:
+            continue
         line = create_linestring_from_data(df, fpxsec_id)
         if line is None:
             continue
-        if fpxsec_id not in fpxsec_results['fpxs_id'].values:
-            continue
-        result_row = fpxsec_results.loc[fpxsec_results['fpxs_id'] == fpxsec_id].iloc[0]
-        row = result_row.to_dict()
+        row = results_idx.loc[fpxsec_id].to_dict()
         row['geometry'] = line
         rows.append(row)
 
@@ -50,7 +53,7 @@ def save_geodataframe(gdf, f_path, coord_system, output_format, logger):
     Args:
         gdf (GeoDataFrame): The GeoDataFrame to save.
         f_path (str): Base path to save the file.
-        coord_system (int): EPSG code for the coordinate system.
+        coord_system (int or pyproj.CRS): EPSG code or CRS for the coordinate system.
         output_format (str): "Shapefile" or "GeoPackage".
         logger (logging.Logger): Logger instance.
     
@@ -63,7 +66,7 @@ def save_geodataframe(gdf, f_path, coord_system, output_format, logger):
     if output_format == "Shapefile":
         output_file = os.path.join(output_dir, 'fpxsec.shp')
         try:
-            gdf.to_file(output_file, driver="ESRI Shapefile", crs=f"EPSG:{coord_system}")
+            gdf.to_file(output_file, driver="ESRI Shapefile")
             logger.info(f"FLO-2D FPXSEC Shapefile created at: {output_file}")
         except Exception as e:
             logger.error(f"Failed to create Shapefile: {str(e)}")
@@ -71,7 +74,7 @@ def save_geodataframe(gdf, f_path, coord_system, output_format, logger):
     elif output_format == "GeoPackage":
         output_file = os.path.join(output_dir, 'fpxsec.gpkg')
         try:
-            gdf.to_file(output_file, driver="GPKG", crs=f"EPSG:{coord_system}")
+            gdf.to_file(output_file, driver="GPKG")
             logger.info(f"FLO-2D FPXSEC GeoPackage created at: {output_file}")
         except Exception as e:
             logger.error(f"Failed to create GeoPackage: {str(e)}")
@@ -90,7 +93,7 @@ def create_fpxsec_shapefile(f_path, coord_system, model_data, fpxsec_results, ou
 
     Args:
         f_path (str): Path to the FLO-2D project directory.
-        coord_system (int): EPSG code for the coordinate system.
+        coord_system (int or pyproj.CRS): EPSG code or CRS for the coordinate system.
         model_data (DataFrame): Extracted model data.
         fpxsec_results (DataFrame): Extracted FPXSEC results.
         output_format (str): Desired output format ("Shapefile" or "GeoPackage").
@@ -102,7 +105,7 @@ def create_fpxsec_shapefile(f_path, coord_system, model_data, fpxsec_results, ou
 
     fpxsec_ids = filter_model_data(model_data)
     gdf = create_geodataframe(fpxsec_ids, model_data, fpxsec_results)
-    gdf.crs = f"EPSG:{coord_system}"
+    gdf.crs = coord_system
 
     if gdf.empty:
         logger.warning("No FPXSEC data to save. GeoDataFrame is empty.")
@@ -1,3 +1,4 @@
+import math
 import geopandas as gpd
 from shapely.geometry import Point
 from modules.utilities import time_function
@@ -9,10 +10,11 @@ def convertToGeoDataFrame(df):
     return geo_df
 
 @time_function
-def calculate_cell_size(geo_df):
-    if len(geo_df) < 2:
-        raise ValueError("The GeoDataFrame should contain at least two points.")
-    point1 = geo_df.geometry.iloc[0]
-    point2 = geo_df.geometry.iloc[1]
-    cell_size = point1.distance(point2)
+def calculate_cell_size(df):
+    # Distance between the first two grid cells, straight from the x/y columns (no geometry needed)
+    if len(df) < 2:
+        raise ValueError("The DataFrame should contain at least two points.")
+    x = df['x'].to_numpy()
+    y = df['y'].to_numpy()
+    cell_size = math.hypot(x[1] - x[0], y[1] - y[0])
     return cell_size
@@ -1,23 +1,22 @@
 import os
 import re
+import numpy as np
 import pandas as pd
-from modules.utilities import time_function
-
-# Regular expression patterns
-Q_MAX_PATTERN = re.compile(r'MAXIMUM DISCHARGE FROM CROSS SECTION\s+\d+\s+IS:\s+(\d+\.\d+)\s+CFS')
-TIME_MAX_PATTERN = re.compile(r'AT TIME:\s+(\d+\.\d+)\s+HOURS')
-VOL_PATTERN = re.compile(r'VOLUME OF DISCHARGE IS:\s+(\d+\.\d+)\s+AF')
-HYDROGRAPH_PATTERN = re.compile(r'^\s*(\d+\.\d+)', re.MULTILINE)
-
-def read_file(file_path):
-    with open(file_path, 'r') as file:
-        return file.read()
+from modules.utilities import time_function, mapped_file
 
+# Regular expression patterns; bytes patterns so they run directly on the memory-mapped file
+Q_MAX_PATTERN = re.compile(rb'MAXIMUM DISCHARGE FROM CROSS SECTION\s+\d+\s+IS:\s+(\d+\.\d+)\s+CFS')
+TIME_MAX_PATTERN = re.compile(rb'AT TIME:\s+(\d+\.\d+)\s+HOURS')
+VOL_PATTERN = re.compile(rb'VOLUME OF DISCHARGE IS:\s+(\d+\.\d+)\s+AF')
+HYDROGRAPH_PATTERN = re.compile(rb'^\s*(\d+\.\d+)', re.MULTILINE)
+# Hydrograph rows with at least four fields: TIME (field 0) and WS ELEV (field 3)
+WSE_ROW_PATTERN = re.compile(rb'^[ \t]*([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)[ \t]+\S+[ \t]+\S+[ \t]+([-+]?\d*\.?\d+(?:[eE][-+]?\d+)?)(?!\S)', re.MULTILINE)
 
 def extract_max_q_vol_time(file_lines):
-    q_max = re.findall(Q_MAX_PATTERN, file_lines)
-    time_max = re.findall(TIME_MAX_PATTERN, file_lines)
-    vol = re.findall(VOL_PATTERN, file_lines)
+    # Only the captured values are decoded; they stay strings as before
+    q_max = [value.decode() for value in Q_MAX_PATTERN.findall(file_lines)]
+    time_max = [value.decode() for value in TIME_MAX_PATTERN.findall(file_lines)]
+    vol = [value.decode() for value in VOL_PATTERN.findall(file_lines)]
 
     data = {
         'fpxs_id': list(range(1, len(q_max) + 1)),
@@ -29,7 +28,7 @@ def extract_max_q_vol_time(file_lines):
 
 
 def get_start_end_time(file_content):
-    hydrograph_times = re.findall(HYDROGRAPH_PATTERN, file_content)
+    hydrograph_times = HYDROGRAPH_PATTERN.findall(file_content)
 
     if hydrograph_times:
         hydrograph_times = [float(t) for t in hydrograph_times]
@@ -40,31 +39,33 @@ def get_start_end_time(file_content):
     
 
 def extract_max_wse(file_content, start_time, end_time):
-    wse_max_values = []
-    wse = []
+    if start_time is None or start_time == end_time:
+        return []
 
-    for line in file_content.split('\n'):
-        splt = line.split()
+    rows = np.array(WSE_ROW_PATTERN.findall(file_content), dtype=bytes).reshape(-1, 2).astype(np.float64)
+    times, wse = rows[:, 0], rows[:, 1]
+    in_range = (times >= start_time) & (times <= end_time)
+    times, wse = times[in_range], wse[in_range]
 
-        try:
-            if splt and len(splt) > 3 and float(splt[0]) == start_time:
-                wse = [float(splt[3])]
-            elif splt and len(splt) > 3 and start_time < float(splt[0]) < end_time:
-                wse.append(float(splt[3]))
-            elif splt and len(splt) > 3 and float(splt[0]) == end_time:
-                wse_max_values.append(max(wse))
-        except ValueError as e:
-            continue
+    # Each start_time row opens a section; an end_time row reports the highest WSE of the rows since
+    # that start and up to itself, not counting end rows. A running maximum per section therefore
+    # ignores rows that come after an end row unless another end row follows in the same section.
+    is_end = times == end_time
+    section = np.cumsum(times == start_time)
+    running_max = pd.Series(np.where(is_end, -np.inf, wse)).groupby(section).cummax().to_numpy()
 
-    return wse_max_values
+    # An end row with no data rows before it in its section has no maximum
+    wse_max = running_max[is_end]
+    wse_max[np.isneginf(wse_max)] = np.nan
+    return wse_max.tolist()
 
 
 @time_function
 def extract_fpxsec_results(file_path):
-    file_content = read_file(os.path.join(file_path, 'HYCROSS.OUT'))
-    start_time, end_time = get_start_end_time(file_content)
-    wse_max_values = extract_max_wse(file_content, start_time, end_time)
-    fpxsec_results = extract_max_q_vol_time(file_content)
+    with mapped_file(os.path.join(file_path, 'HYCROSS.OUT')) as file_content:
+        start_time, end_time = get_start_end_time(file_content)
+        wse_max_values = extract_max_wse(file_content, start_time, end_time)
+        fpxsec_results = extract_max_q_vol_time(file_content)
 
     if len(wse_max_values) == len(fpxsec_results):
         fpxsec_results['wse_max'] = wse_max_values
@@ -1,8 +1,23 @@
 import pandas as pd
+import numpy as np
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
 import re
 import os
+from concurrent.futures import ThreadPoolExecutor
+import xlsxwriter
+from modules.utilities import mapped_file
+
+# Bytes patterns so they run directly on the memory-mapped HYDROSTRUCT.OUT
+STRUCTURE_HEADER_PATTERN = re.compile(rb'THE MAXIMUM DISCHARGE FOR:\s+(\S+)\s+')
+DATA_ROW_PATTERN = re.compile(rb'^[ \t]*(\d+\.\d+)[ \t]+(-?\d+\.\d+)[ \t]+(-?\d+\.\d+)', re.MULTILINE)
+
+# Chart options shared by every structure's hydrograph chart
+CHART_TYPE = {'type': 'line'}
+CHART_X_AXIS = {'name': 'Time (hrs)', 'label_position': 'low'}
+CHART_Y_AXIS = {'name': 'Discharge (cfs)'}
+CHART_LEGEND = {'position': 'bottom'}
+CHART_SIZE = {'width': 960, 'height': 576}
 
 def parse_hydrograph_data(folder_path):
     """
@@ -15,27 +30,17 @@ def parse_hydrograph_data(folder_path):
     """
     file_path = os.path.join(folder_path, 'HYDROSTRUCT.OUT')
     hydrograph_data = {}
-    current_structure = None
-    current_data = []
-    structure_header_re = re.compile(r'THE MAXIMUM DISCHARGE FOR:\s+(\S+)\s+')
-    data_row_re = re.compile(r'^\s*(\d+\.\d+)\s+(-?\d+\.\d+)\s+(-?\d+\.\d+)')
-    with open(file_path, 'r') as file:
-        for line in file:
-            header_match = structure_header_re.search(line)
-            if header_match:
-                if current_structure and current_data:
-                    df = pd.DataFrame(current_data, columns=['Time (Hrs)', 'Inflow (CFS)', 'Outflow (CFS)'])
-                    hydrograph_data[current_structure] = df
-                    current_data = []
-                current_structure = header_match.group(1)
-            else:
-                data_match = data_row_re.search(line)
-                if data_match:
-                    time, inflow, outflow = data_match.groups()
-                    current_data.append([float(time), float(inflow), float(outflow)])
-        if current_structure and current_data:
-            df = pd.DataFrame(current_data, columns=['Time (Hrs)', 'Inflow (CFS)', 'Outflow (CFS)'])
-            hydrograph_data[current_structure] = df
+    with mapped_file(file_path) as buffer:
+        # Each structure's rows run from its header to the next header (or the end of the file)
+        headers = list(STRUCTURE_HEADER_PATTERN.finditer(buffer))
+        for header, next_header in zip(headers, headers[1:] + [None]):
+            end = next_header.start() if next_header else len(buffer)
+            rows = DATA_ROW_PATTERN.findall(buffer, header.end(), end)
+            if rows:
+                # NumPy converts the structure's matched fields in one call
+                current_data = np.array(rows, dtype=bytes).astype(np.float64)
+                df = pd.DataFrame(current_data, columns=['Time (Hrs)', 'Inflow (CFS)', 'Outflow (CFS)'])
+                hydrograph_data[header.group(1).decode()] = df
     return hydrograph_data
 
 def hydrostruct_hydrographs_to_excel(hydrograph_data, output_folder):
@@ -49,16 +54,22 @@ def hydrostruct_hydrographs_to_excel(hydrograph_data, output_folder):
     output_folder (str): Folder where the output Excel file will be saved.
     """
     output_file = f'{output_folder}/hydrostruct_hydrographs.xlsx'
-    with pd.ExcelWriter(output_file, engine='xlsxwriter') as writer:
+    # Columns go straight to xlsxwriter instead of through pandas' per-cell Excel formatter
+    workbook = xlsxwriter.Workbook(output_file)
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    try:
         for structure, data in hydrograph_data.items():
-            data.to_excel(writer, sheet_name=structure, index=False, startrow=3)
-            workbook = writer.book
-            worksheet = writer.sheets[structure]
+            worksheet = workbook.add_worksheet(structure)
+            worksheet.write_row(3, 0, list(data.columns), header_format)
+            for col_idx, column in enumerate(data.columns):
+                worksheet.write_column(4, col_idx, data[column].to_numpy().tolist())
             
-            peak_inflow_time = data['Time (Hrs)'][data['Inflow (CFS)'].idxmax()]
-            peak_inflow_value = data['Inflow (CFS)'].max()
+            inflow = data['Inflow (CFS)'].to_numpy()
+            peak_idx = inflow.argmax()
+            peak_inflow_time = data['Time (Hrs)'].to_numpy()[peak_idx]
+            peak_inflow_value = inflow[peak_idx]
 
-            chart = workbook.add_chart({'type': 'line'})
+            chart = workbook.add_chart(CHART_TYPE)
             chart.add_series({
                 'name': 'Outflow',
                 'categories': f'={structure}!$A$5:$A${len(data)+4}',
@@ -72,16 +83,18 @@ def hydrostruct_hydrographs_to_excel(hydrograph_data, output_folder):
                 'line': {'color': 'red'}
             })
             chart.set_title({'name': f'{structure}'})
-            chart.set_x_axis({'name': 'Time (hrs)', 'label_position': 'low'})
-            chart.set_y_axis({'name': 'Discharge (cfs)'})
-            chart.set_legend({'position': 'bottom'})
-            chart.set_size({'width': 960, 'height': 576})
+            chart.set_x_axis(CHART_X_AXIS)
+            chart.set_y_axis(CHART_Y_AXIS)
+            chart.set_legend(CHART_LEGEND)
+            chart.set_size(CHART_SIZE)
             worksheet.insert_chart('E1', chart)
             
             worksheet.write('A1', 'Peak Discharge (cfs)')
             worksheet.write('B1', peak_inflow_value)
             worksheet.write('A2', 'Time to Peak (hrs)')
             worksheet.write('B2', peak_inflow_time)
+    finally:
+        workbook.close()
 
 def hydrostruct_pdf_plots(hydrograph_data, output_pdf_path):
     """
@@ -92,22 +105,29 @@ def hydrostruct_pdf_plots(hydrograph_data, output_pdf_path):
         structures = list(hydrograph_data.keys())
         num_pages = (len(structures) + 3) // 4
 
-        for page in range(num_pages):
-            fig, axs = plt.subplots(2, 2, figsize=(8.5, 11))
-            fig.subplots_adjust(hspace=0.4, wspace=0.3)
-            axs = axs.flatten()
+        # One figure is reused for every page; its axes are cleared and redrawn per page
+        fig, axs = plt.subplots(2, 2, figsize=(8.5, 11))
+        fig.subplots_adjust(hspace=0.4, wspace=0.3)
+        axs = axs.flatten()
 
+        for page in range(num_pages):
             for i in range(4):
+                axs[i].cla()
                 idx = page * 4 + i
                 if idx >= len(structures):
-                    break
+                    axs[i].set_visible(False)  # Hide unused subplots
+                    continue
+                axs[i].set_visible(True)
                 structure = structures[idx]
                 data = hydrograph_data[structure]
-                peak_inflow_time = data['Time (Hrs)'][data['Inflow (CFS)'].idxmax()]
-                peak_inflow_value = data['Inflow (CFS)'].max()
+                times = data['Time (Hrs)'].to_numpy()
+                inflow = data['Inflow (CFS)'].to_numpy()
+                peak_idx = inflow.argmax()
+                peak_inflow_time = times[peak_idx]
+                peak_inflow_value = inflow[peak_idx]
 
-                axs[i].plot(data['Time (Hrs)'], data['Inflow (CFS)'], label='Inflow', color='blue')
-                axs[i].plot(data['Time (Hrs)'], data['Outflow (CFS)'], label='Outflow', color='red')
+                axs[i].plot(times, inflow, label='Inflow', color='blue')
+                axs[i].plot(times, data['Outflow (CFS)'].to_numpy(), label='Outflow', color='red')
                 axs[i].set_title(f'{structure}')
                 axs[i].set_xlabel('Time (hrs)')
                 axs[i].set_ylabel('Discharge (cfs)')
@@ -117,16 +137,17 @@ def hydrostruct_pdf_plots(hydrograph_data, output_pdf_path):
                 axs[i].text(0.05, 0.80, label, ha='left', va='top', transform=axs[i].transAxes, fontsize=8,
                             bbox=dict(facecolor='white', alpha=0.6))
 
-            # Remove unused subplots
-            for j in range(i + 1, 4):
-                fig.delaxes(axs[j])
-
             pdf.savefig(fig)
-            plt.close(fig)
+
+        plt.close(fig)
 
 # Main function to process the data and generate outputs
 def hydrostruct_spreadsheet_and_plots(folder_path, hydrograph_data):
     out_folder_path = os.path.join(folder_path, 'flo2d_plots')
-    hydrostruct_hydrographs_to_excel(hydrograph_data, out_folder_path)
-    hydrostruct_pdf_plots(hydrograph_data, os.path.join(out_folder_path, 'hydrostruct_plots.pdf'))
+    # The workbook and the PDF are independent outputs, so they are written side by side
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        excel_future = executor.submit(hydrostruct_hydrographs_to_excel, hydrograph_data, out_folder_path)
+        pdf_future = executor.submit(hydrostruct_pdf_plots, hydrograph_data, os.path.join(out_folder_path, 'hydrostruct_plots.pdf'))
+        excel_future.result()
+        pdf_future.result()
 
@@ -1,35 +1,68 @@
 import os
+import numpy as np
 import pandas as pd
 import re
-from modules.utilities import time_function
+from modules.utilities import time_function, mapped_file
+
+# HYSTRUC.DAT records: S (structure name and optional fields), F (culvert, five fields) and T (rating curve stage/flow)
+HYSTRUC_RECORD_PATTERN = re.compile(
+    rb'^[ \t]*(?:(?P<S>S[ \t]+\S+[^\r\n]*)|(?P<F>F(?:[ \t]+\S+){5})|(?P<T>T[ \t]+[\d.]+[ \t]+[\d.]+))', re.MULTILINE)
+
+# Fields that follow the structure name on an S record; any left off the end of the line are None
+STRUCTURE_FIELDS = [
+    ('IFPROCHAN', int),
+    ('ICURVETABLE', int),
+    ('Inflow Node', int),
+    ('Outflow Node', int),
+    ('INOUTCONT', int),
+    ('HEADREFEL', float),
+    ('CLENGTH', float),
+    ('CDIAMETER', float)
+]
+
+# HYDROSTRUCT.OUT summary line: structure name, peak discharge and time of peak
+MAX_DISCHARGE_PATTERN = re.compile(r'THE MAXIMUM DISCHARGE FOR:[ \t]+(\S+)[ \t]+IS:[ \t]+([\d.]+)[ \t]+CFS[ \t]+AT[ \t]+TIME:[ \t]+([\d.]+)')
+
+def append_rating_curve(rating_curves, structure_name, structure_data):
+    # structure_data holds the raw (stage, flow) byte fields; NumPy converts the whole curve at once
+    if structure_name and structure_data:
+        values = np.array(structure_data, dtype=bytes).astype(np.float64)
+        rating_curves.append({
+            "Structure": structure_name,
+            "Data": pd.DataFrame(values, columns=["Stage", "Flow"])
+        })
 
 @time_function
 def extract_hystruc_results(file_path):
     hystruc_file_path = os.path.join(file_path, 'HYSTRUC.DAT')
     hydrostruct_file_path = os.path.join(file_path, 'HYDROSTRUCT.OUT')
 
-    # Extract data from HYSTRUC.DAT file
-    with open(hystruc_file_path, 'r') as file:
-        lines = file.readlines()
+    # Extract data from HYSTRUC.DAT file; one byte-level scan picks out the S, F and T records
+    with mapped_file(hystruc_file_path) as buffer:
+        records = [(match.lastgroup, match.group(match.lastgroup).split())
+                   for match in HYSTRUC_RECORD_PATTERN.finditer(buffer)]
 
+    # The structure table and the rating curves (stage-flow data per structure) are built in the same pass
     structures = {}
+    rating_curves = []
+    structure_data = []
+    structure_name = None
 
-    for line in lines:
-        line = line.strip().split()
+    for record_type, line in records:
+        if record_type == 'T':
+            structure_data.append(line[1:3])
 
-        if line[0] == 'S':
-            structure_name = line[1]
+        elif record_type == 'S':
+            # A new structure closes the previous structure's rating curve
+            append_rating_curve(rating_curves, structure_name, structure_data)
+            structure_data = []
+            structure_name = line[1].decode()
             if structure_name not in structures:
+                fields = line[2:]
                 structures[structure_name] = {
                     'Structure Name': structure_name,
-                    'IFPROCHAN': int(line[2]),
-                    'ICURVETABLE': int(line[3]),
-                    'Inflow Node': int(line[4]),
-                    'Outflow Node': int(line[5]),
-                    'INOUTCONT': int(line[6]),
-                    'HEADREFEL': float(line[7]),
-                    'CLENGTH': float(line[8]),
-                    'CDIAMETER': float(line[9]),
+                    **{name: convert(fields[i]) if i < len(fields) else None
+                       for i, (name, convert) in enumerate(STRUCTURE_FIELDS)},
                     'TYPEC': None,
                     'TYPEEN': None,
                     'CULVERTN': None,
@@ -37,7 +70,7 @@ def extract_hystruc_results(file_path):
                     'CUBASE': None
                 }
 
-        elif line[0] == 'F' and structure_name in structures:
+        elif record_type == 'F' and structure_name in structures:
             structures[structure_name].update({
                 'TYPEC': int(line[1]),
                 'TYPEEN': int(line[2]),
@@ -46,83 +79,22 @@ def extract_hystruc_results(file_path):
                 'CUBASE': float(line[5])
             })
 
+    append_rating_curve(rating_curves, structure_name, structure_data)
+
     # Extract peak discharge and time of peak discharge from HYDROSTRUCT.OUT file
     with open(hydrostruct_file_path, 'r') as file:
-        for line in file:
-            if 'THE MAXIMUM DISCHARGE FOR:' in line:
-                parts = line.split()
-                structure_index = parts.index('FOR:') + 1
-                structure_name = parts[structure_index]
-                is_index = parts.index('IS:')
-                peak_discharge = float(parts[is_index + 1])
-                at_time_index = parts.index('AT', is_index)
-                time_of_peak = float(parts[at_time_index + 2])
-                
-                if structure_name in structures:
-                    structures[structure_name].update({
-                        'Qpeak_cfs': peak_discharge,
-                        'Tpeak_hrs': time_of_peak
-                    })
-
-    # Extract rating curves
-    rating_curves = extract_rating_curves(hystruc_file_path)
+        for structure_name, peak_discharge, time_of_peak in MAX_DISCHARGE_PATTERN.findall(file.read()):
+            if structure_name in structures:
+                structures[structure_name].update({
+                    'Qpeak_cfs': float(peak_discharge),
+                    'Tpeak_hrs': float(time_of_peak)
+                })
 
     # Combine all extracted data
     df = pd.DataFrame(list(structures.values()))
 
     return df, rating_curves
 
-@time_function
-def extract_rating_curves(file_path):
-    """
-    Extract rating curves from the HYSTRUC.DAT file. Each curve contains stage-flow data.
-    
-    Args:
-    file_path (str): Path to the HYSTRUC.DAT file.
-
-    Returns:
-    list: A list of dictionaries where each entry contains the structure name and its associated rating curve data.
-    """
-    rating_curves = []
-    current_structure = None
-    structure_data = []
-
-    # Define regex patterns for identifying lines
-    structure_pattern = re.compile(r"^S\s+(\w+)")
-    data_pattern = re.compile(r"^T\s+([\d.]+)\s+([\d.]+)")
-    
-    with open(file_path, 'r') as file:
-        for line in file:
-            structure_match = structure_pattern.match(line)
-            data_match = data_pattern.match(line)
-            
-            if structure_match:
-                # If there was a previous structure with rating data, save it
-                if current_structure and structure_data:
-                    rating_curves.append({
-                        "Structure": current_structure,
-                        "Data": pd.DataFrame(structure_data, columns=["Stage", "Flow"])
-                    })
-                
-                # Start new structure
-                current_structure = structure_match.group(1)
-                structure_data = []  # Reset data for new structure
-            
-            elif data_match:
-                # Collect stage and flow data for the current structure
-                stage = float(data_match.group(1))
-                flow = float(data_match.group(2))
-                structure_data.append([stage, flow])
-        
-        # Append the last structure's data if it exists
-        if current_structure and structure_data:
-            rating_curves.append({
-                "Structure": current_structure,
-                "Data": pd.DataFrame(structure_data, columns=["Stage", "Flow"])
-            })
-    
-    return rating_curves
-
 # If you want to test the functions when the script is run directly
 if __name__ == "__main__":
     test_file_path = "path/to/your/HYSTRUC.DAT"  # Replace with an actual test file path
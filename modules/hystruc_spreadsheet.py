@@ -1,10 +1,15 @@
 import os
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
-from openpyxl import Workbook
-from openpyxl.chart import ScatterChart, Reference, Series
-from openpyxl.chart.marker import Marker
-from modules.utilities import time_function
+import xlsxwriter
+from modules.utilities import PDF_PLOT_RC, sanitize_sheet_name, time_function
+
+# Rating curve chart options shared by every structure's sheet
+CHART_TYPE = {'type': 'scatter', 'subtype': 'smooth_with_markers'}
+CHART_X_AXIS = {'name': 'Flow (cfs)'}
+CHART_Y_AXIS = {'name': 'Stage (ft)'}
+SERIES_LINE = {'color': '#4472C4', 'width': 1.5}
+SERIES_MARKER = {'type': 'circle', 'size': 7, 'fill': {'color': '#4472C4'}, 'border': {'color': '#4472C4'}}
 
 @time_function
 def plot_rating_curves_to_pdf(rating_curves, pdf_filename):
@@ -15,7 +20,7 @@ def plot_rating_curves_to_pdf(rating_curves, pdf_filename):
     rating_curves (list): A list of dictionaries containing structure names and data.
     pdf_filename (str): The output file path for the PDF.
     """
-    with PdfPages(pdf_filename) as pdf:
+    with plt.rc_context(PDF_PLOT_RC), PdfPages(pdf_filename) as pdf:
         # Prepare the plot layout: 2x2 grid on each page
         num_plots_per_page = 4
         fig, axes = plt.subplots(2, 2, figsize=(8.5, 11))
@@ -35,20 +40,19 @@ def plot_rating_curves_to_pdf(rating_curves, pdf_filename):
             # Move to next plot position
             plot_count += 1
             
-            # If we've filled the 2x2 grid, save the page and start a new one
+            # If we've filled the 2x2 grid, save the page and clear the axes for the next one
             if plot_count == num_plots_per_page:
-                pdf.savefig(fig)
-                plt.close(fig)
-                fig, axes = plt.subplots(2, 2, figsize=(8.5, 11))
-                fig.subplots_adjust(hspace=0.3, wspace=0.3)
+                pdf.savefig(fig, bbox_inches=None)
+                for ax in axes.flat:
+                    ax.cla()
                 plot_count = 0
         
         # Save any remaining plots on the final page
         if plot_count > 0:
             for remaining in range(plot_count, num_plots_per_page):
                 axes[remaining // 2, remaining % 2].axis('off')  # Turn off unused subplots
-            pdf.savefig(fig)
-            plt.close(fig)
+            pdf.savefig(fig, bbox_inches=None)
+        plt.close(fig)
 
 @time_function
 def create_rating_curve_spreadsheet(rating_curves, excel_filename):
@@ -60,46 +64,39 @@ def create_rating_curve_spreadsheet(rating_curves, excel_filename):
     rating_curves (list): A list of dictionaries containing structure names and data.
     excel_filename (str): The output file path for the Excel spreadsheet.
     """
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove the default sheet
-
-    for curve in rating_curves:
-        structure_name = curve["Structure"]
-        data = curve["Data"]
-
-        # Create a new worksheet for each structure
-        ws = wb.create_sheet(title=structure_name)
-
-        # Write data to the worksheet
-        ws.append(["Stage (ft)", "Discharge (cfs)"])
-        for _, row in data.iterrows():
-            ws.append([row["Stage"], row["Flow"]])
-
-        # Create a scatter plot
-        chart = ScatterChart()
-        chart.title = f"Rating Curve - {structure_name}"
-        chart.x_axis.title = "Flow (cfs)"
-        chart.y_axis.title = "Stage (ft)"
-
-        # Define data ranges for the chart
-        x_values = Reference(ws, min_col=2, min_row=2, max_row=len(data) + 1)
-        y_values = Reference(ws, min_col=1, min_row=2, max_row=len(data) + 1)
-
-        # Create a single series for both line and points
-        series = Series(y_values, x_values, title="Stage vs Discharge")
-        series.marker = Marker(symbol='circle', size=7)
-        series.marker.graphicalProperties.solidFill = "4472C4"  # Blue color
-        series.marker.graphicalProperties.line.solidFill = "4472C4"  # Blue outline
-        series.graphicalProperties.line.solidFill = "4472C4"  # Blue line
-        series.graphicalProperties.line.width = 20000  # Adjust line width (in EMUs)
-        series.smooth = True  # This creates a smoothed line
-        chart.series.append(series)
-
-        # Add the chart to the worksheet
-        ws.add_chart(chart, "D2")
-
-    # Save the workbook
-    wb.save(excel_filename)
+    # Columns and charts stream out through xlsxwriter instead of openpyxl's in-memory XML tree
+    workbook = xlsxwriter.Workbook(excel_filename)
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    sheet_names = set()
+    try:
+        for curve in rating_curves:
+            structure_name = curve["Structure"]
+            data = curve["Data"]
+
+            # Create a new worksheet for each structure and write its data
+            sheet_name = sanitize_sheet_name(structure_name, sheet_names)
+            worksheet = workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, ["Stage (ft)", "Discharge (cfs)"], header_format)
+            worksheet.write_column(1, 0, data["Stage"].to_numpy().tolist())
+            worksheet.write_column(1, 1, data["Flow"].to_numpy().tolist())
+
+            # Create a smoothed scatter plot with a single series for both line and points
+            chart = workbook.add_chart(CHART_TYPE)
+            chart.add_series({
+                'name': 'Stage vs Discharge',
+                'categories': [sheet_name, 1, 1, len(data), 1],
+                'values': [sheet_name, 1, 0, len(data), 0],
+                'line': SERIES_LINE,
+                'marker': SERIES_MARKER,
+            })
+            chart.set_title({'name': f"Rating Curve - {structure_name}"})
+            chart.set_x_axis(CHART_X_AXIS)
+            chart.set_y_axis(CHART_Y_AXIS)
+
+            # Add the chart to the worksheet
+            worksheet.insert_chart('D2', chart)
+    finally:
+        workbook.close()
 
 @time_function
 def hystruc_spreadsheet_and_plots(file_path, hystruc_df, rating_curves):
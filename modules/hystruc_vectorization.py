@@ -1,8 +1,9 @@
 # hystruc_vectorization.py
 
+import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import LineString
+import shapely
 import os
 from modules.utilities import time_function
 import logging
@@ -15,7 +16,7 @@ def create_hystruc_shapefile(hystruc_df, model_data_df, coord_system, output_pat
     Args:
         hystruc_df (DataFrame): Hydraulic structures data.
         model_data_df (DataFrame): Model data with 'grid_id', 'x', 'y' columns.
-        coord_system (int): EPSG code for spatial reference.
+        coord_system (int or pyproj.CRS): EPSG code or CRS for spatial reference.
         output_path (str): Directory path to save the output file.
         output_format (str): Desired output format ("Shapefile" or "GeoPackage").
 
@@ -24,23 +25,26 @@ def create_hystruc_shapefile(hystruc_df, model_data_df, coord_system, output_pat
     """
     logger = logging.getLogger('FLO2D_Postprocessor')
 
-    # Merge the hystruc dataframe with the model data dataframe to get x, y coordinates for inflow and outflow nodes
-    # This assumes the model_data_df has 'grid_id', 'x', 'y' columns
-    merged_df = pd.merge(hystruc_df, model_data_df[['grid_id', 'x', 'y']], left_on='Inflow Node', right_on='grid_id', how='left')
-    merged_df.rename(columns={'x': 'inflow_x', 'y': 'inflow_y'}, inplace=True)
-    merged_df = pd.merge(merged_df, model_data_df[['grid_id', 'x', 'y']], left_on='Outflow Node', right_on='grid_id', how='left', suffixes=('', '_outflow'))
-    merged_df.rename(columns={'x': 'outflow_x', 'y': 'outflow_y'}, inplace=True)
+    # Look up the x, y coordinates of the inflow and outflow nodes by position in model_data_df
+    # This assumes the model_data_df has unique 'grid_id' values and 'x', 'y' columns
+    grid_ids = model_data_df['grid_id'].to_numpy()
+    grid_index = pd.Index(grid_ids)
+    cell_xy = model_data_df[['x', 'y']].to_numpy(dtype=np.float64)
+    inflow_pos = grid_index.get_indexer(hystruc_df['Inflow Node'])
+    outflow_pos = grid_index.get_indexer(hystruc_df['Outflow Node'])
 
-    # Create a GeoDataFrame with a LineString from inflow to outflow for each structure
-    geometry = [
-        LineString([
-            (row['inflow_x'], row['inflow_y']),
-            (row['outflow_x'], row['outflow_y'])
-        ]) for index, row in merged_df.iterrows()
-        if not pd.isna(row['inflow_x']) and not pd.isna(row['outflow_x'])
-    ]
+    # Create a GeoDataFrame with a LineString from inflow to outflow for each structure whose nodes were both found
+    located = (inflow_pos >= 0) & (outflow_pos >= 0)
+    inflow_xy = cell_xy[inflow_pos[located]]
+    outflow_xy = cell_xy[outflow_pos[located]]
+    # Columns are added in the order the former merges produced them, so the output schema is unchanged
+    located_df = hystruc_df[located].assign(grid_id=grid_ids[inflow_pos[located]],
+                                           inflow_x=inflow_xy[:, 0], inflow_y=inflow_xy[:, 1],
+                                           grid_id_outflow=grid_ids[outflow_pos[located]],
+                                           outflow_x=outflow_xy[:, 0], outflow_y=outflow_xy[:, 1])
+    geometry = shapely.linestrings(np.stack([inflow_xy, outflow_xy], axis=1))
 
-    gdf = gpd.GeoDataFrame(merged_df, geometry=geometry, crs=f"EPSG:{coord_system}")
+    gdf = gpd.GeoDataFrame(located_df, geometry=geometry, crs=coord_system)
 
     if gdf.empty:
         logger.warning("No Hydraulic Structures data to save. GeoDataFrame is empty.")
@@ -49,7 +53,7 @@ def create_hystruc_shapefile(hystruc_df, model_data_df, coord_system, output_pat
     if output_format == "Shapefile":
         output_file = os.path.join(output_path, 'hydraulic_structures.shp')
         try:
-            gdf.to_file(output_file, driver="ESRI Shapefile", crs=f"EPSG:{coord_system}")
+            gdf.to_file(output_file, driver="ESRI Shapefile", engine="pyogrio")
             logger.info(f"Hydraulic Structures Shapefile created at: {output_file}")
         except Exception as e:
             logger.error(f"Failed to create Shapefile: {str(e)}")
@@ -57,7 +61,7 @@ def create_hystruc_shapefile(hystruc_df, model_data_df, coord_system, output_pat
     elif output_format == "GeoPackage":
         output_file = os.path.join(output_path, 'hydraulic_structures.gpkg')
         try:
-            gdf.to_file(output_file, driver="GPKG", crs=f"EPSG:{coord_system}")
+            gdf.to_file(output_file, driver="GPKG", engine="pyogrio")
             logger.info(f"Hydraulic Structures GeoPackage created at: {output_file}")
         except Exception as e:
             logger.error(f"Failed to create GeoPackage: {str(e)}")
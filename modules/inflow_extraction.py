@@ -1,58 +1,37 @@
 import re
+import numpy as np
 import pandas as pd
 import os
+from modules.utilities import mapped_file
+
+# F lines name the grid element; the H lines that follow hold its (time, flow) pairs
+INFLOW_RECORD_PATTERN = re.compile(rb'^(?:F[ \t]+\d+[ \t]+(\d+)|H[ \t]+([\d\.]+)[ \t]+([\d\.]+))', re.MULTILINE)
 
 def extract_inflow_hydrographs(folder_path):
     file_path = os.path.join(folder_path, 'INFLOW.DAT')
 
-    # Initialize variables
-    hydrograph_data = {}
-    current_grid_element = None
-    all_time_steps = set()  # To collect all unique time steps
-
-    # Regex patterns to identify grid elements and hydrograph data
-    grid_element_pattern = re.compile(r'F\s+\d+\s+(\d+)')
-    hydrograph_pattern = re.compile(r'H\s+([\d\.]+)\s+([\d\.]+)')
-
-    # Open the file and process it line by line
-    with open(file_path, 'r') as file:
-        for line in file:
-            # Check for grid element ID lines
-            grid_match = grid_element_pattern.match(line)
-            if grid_match:
-                current_grid_element = int(grid_match.group(1))
-                # Initialize an empty dictionary for this grid element if it's new
-                if current_grid_element not in hydrograph_data:
-                    hydrograph_data[current_grid_element] = {}
-
-            # Check for hydrograph data lines
-            hydrograph_match = hydrograph_pattern.match(line)
-            if hydrograph_match and current_grid_element is not None:
-                time_step = float(hydrograph_match.group(1))
-                flow_value = float(hydrograph_match.group(2))
-
-                # Add the time step to the set of all time steps
-                all_time_steps.add(time_step)
-
-                # Add the flow value for the current time step to the current grid element's data
-                hydrograph_data[current_grid_element][time_step] = flow_value
-
-    # Convert the time steps set to a sorted list for consistent indexing
-    sorted_time_steps = sorted(all_time_steps)
-
-    # Create a dictionary to hold the series data for each grid element
-    series_dict = {}
-
-    # Use pd.concat for more efficient data addition
-    for grid_element, hydrograph in hydrograph_data.items():
-        series_data = pd.Series(hydrograph, index=sorted_time_steps)
-        series_dict[grid_element] = series_data
-
-    # Create a DataFrame from the series dictionary
-    df_hydrographs = pd.concat(series_dict, axis=1)
-
-    # Fill missing data with 0 as default
-    df_hydrographs = df_hydrographs.fillna(0)
-    df_hydrographs.index.name = 'Time (hours)'
-
-    return df_hydrographs
\ No newline at end of file
+    # One scan of the memory-mapped file collects every F and H record as byte fields
+    with mapped_file(file_path) as buffer:
+        records = np.array(INFLOW_RECORD_PATTERN.findall(buffer), dtype=bytes).reshape(-1, 3)
+
+    # Carry each F line's grid element down to the H lines below it
+    is_grid = records[:, 0] != b''
+    owner = np.maximum.accumulate(np.where(is_grid, np.arange(len(records)), -1))
+    is_flow = ~is_grid & (owner >= 0)
+
+    # Time steps sorted, grid elements in file order (including those without H lines)
+    grid_elements = pd.unique(records[:, 0][is_grid].astype(np.int64))
+    time_steps, row_idx = np.unique(records[is_flow, 1].astype(np.float64), return_inverse=True)
+    col_idx = pd.Index(grid_elements).get_indexer(records[owner[is_flow], 0].astype(np.int64))
+    flow_values = records[is_flow, 2].astype(np.float64)
+
+    # A repeated time step for the same element keeps its last flow value
+    cell = row_idx.ravel() * len(grid_elements) + col_idx
+    _, last_from_end = np.unique(cell[::-1], return_index=True)
+    keep = len(cell) - 1 - last_from_end
+
+    # Scatter the flows straight into the table; missing data is 0
+    values = np.zeros((len(time_steps), len(grid_elements)))
+    values.ravel()[cell[keep]] = flow_values[keep]
+
+    return pd.DataFrame(values, index=pd.Index(time_steps, name='Time (hours)'), columns=grid_elements)
\ No newline at end of file
@@ -1,65 +1,85 @@
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
-import os
+import logging
+import xlsxwriter
+from modules.utilities import HAS_PYPDF, PDF_PLOT_RC, render_pdf_pages, write_sheet_rows
 
-# Function to create PDF plots
-def create_pdf_plots(hydrograph_data, output_pdf_path):
+def _draw_batch(axs, data_slice):
     """
-    Creates a PDF with 4 plots per page for the given hydrograph data.
-    Labels the max discharge and time of max discharge.
+    Draws one batch of hydrographs onto the given axes and hides the axes left over.
+
+    Args:
+        axs (np.ndarray): Flattened array of subplot axes.
+        data_slice (pd.DataFrame): Hydrograph columns for this batch, with time as index.
     """
-    grid_ids = hydrograph_data.columns  # Use the grid element IDs as column names
-    num_pages = (len(grid_ids) + 3) // 4  # 4 plots per page
-
-    with PdfPages(output_pdf_path) as pdf:
-        for page in range(num_pages):
-            fig, axs = plt.subplots(2, 2, figsize=(8.5, 11))
-            fig.subplots_adjust(hspace=0.4, wspace=0.3)
-            axs = axs.flatten()
-
-            for i in range(4):
-                idx = page * 4 + i
-                if idx >= len(grid_ids):
-                    break
-
-                grid_id = grid_ids[idx]
-                data = hydrograph_data[grid_id]
-                time = hydrograph_data.index
-
-                # Find max discharge and its corresponding time
-                max_discharge = data.max()
-                max_time = time[data == max_discharge][0]
-                
-                # Plotting
-                axs[i].plot(time, data, label='Discharge', color='blue')
-                axs[i].set_title(f'Grid ID {grid_id}')
-                axs[i].set_xlabel('Time (hours)')
-                axs[i].set_ylabel('Flow (cfs)')
-                axs[i].grid(True)
-
-                # Annotate with peak flow info
-                label = f'Peak Discharge: {max_discharge:.2f} cfs\nTime of Peak: {max_time:.2f} hrs'
-                axs[i].text(0.05, 0.95, label, ha='left', va='top', transform=axs[i].transAxes, fontsize=8,
-                            bbox=dict(facecolor='white', alpha=0.6))
-
-            # Remove any unused subplots
-            for j in range(i + 1, 4):
-                fig.delaxes(axs[j])
-
-            pdf.savefig(fig)
-            plt.close(fig)
-
-# Function to export hydrograph data to Excel with charts
-import pandas as pd
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_pdf import PdfPages
-import os
-import logging
+    logger = logging.getLogger(__name__)
+
+    # Work on plain arrays and reduce every column once instead of per subplot
+    values = data_slice.to_numpy()
+    time = data_slice.index.to_numpy()
+    has_data = len(time) > 0
+    if has_data:
+        peak_rows = values.argmax(axis=0)
+        col_max = values[peak_rows, np.arange(values.shape[1])]
+        col_idxmax = time[peak_rows]
+
+    for i, grid_id in enumerate(data_slice.columns):
+        if not has_data:
+            axs[i].text(0.5, 0.5, 'No Data Available', ha='center', va='center', fontsize=8)
+            axs[i].set_title(f'Grid ID {grid_id}', fontsize=8)
+            axs[i].axis('off')
+            logger.warning(f"No data available for Grid ID {grid_id}. Plot skipped.")
+            continue
+
+        # Find max discharge and its corresponding time
+        max_discharge = col_max[i]
+        max_time = col_idxmax[i]
+
+        # Plotting
+        axs[i].plot(time, values[:, i], label='Discharge', color='blue', linewidth=0.5)
+        axs[i].set_title(f'Grid ID {grid_id}', fontsize=8)
+        axs[i].set_xlabel('Time (hrs)', fontsize=6)
+        axs[i].set_ylabel('Flow (cfs)', fontsize=6)
+        axs[i].grid(True)
+
+        # Annotate with peak flow info
+        label = f'Peak: {max_discharge:.2f} cfs\nTime: {max_time:.2f} hrs'
+        axs[i].text(
+            0.05, 0.95, label, ha='left', va='top',
+            transform=axs[i].transAxes, fontsize=6,
+            bbox=dict(facecolor='white', alpha=0.6)
+        )
+
+        logger.debug(f"Plotted Grid ID {grid_id}: Max Discharge = {max_discharge}, Time of Peak = {max_time}")
+
+    # Remove any unused subplots
+    for j in range(len(data_slice.columns), len(axs)):
+        axs[j].axis('off')
+
+def _new_batch_figure():
+    fig, axs = plt.subplots(10, 10, figsize=(11, 8.5))  # Adjust subplot grid as needed
+    fig.subplots_adjust(hspace=0.5, wspace=0.3)
+    return fig, axs.flatten()
+
+def _render_batch(data_slice, output_path):
+    """
+    Renders one batch to its own single-page PDF. Runs in a worker process.
+    """
+    plt.switch_backend('Agg')
+    with plt.rc_context(PDF_PLOT_RC):
+        fig, axs = _new_batch_figure()
+        _draw_batch(axs, data_slice)
+        with PdfPages(output_path) as pdf:
+            pdf.savefig(fig, bbox_inches=None)
+    plt.close(fig)
+    return output_path
 
 def create_pdf_plots(hydrograph_data, output_pdf_path, batch_size=100):
     """
     Creates a PDF with multiple hydrograph plots. Plots are batched to handle large datasets efficiently.
+    When pypdf is installed, batches are rendered in worker processes and merged in order.
 
     Args:
         hydrograph_data (pd.DataFrame): DataFrame containing hydrograph data with time as index and grid IDs as columns.
@@ -77,55 +97,24 @@ def create_pdf_plots(hydrograph_data, output_pdf_path, batch_size=100):
     logger.info(f"Starting PDF plot creation: {output_pdf_path}")
     logger.info(f"Total Grid IDs to plot: {total_plots}. Batch size: {batch_size}. Total batches: {num_batches}.")
 
-    with PdfPages(output_pdf_path) as pdf:
-        for batch_num in range(num_batches):
-            fig, axs = plt.subplots(10, 10, figsize=(11, 8.5))  # Adjust subplot grid as needed
-            fig.subplots_adjust(hspace=0.5, wspace=0.3)
-            axs = axs.flatten()
-
-            start_idx = batch_num * batch_size
-            end_idx = min(start_idx + batch_size, total_plots)
-            current_batch = grid_ids[start_idx:end_idx]
-
-            for i, grid_id in enumerate(current_batch):
-                data = hydrograph_data[grid_id]
-                time = hydrograph_data.index
-
-                if data.empty:
-                    axs[i].text(0.5, 0.5, 'No Data Available', ha='center', va='center', fontsize=8)
-                    axs[i].set_title(f'Grid ID {grid_id}', fontsize=8)
-                    axs[i].axis('off')
-                    logger.warning(f"No data available for Grid ID {grid_id}. Plot skipped.")
-                    continue
-
-                # Find max discharge and its corresponding time
-                max_discharge = data.max()
-                max_time = data.idxmax()
-
-                # Plotting
-                axs[i].plot(time, data, label='Discharge', color='blue', linewidth=0.5)
-                axs[i].set_title(f'Grid ID {grid_id}', fontsize=8)
-                axs[i].set_xlabel('Time (hrs)', fontsize=6)
-                axs[i].set_ylabel('Flow (cfs)', fontsize=6)
-                axs[i].grid(True)
-
-                # Annotate with peak flow info
-                label = f'Peak: {max_discharge:.2f} cfs\nTime: {max_time:.2f} hrs'
-                axs[i].text(
-                    0.05, 0.95, label, ha='left', va='top',
-                    transform=axs[i].transAxes, fontsize=6,
-                    bbox=dict(facecolor='white', alpha=0.6)
-                )
-
-                logger.debug(f"Plotted Grid ID {grid_id}: Max Discharge = {max_discharge}, Time of Peak = {max_time}")
-
-            # Remove any unused subplots
-            for j in range(len(current_batch), len(axs)):
-                axs[j].axis('off')
-
-            pdf.savefig(fig)
-            plt.close(fig)
-            logger.info(f"Batch {batch_num + 1}/{num_batches} saved to PDF.")
+    # Workers only receive their own column slice of the table
+    batches = [hydrograph_data.iloc[:, start:start + batch_size] for start in range(0, total_plots, batch_size)]
+
+    if HAS_PYPDF and num_batches > 1:
+        render_pdf_pages(_render_batch, batches, output_pdf_path)
+        logger.info(f"All {num_batches} batches rendered and merged.")
+    else:
+        # One figure serves every page; its axes are cleared between batches
+        fig, axs = _new_batch_figure()
+        with plt.rc_context(PDF_PLOT_RC), PdfPages(output_pdf_path) as pdf:
+            for batch_num, data_slice in enumerate(batches):
+                if batch_num:
+                    for ax in axs:
+                        ax.cla()
+                _draw_batch(axs, data_slice)
+                pdf.savefig(fig, bbox_inches=None)
+                logger.info(f"Batch {batch_num + 1}/{num_batches} saved to PDF.")
+        plt.close(fig)
 
     logger.info(f"PDF plot creation completed: {output_pdf_path}")
 
@@ -146,19 +135,22 @@ def export_hydrograph_to_excel(hydrograph_data, output_excel_path, time_scale=10
     # Adjust time by the scaling factor
     adjusted_time = hydrograph_data.index * time_scale
 
-    # Create a Pandas Excel writer using XlsxWriter as the engine.
-    with pd.ExcelWriter(output_excel_path, engine='xlsxwriter') as writer:
-        # Consolidate all hydrographs into one sheet
-        all_data = pd.DataFrame({'Time': adjusted_time})
-        for grid_id in grid_ids:
-            all_data[f'Flow_{grid_id}'] = hydrograph_data[grid_id]
+    # Rows are flushed to disk as they are written instead of holding the whole workbook in memory
+    workbook = xlsxwriter.Workbook(output_excel_path, {'constant_memory': True})
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    try:
+        # Consolidate all hydrographs into one sheet: one rename instead of a column insert per grid ID
+        all_data = hydrograph_data.rename(columns=lambda grid_id: f'Flow_{grid_id}')
+        all_data.insert(0, 'Time', adjusted_time)
 
         # Write main data to the first sheet
-        all_data.to_excel(writer, sheet_name='Hydrographs', index=False)
+        write_sheet_rows(workbook, 'Hydrographs', all_data, header_format)
 
-        # Calculate max discharge and time of max discharge for each grid ID
-        max_discharge = hydrograph_data.max()
-        max_time = hydrograph_data.idxmax() * time_scale  # Scale time accordingly
+        # Calculate max discharge and time of max discharge (first peak) for each grid ID in one pass
+        values = hydrograph_data.to_numpy()
+        peak_rows = values.argmax(axis=0)
+        max_discharge = values[peak_rows, np.arange(values.shape[1])]
+        max_time = hydrograph_data.index.to_numpy()[peak_rows] * time_scale  # Scale time accordingly
 
         summary_data = pd.DataFrame({
             'Grid_ID': grid_ids,
@@ -167,7 +159,9 @@ def export_hydrograph_to_excel(hydrograph_data, output_excel_path, time_scale=10
         })
 
         # Write summary data to the second sheet
-        summary_data.to_excel(writer, sheet_name='Summary', index=False)
+        write_sheet_rows(workbook, 'Summary', summary_data, header_format)
+    finally:
+        workbook.close()
 
     logger.info(f"Excel export completed: {output_excel_path}")
 
@@ -5,14 +5,15 @@ import time
 class TimingLogger:
     def __init__(self, logger):
         self.logger = logger
-        self.start_time = time.time()
+        self.start_time = time.perf_counter()
         self.last_log_time = self.start_time
 
     def log(self, message):
-        current_time = time.time()
-        elapsed = current_time - self.last_log_time
-        total_elapsed = current_time - self.start_time
-        self.logger.info(f"{message} (Step time: {elapsed:.2f}s, Total time: {total_elapsed:.2f}s)")
+        # perf_counter is monotonic; the message is only formatted when INFO is actually emitted
+        current_time = time.perf_counter()
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("%s (Step time: %.2fs, Total time: %.2fs)",
+                             message, current_time - self.last_log_time, current_time - self.start_time)
         self.last_log_time = current_time
 
 def setup_logger(name='FLO2D_Postprocessor', level=logging.INFO, log_file=None):
@@ -1,6 +1,12 @@
 import os
+import re
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
+from modules.utilities import mapped_file
+
+# Rainfall distribution rows: "R <time (hours)> <percentage of total rainfall depth>"
+RAIN_ROW_PATTERN = re.compile(rb'^R[ \t]+(\S+)[ \t]+(\S+)', re.MULTILINE)
 
 def extract_variables(file_path):
     with open(file_path, 'r') as file:
@@ -20,19 +26,14 @@ def extract_variables(file_path):
     }
 
 def extract_time_series_data(file_path):
-    data = {
-        'Time (hours)': [],
-        'Percentage of Total Rainfall Depth (RTT)': []
-    }
-    
-    with open(file_path, 'r') as file:
-        for line in file:
-            if line.startswith('R'):
-                parts = line.strip().split()
-                data['Time (hours)'].append(float(parts[1]))
-                data['Percentage of Total Rainfall Depth (RTT)'].append(float(parts[2]))
+    # One scan finds the R rows; NumPy converts all their fields at once
+    with mapped_file(file_path) as buffer:
+        rows = np.array(RAIN_ROW_PATTERN.findall(buffer), dtype=bytes).reshape(-1, 2).astype(np.float64)
     
-    return pd.DataFrame(data)
+    return pd.DataFrame({
+        'Time (hours)': rows[:, 0],
+        'Percentage of Total Rainfall Depth (RTT)': rows[:, 1]
+    })
 
 def save_to_excel(df, variables, output_path):
     with pd.ExcelWriter(output_path) as writer:
@@ -60,7 +61,7 @@ def save_to_excel(df, variables, output_path):
         worksheet.insert_chart('D2', chart)
 
 def save_to_pdf(df, variables, output_path):
-    plt.figure(figsize=(8.5, 11))
+    fig = plt.figure(figsize=(8.5, 11))
     plt.plot(df['Time (hours)'], df['Percentage of Total Rainfall Depth (RTT)'], color='blue', label='Rainfall Percentage')
     plt.title('Cumulative Rainfall')
     plt.xlabel('Time (hours)')
@@ -68,7 +69,8 @@ def save_to_pdf(df, variables, output_path):
     label = f'Total Rainfall Depth: {variables["RTT"]} in.'
     plt.text(0.05, 0.95, label, ha='left', va='top', transform=plt.gca().transAxes, fontsize=10, bbox=dict(facecolor='white', alpha=0.6))
     plt.legend(loc='upper left')
-    plt.savefig(output_path)
+    plt.savefig(output_path, bbox_inches=None)
+    plt.close(fig)
 
 def rain_spreadsheet_and_plot(folder_path):
     rain_file_path = os.path.join(folder_path, 'RAIN.DAT')
@@ -3,11 +3,20 @@
 import numpy as np
 import pandas as pd
 import geopandas as gpd
-from shapely.geometry import Point, LineString
+import shapely
+import io
 import os
+import locale
 import logging
 import re
-from modules.utilities import time_function
+from modules.utilities import mapped_file, time_function
+
+# .inp files are decoded with the locale encoding, like a text-mode open(); bytes that do not decode
+# (e.g. a cp1252 comment read under UTF-8) are replaced rather than failing the whole extraction
+INP_ENCODING = locale.getpreferredencoding(False)
+
+# Section headers such as [JUNCTIONS], alone on their line
+SECTION_HEADER_PATTERN = re.compile(rb'^[ \t]*\[([^\]\r\n]*)\][ \t]*\r?$', re.MULTILINE)
 
 def extract_swmm_data(file_path, epsg):
     """
@@ -15,7 +24,7 @@ def extract_swmm_data(file_path, epsg):
 
     Parameters:
     - file_path: str, path to the SWMM .inp file.
-    - epsg: int, EPSG code for the coordinate reference system.
+    - epsg: int or pyproj.CRS, EPSG code or CRS for the coordinate reference system.
 
     Returns:
     - dict of GeoDataFrames for junctions, outfalls, and conduits.
@@ -25,166 +34,154 @@ def extract_swmm_data(file_path, epsg):
         'COORDINATES': [], 'LOSSES': [], 'INFLOWS': []
     }
 
-    current_section = None
-
-    with open(file_path, 'r') as file:
-        for line in file:
-            line = line.strip()
-            # Identify section headers
-            if line.startswith('[') and line.endswith(']'):
-                current_section = line[1:-1].upper()
-                continue
-            if not line or line.startswith(';'):  # Skip empty lines and comments
-                continue
+    with mapped_file(file_path) as buffer:
+        # One scan locates the section headers; each section runs to the next header (or the end of the file)
+        headers = list(SECTION_HEADER_PATTERN.finditer(buffer))
+        for header, next_header in zip(headers, headers[1:] + [None]):
+            section = header.group(1).decode(INP_ENCODING, errors='replace').upper()
             # Only extract data for relevant sections
-            if current_section in sections:
-                sections[current_section].append(line)
+            if section not in sections:
+                continue
+            end = next_header.start() if next_header else len(buffer)
+            for line in buffer[header.end():end].splitlines():
+                line = line.strip()
+                if line and not line.startswith(b';'):  # Skip empty lines and comments
+                    sections[section].append(line.decode(INP_ENCODING, errors='replace'))
+
+    # Node coordinates are parsed once and shared by every section that needs them
+    df_coords = process_coordinates(sections['COORDINATES'])
 
     results = {}
     if sections['JUNCTIONS']:
-        results['junctions'] = process_junctions(sections['JUNCTIONS'], sections['COORDINATES'], epsg)
+        results['junctions'] = process_junctions(sections['JUNCTIONS'], df_coords, epsg)
     if sections['OUTFALLS']:
-        results['outfalls'] = process_outfalls(sections['OUTFALLS'], sections['COORDINATES'], epsg)
+        results['outfalls'] = process_outfalls(sections['OUTFALLS'], df_coords, epsg)
     if sections['CONDUITS']:
-        results['conduits'] = process_conduits(sections['CONDUITS'], sections['XSECTIONS'], sections['COORDINATES'], epsg)
+        results['conduits'] = process_conduits(sections['CONDUITS'], sections['XSECTIONS'], df_coords, epsg)
 
     return results
 
-def process_junctions(junctions_data, coordinates_data, coord_system):
+def read_section_rows(lines, columns, text_columns=('Name',)):
     """
-    Processes the junctions data into a GeoDataFrame using the coordinates from the COORDINATES section.
+    Tokenizes whitespace-separated section lines with pandas' C parser into a DataFrame with the given columns.
+    Short rows are padded with missing values, extra fields and inline ';' comments are dropped,
+    and text_columns are kept as strings exactly as written.
+    """
+    if not lines:
+        return pd.DataFrame(columns=columns)
+    return pd.read_csv(io.StringIO('\n'.join(lines)), sep=r'\s+', header=None, names=columns,
+                       usecols=range(len(columns)), comment=';', engine='c',
+                       dtype={column: str for column in text_columns}, keep_default_na=False)
+
+def process_coordinates(coordinates_data):
+    """
+    Parses the COORDINATES section into a DataFrame of node names and numeric coordinates.
 
     Parameters:
-    - junctions_data: List of junction data lines.
     - coordinates_data: List of coordinates data lines.
-    - coord_system: EPSG code for the coordinate reference system.
 
     Returns:
-    - GeoDataFrame with junction points.
+    - DataFrame with 'Name', 'X_Coord' and 'Y_Coord' columns.
     """
-    columns = ['Name', 'Invert_Elevation', 'Max_Depth', 'Init_Depth', 'Surcharge_Depth', 'Ponded_Area']
-    junctions = []
+    coords_columns = ['Name', 'X_Coord', 'Y_Coord']
+    df_coords = read_section_rows(coordinates_data, coords_columns)
+    df_coords[['X_Coord', 'Y_Coord']] = df_coords[['X_Coord', 'Y_Coord']].apply(pd.to_numeric, errors='coerce')
 
-    for line in junctions_data:
-        parts = re.split(r'\s+', line.strip())
-        if len(parts) < len(columns):
-            parts += [None] * (len(columns) - len(parts))  # Pad missing values with None
-        junctions.append(parts[:len(columns)])
+    return df_coords
 
-    df_junctions = pd.DataFrame(junctions, columns=columns)
-    df_junctions = df_junctions.apply(pd.to_numeric, errors='ignore')
+def lookup_coordinates(df_coords, names):
+    """
+    Looks up node coordinates by name.
 
-    coords_columns = ['Name', 'X_Coord', 'Y_Coord']
-    coords = []
+    Parameters:
+    - df_coords: DataFrame of node coordinates from process_coordinates.
+    - names: Sequence of node names.
 
-    for line in coordinates_data:
-        parts = re.split(r'\s+', line.strip())
-        if len(parts) < len(coords_columns):
-            parts += [None] * (len(coords_columns) - len(parts))
-        coords.append(parts[:len(coords_columns)])
+    Returns:
+    - (n, 2) float array of X/Y coordinates; names without coordinates get NaN.
+    """
+    coords = df_coords.drop_duplicates('Name').set_index('Name')[['X_Coord', 'Y_Coord']]
+    return coords.reindex(names).to_numpy(dtype=np.float64)
 
-    df_coords = pd.DataFrame(coords, columns=coords_columns)
-    df_coords[['X_Coord', 'Y_Coord']] = df_coords[['X_Coord', 'Y_Coord']].apply(pd.to_numeric, errors='coerce')
+def process_junctions(junctions_data, df_coords, coord_system):
+    """
+    Processes the junctions data into a GeoDataFrame using the coordinates from the COORDINATES section.
 
-    df_merged = pd.merge(df_junctions, df_coords, on='Name', how='left')
-    geometry = [Point(xy) for xy in zip(df_merged['X_Coord'], df_merged['Y_Coord'])]
-    gdf = gpd.GeoDataFrame(df_merged, geometry=geometry, crs=f"EPSG:{coord_system}")
+    Parameters:
+    - junctions_data: List of junction data lines.
+    - df_coords: DataFrame of node coordinates from process_coordinates.
+    - coord_system: EPSG code or pyproj.CRS for the coordinate reference system.
+
+    Returns:
+    - GeoDataFrame with junction points.
+    """
+    columns = ['Name', 'Invert_Elevation', 'Max_Depth', 'Init_Depth', 'Surcharge_Depth', 'Ponded_Area']
+    df_junctions = read_section_rows(junctions_data, columns)
+    df_junctions[columns[1:]] = df_junctions[columns[1:]].apply(pd.to_numeric, errors='coerce')
+
+    xy = lookup_coordinates(df_coords, df_junctions['Name'])
+    df_junctions['X_Coord'] = xy[:, 0]
+    df_junctions['Y_Coord'] = xy[:, 1]
+    geometry = shapely.points(xy)
+    gdf = gpd.GeoDataFrame(df_junctions, geometry=geometry, crs=coord_system)
 
     return gdf
 
-def process_outfalls(outfalls_data, coordinates_data, coord_system):
+def process_outfalls(outfalls_data, df_coords, coord_system):
     """
     Processes the outfalls data into a GeoDataFrame using the coordinates from the COORDINATES section.
 
     Parameters:
     - outfalls_data: List of outfalls data lines.
-    - coordinates_data: List of coordinates data lines.
-    - coord_system: EPSG code for the coordinate reference system.
+    - df_coords: DataFrame of node coordinates from process_coordinates.
+    - coord_system: EPSG code or pyproj.CRS for the coordinate reference system.
 
     Returns:
     - GeoDataFrame with outfall points.
     """
     columns = ['Name', 'Invert_Elevation', 'Outfall_Type', 'Stage_Data', 'Tide_Gate']
-    outfalls = []
-
-    for line in outfalls_data:
-        parts = re.split(r'\s+', line.strip())
-        if len(parts) < len(columns):
-            parts += [None] * (len(columns) - len(parts))  # Pad missing values with None
-        outfalls.append(parts[:len(columns)])
-
-    df_outfalls = pd.DataFrame(outfalls, columns=columns)
-    df_outfalls = df_outfalls.apply(pd.to_numeric, errors='ignore')
-
-    coords_columns = ['Name', 'X_Coord', 'Y_Coord']
-    coords = []
-
-    for line in coordinates_data:
-        parts = re.split(r'\s+', line.strip())
-        if len(parts) < len(coords_columns):
-            parts += [None] * (len(coords_columns) - len(parts))
-        coords.append(parts[:len(coords_columns)])
-
-    df_coords = pd.DataFrame(coords, columns=coords_columns)
-    df_coords[['X_Coord', 'Y_Coord']] = df_coords[['X_Coord', 'Y_Coord']].apply(pd.to_numeric, errors='coerce')
+    df_outfalls = read_section_rows(outfalls_data, columns, text_columns=columns[:1] + columns[2:])
+    # Only the elevation is always numeric; the other fields depend on the outfall type
+    df_outfalls['Invert_Elevation'] = pd.to_numeric(df_outfalls['Invert_Elevation'], errors='coerce')
 
-    df_merged = pd.merge(df_outfalls, df_coords, on='Name', how='left')
-    geometry = [Point(xy) for xy in zip(df_merged['X_Coord'], df_merged['Y_Coord'])]
-    gdf = gpd.GeoDataFrame(df_merged, geometry=geometry, crs=f"EPSG:{coord_system}")
+    xy = lookup_coordinates(df_coords, df_outfalls['Name'])
+    df_outfalls['X_Coord'] = xy[:, 0]
+    df_outfalls['Y_Coord'] = xy[:, 1]
+    geometry = shapely.points(xy)
+    gdf = gpd.GeoDataFrame(df_outfalls, geometry=geometry, crs=coord_system)
 
     return gdf
 
-def process_conduits(conduits_data, xsections_data, coordinates_data, coord_system):
+def process_conduits(conduits_data, xsections_data, df_coords, coord_system):
     """
     Processes the conduits data into a GeoDataFrame using the coordinates from the COORDINATES section.
 
     Parameters:
     - conduits_data: List of conduits data lines.
     - xsections_data: List of cross-section data lines.
-    - coordinates_data: List of coordinates data lines.
-    - coord_system: EPSG code for the coordinate reference system.
+    - df_coords: DataFrame of node coordinates from process_coordinates.
+    - coord_system: EPSG code or pyproj.CRS for the coordinate reference system.
 
     Returns:
     - GeoDataFrame with conduit lines.
     """
     conduit_columns = ['Name', 'From_Node', 'To_Node', 'Length', 'Manning_N', 'Inlet_Offset', 'Outlet_Offset', 'Init_Flow', 'Max_Flow']
-    conduits = []
-
-    for line in conduits_data:
-        parts = re.split(r'\s+', line.strip())
-        if len(parts) < len(conduit_columns):
-            parts += [None] * (len(conduit_columns) - len(parts))  # Pad missing values with None
-        conduits.append(parts[:len(conduit_columns)])
-
-    df_conduits = pd.DataFrame(conduits, columns=conduit_columns)
-    df_conduits = df_conduits.apply(pd.to_numeric, errors='ignore')
-
-    coords_columns = ['Name', 'X_Coord', 'Y_Coord']
-    coords = []
-
-    for line in coordinates_data:
-        parts = re.split(r'\s+', line.strip())
-        if len(parts) < len(coords_columns):
-            parts += [None] * (len(coords_columns) - len(parts))
-        coords.append(parts[:len(coords_columns)])
-
-    df_coords = pd.DataFrame(coords, columns=coords_columns)
-    df_coords[['X_Coord', 'Y_Coord']] = df_coords[['X_Coord', 'Y_Coord']].apply(pd.to_numeric, errors='coerce')
+    df_conduits = read_section_rows(conduits_data, conduit_columns, text_columns=conduit_columns[:3])
+    df_conduits[conduit_columns[3:]] = df_conduits[conduit_columns[3:]].apply(pd.to_numeric, errors='coerce')
 
-    # Merge conduit start (From_Node) and end (To_Node) coordinates
-    df_merged_from = pd.merge(df_conduits, df_coords, left_on='From_Node', right_on='Name', how='left', suffixes=('', '_from'))
-    df_merged_to = pd.merge(df_merged_from.drop(columns=['Name']), df_coords, left_on='To_Node', right_on='Name', how='left', suffixes=('_from', '_to'))
+    # Look up conduit start (From_Node) and end (To_Node) coordinates
+    xy_from = lookup_coordinates(df_coords, df_conduits['From_Node'])
+    xy_to = lookup_coordinates(df_coords, df_conduits['To_Node'])
+    df_conduits['X_Coord_from'] = xy_from[:, 0]
+    df_conduits['Y_Coord_from'] = xy_from[:, 1]
+    df_conduits['X_Coord_to'] = xy_to[:, 0]
+    df_conduits['Y_Coord_to'] = xy_to[:, 1]
 
-    # Create LineString geometries for the conduits
-    geometry = [
-        LineString([
-            (row['X_Coord_from'], row['Y_Coord_from']),
-            (row['X_Coord_to'], row['Y_Coord_to'])
-        ]) for index, row in df_merged_to.iterrows()
-        if not pd.isna(row['X_Coord_from']) and not pd.isna(row['X_Coord_to'])
-    ]
+    # Create LineString geometries for every conduit whose end nodes both have coordinates
+    located = ~(np.isnan(xy_from).any(axis=1) | np.isnan(xy_to).any(axis=1))
+    geometry = shapely.linestrings(np.stack([xy_from[located], xy_to[located]], axis=1))
 
-    gdf = gpd.GeoDataFrame(df_merged_to, geometry=geometry, crs=f"EPSG:{coord_system}")
+    gdf = gpd.GeoDataFrame(df_conduits[located], geometry=geometry, crs=coord_system)
 
     return gdf
 
@@ -196,7 +193,7 @@ def save_geodataframe(gdf, output_path, layer_name, coord_system, output_format,
         gdf (GeoDataFrame): The GeoDataFrame to save.
         output_path (str): Base path to save the file.
         layer_name (str): Name of the layer/file.
-        coord_system (int): EPSG code for the coordinate system.
+        coord_system (int or pyproj.CRS): EPSG code or CRS for the coordinate system.
         output_format (str): "Shapefile" or "GeoPackage".
         logger (logging.Logger): Logger instance.
     
@@ -207,7 +204,7 @@ def save_geodataframe(gdf, output_path, layer_name, coord_system, output_format,
     if output_format == "Shapefile":
         output_file = os.path.join(output_path, f'{layer_name}.shp')
         try:
-            gdf.to_file(output_file, driver="ESRI Shapefile", crs=f"EPSG:{coord_system}")
+            gdf.to_file(output_file, driver="ESRI Shapefile", engine="pyogrio")
             logger.info(f"SWMM {layer_name.capitalize()} Shapefile created at: {output_file}")
         except Exception as e:
             logger.error(f"Failed to create Shapefile for {layer_name}: {str(e)}")
@@ -215,7 +212,7 @@ def save_geodataframe(gdf, output_path, layer_name, coord_system, output_format,
     elif output_format == "GeoPackage":
         output_file = os.path.join(output_path, f'swmm_{layer_name}.gpkg')
         try:
-            gdf.to_file(output_file, layer=layer_name, driver="GPKG", crs=f"EPSG:{coord_system}")
+            gdf.to_file(output_file, layer=layer_name, driver="GPKG", engine="pyogrio")
             logger.info(f"SWMM {layer_name.capitalize()} GeoPackage created at: {output_file}")
         except Exception as e:
             logger.error(f"Failed to create GeoPackage for {layer_name}: {str(e)}")
@@ -245,7 +242,7 @@ def create_swmm_shapefiles(swmm_data, output_path, output_format="Shapefile"):
     if 'junctions' in swmm_data:
         junctions_gdf = swmm_data['junctions']
         if not junctions_gdf.empty:
-            shp_path = save_geodataframe(junctions_gdf, output_path, 'junctions', junctions_gdf.crs.to_epsg(), output_format, logger)
+            shp_path = save_geodataframe(junctions_gdf, output_path, 'junctions', junctions_gdf.crs, output_format, logger)
             shapefile_paths.append(shp_path)
         else:
             logger.warning("No junctions data to save.")
@@ -253,7 +250,7 @@ def create_swmm_shapefiles(swmm_data, output_path, output_format="Shapefile"):
     if 'outfalls' in swmm_data:
         outfalls_gdf = swmm_data['outfalls']
         if not outfalls_gdf.empty:
-            shp_path = save_geodataframe(outfalls_gdf, output_path, 'outfalls', outfalls_gdf.crs.to_epsg(), output_format, logger)
+            shp_path = save_geodataframe(outfalls_gdf, output_path, 'outfalls', outfalls_gdf.crs, output_format, logger)
             shapefile_paths.append(shp_path)
         else:
             logger.warning("No outfalls data to save.")
@@ -261,7 +258,7 @@ def create_swmm_shapefiles(swmm_data, output_path, output_format="Shapefile"):
     if 'conduits' in swmm_data:
         conduits_gdf = swmm_data['conduits']
         if not conduits_gdf.empty:
-            shp_path = save_geodataframe(conduits_gdf, output_path, 'conduits', conduits_gdf.crs.to_epsg(), output_format, logger)
+            shp_path = save_geodataframe(conduits_gdf, output_path, 'conduits', conduits_gdf.crs, output_format, logger)
             shapefile_paths.append(shp_path)
         else:
             logger.warning("No conduits data to save.")
@@ -1,11 +1,15 @@
 import os
 import re
+import numpy as np
 import pandas as pd
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
-from openpyxl import Workbook
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.chart import LineChart, Reference
+import xlsxwriter
+from modules.utilities import HAS_PYPDF, mapped_file, render_pdf_pages, sanitize_sheet_name
+
+# Bytes patterns so they run directly on the memory-mapped SWMMQIN.OUT
+INLET_HEADER_PATTERN = re.compile(rb'STORM DRAIN INLET: +(.*)')
+DATA_ROW_PATTERN = re.compile(rb'^[ \t]*([\d\.]+)[ \t]+([\d\.]+)', re.MULTILINE)
 
 def extract_hydrograph_data(folder_path):
     """
@@ -18,68 +22,78 @@ def extract_hydrograph_data(folder_path):
     - dict: Dictionary of inlet data with inlet names as keys and DataFrames as values.
     """
     file_path = os.path.join(folder_path, 'SWMMQIN.OUT')
-    with open(file_path, 'r') as file:
-        file_content = file.readlines()
-    
-    inlets_data = {}
-    current_inlet = None
-    pattern_inlet = re.compile(r'STORM DRAIN INLET: +(.*)')
-    pattern_data = re.compile(r'^\s*([\d\.]+)\s+([\d\.]+)')
-    
-    for line in file_content:
-        inlet_match = pattern_inlet.search(line)
-        data_match = pattern_data.search(line)
-
-        if inlet_match:
-            current_inlet = inlet_match.group(1).strip()
-            inlets_data[current_inlet] = {'Time (hrs)': [], 'Discharge (cfs)': []}
-        
-        elif data_match and current_inlet:
-            time = float(data_match.group(1))
-            discharge = float(data_match.group(2))
-            inlets_data[current_inlet]['Time (hrs)'].append(time)
-            inlets_data[current_inlet]['Discharge (cfs)'].append(discharge)
-    
-    # Convert to DataFrame
-    inlet_dfs = {inlet: pd.DataFrame(data) for inlet, data in inlets_data.items()}
+    inlet_dfs = {}
+    with mapped_file(file_path) as buffer:
+        # Each inlet's rows run from its header line to the next header (or the end of the file)
+        headers = list(INLET_HEADER_PATTERN.finditer(buffer))
+        for header, next_header in zip(headers, headers[1:] + [None]):
+            end = next_header.start() if next_header else len(buffer)
+            rows = DATA_ROW_PATTERN.findall(buffer, header.end(), end)
+            # NumPy converts the inlet's matched fields in one call
+            values = np.array(rows, dtype=bytes).reshape(-1, 2).astype(np.float64)
+            inlet_dfs[header.group(1).strip().decode()] = pd.DataFrame(values, columns=['Time (hrs)', 'Discharge (cfs)'])
     return inlet_dfs
 
 
+def _draw_page(fig, axs, page_items):
+    """Draws up to four (inlet, time, discharge) hydrographs on one page and hides the unused axes."""
+    for i, (inlet, time, discharge) in enumerate(page_items):
+        axs[i].plot(time, discharge, label='Discharge', color='blue')
+        axs[i].set_title(f'Inlet {inlet}')
+        axs[i].set_xlabel('Time (hours)')
+        axs[i].set_ylabel('Discharge (cfs)')
+        axs[i].grid(True)
+
+        # Max discharge and its time (first peak) in one scan
+        peak_idx = discharge.argmax()
+        peak_discharge = discharge[peak_idx]
+        time_of_peak = time[peak_idx]
+        label = f'Peak Discharge: {peak_discharge:.2f} cfs\nTime of Peak: {time_of_peak:.2f} hrs'
+        axs[i].text(0.05, 0.95, label, ha='left', va='top', transform=axs[i].transAxes, fontsize=8,
+                    bbox=dict(facecolor='white', alpha=0.6))
+
+    # Hide unused subplots (kept on the figure so it can be reused for the next page)
+    for j in range(len(page_items), 4):
+        axs[j].set_axis_off()
+
+def _new_page_figure():
+    fig, axs = plt.subplots(2, 2, figsize=(8.5, 11))
+    fig.subplots_adjust(hspace=0.4, wspace=0.3)
+    return fig, axs.flatten()
+
+def _render_page(page_items, output_path):
+    """Renders one page to its own single-page PDF. Runs in a worker process."""
+    plt.switch_backend('Agg')
+    fig, axs = _new_page_figure()
+    _draw_page(fig, axs, page_items)
+    with PdfPages(output_path) as pdf:
+        pdf.savefig(fig)
+    plt.close(fig)
+    return output_path
+
 def create_pdf_plots(inlet_dfs, output_pdf_path):
-    with PdfPages(output_pdf_path) as pdf:
-        sections = list(inlet_dfs.keys())
-        num_pages = (len(sections) + 3) // 4
-
-        for page in range(num_pages):
-            fig, axs = plt.subplots(2, 2, figsize=(8.5, 11))
-            fig.subplots_adjust(hspace=0.4, wspace=0.3)
-            axs = axs.flatten()
-
-            for i in range(4):
-                idx = page * 4 + i
-                if idx >= len(sections):
-                    break
-                inlet = sections[idx]
-                df = inlet_dfs[inlet]
-                
-                axs[i].plot(df['Time (hrs)'], df['Discharge (cfs)'], label='Discharge', color='blue')
-                axs[i].set_title(f'Inlet {inlet}')
-                axs[i].set_xlabel('Time (hours)')
-                axs[i].set_ylabel('Discharge (cfs)')
-                axs[i].grid(True)
-
-                peak_discharge = df['Discharge (cfs)'].max()
-                time_of_peak = df['Time (hrs)'][df['Discharge (cfs)'].idxmax()]
-                label = f'Peak Discharge: {peak_discharge:.2f} cfs\nTime of Peak: {time_of_peak:.2f} hrs'
-                axs[i].text(0.05, 0.95, label, ha='left', va='top', transform=axs[i].transAxes, fontsize=8,
-                            bbox=dict(facecolor='white', alpha=0.6))
-
-            # Remove unused subplots
-            for j in range(i + 1, 4):
-                fig.delaxes(axs[j])
+    """
+    Creates a PDF with 4 inlet hydrographs per page.
+    When pypdf is installed, pages are rendered in worker processes and merged in order.
+    """
+    # Workers only receive each inlet's name and its two columns as arrays
+    items = [(inlet, df['Time (hrs)'].to_numpy(), df['Discharge (cfs)'].to_numpy()) for inlet, df in inlet_dfs.items()]
+    pages = [items[start:start + 4] for start in range(0, len(items), 4)]
 
+    if HAS_PYPDF and len(pages) > 1:
+        render_pdf_pages(_render_page, pages, output_pdf_path)
+        return
+
+    # One figure serves every page; its axes are cleared between pages
+    fig, axs = _new_page_figure()
+    with PdfPages(output_pdf_path) as pdf:
+        for page_num, page_items in enumerate(pages):
+            if page_num:
+                for ax in axs:
+                    ax.clear()
+            _draw_page(fig, axs, page_items)
             pdf.savefig(fig)
-            plt.close(fig)
+    plt.close(fig)
 
 
 def create_excel_with_plots(inlet_dfs, excel_path):
@@ -90,36 +104,45 @@ def create_excel_with_plots(inlet_dfs, excel_path):
     - inlet_dfs (dict): Dictionary of DataFrames containing hydrograph data.
     - excel_path (str): Path to save the Excel file.
     """
-    wb = Workbook()
-    wb.remove(wb.active)
-
-    for inlet, df in inlet_dfs.items():
-        # Add new sheet
-        ws = wb.create_sheet(title=inlet)
-
-        # Write DataFrame to the sheet
-        for r_idx, row in enumerate(dataframe_to_rows(df, index=False, header=True), 1):
-            for c_idx, value in enumerate(row, 1):
-                ws.cell(row=r_idx, column=c_idx, value=value)
-
-        # Create a Line Chart
-        chart = LineChart()
-        chart.title = f"{inlet}\nQp = {df['Discharge (cfs)'].max():.2f} cfs, Tp = {df['Time (hrs)'][df['Discharge (cfs)'].idxmax()]:.2f} hrs"
-        chart.x_axis.title = "Time (hours)"
-        chart.y_axis.title = "Discharge (cfs)"
-        
-        # Set the data for the chart (ignoring the header row)
-        data = Reference(ws, min_col=2, min_row=2, max_row=len(df) + 1)
-        time = Reference(ws, min_col=1, min_row=2, max_row=len(df) + 1)
-        chart.add_data(data, titles_from_data=False)
-        chart.set_categories(time)
-
-        # Add chart to sheet
-        ws.add_chart(chart, "E5")
-
-    wb.save(excel_path)
+    # Columns go straight to xlsxwriter instead of through openpyxl's per-cell objects
+    workbook = xlsxwriter.Workbook(excel_path)
+    sheet_names = set()
+    try:
+        for inlet, df in inlet_dfs.items():
+            # Add new sheet and write the DataFrame columns to it
+            time = df['Time (hrs)'].to_numpy()
+            discharge = df['Discharge (cfs)'].to_numpy()
+            sheet_name = sanitize_sheet_name(inlet, sheet_names)
+            worksheet = workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, list(df.columns))
+            worksheet.write_column(1, 0, time.tolist())
+            worksheet.write_column(1, 1, discharge.tolist())
+
+            # Create a Line Chart titled with the max discharge and its time (first peak)
+            peak_idx = discharge.argmax()
+            chart = workbook.add_chart({'type': 'line'})
+            chart.set_title({'name': f"{inlet}\nQp = {discharge[peak_idx]:.2f} cfs, Tp = {time[peak_idx]:.2f} hrs"})
+            chart.set_x_axis({'name': 'Time (hours)'})
+            chart.set_y_axis({'name': 'Discharge (cfs)'})
+
+            # Set the data for the chart (ignoring the header row)
+            chart.add_series({
+                'categories': [sheet_name, 1, 0, len(df), 0],
+                'values': [sheet_name, 1, 1, len(df), 1],
+            })
+
+            # Add chart to sheet
+            worksheet.insert_chart('E5', chart)
+    finally:
+        workbook.close()
 
 def swmm_inlet_spreadsheets_and_pdf(folder_path):
+    """
+    Extracts the SWMM inlet hydrographs and writes the PDF plots and the Excel workbook.
+
+    Returns:
+    - tuple: Paths to the generated PDF and Excel files.
+    """
     out_folder_path = os.path.join(folder_path, 'flo2d_plots')
     pdf_output_path = os.path.join(out_folder_path, 'swmm_inlet_hydrographs.pdf')
     excel_output_path = os.path.join(out_folder_path, 'swmm_inlet_hydrographs.xlsx')
@@ -127,12 +150,15 @@ def swmm_inlet_spreadsheets_and_pdf(folder_path):
     # Step 1: Extract hydrograph data from the SWMM output file
     inlet_data = extract_hydrograph_data(folder_path)
 
-    # Step 2: Create PDF plots with 4 plots per page
+    # Step 2: Create PDF plots with 4 plots per page; its page rendering process pool is started from
+    # this thread, so no other thread is running when the workers are forked
     create_pdf_plots(inlet_data, pdf_output_path)
 
     # Step 3: Create Excel file with hydrograph data and live plots
     create_excel_with_plots(inlet_data, excel_output_path)
 
+    return pdf_output_path, excel_output_path
+
 if __name__ == "__main__":
     # Example file paths (update these as necessary)
     input_file = "SWMMQIN.OUT"  # Update this path
@@ -1,4 +1,5 @@
 import os
+import numpy as np
 import pandas as pd
 from modules.utilities import time_function
 
@@ -20,27 +21,32 @@ def extract_swmm_rating_tables(file_path):
     try:
         with open(file_path, 'r') as file:
             for line in file:
-                parts = line.strip().split()
+                parts = line.split()
                 
                 if line.startswith('D') and len(parts) >= 3:
                     if current_table:
                         rating_tables.append(current_table)
-                    current_table = {"Table": parts[2], "Data": []}
+                    current_table = {"Table": parts[2], "StageList": [], "FlowList": []}
                 
                 elif line.startswith('N') and len(parts) == 3 and current_table:
                     try:
                         stage = float(parts[1])
                         discharge = float(parts[2])
-                        current_table["Data"].append({"Stage": stage, "Flow": discharge})
                     except ValueError:
                         print(f"Warning: Could not convert values to float: {parts}")
+                    else:
+                        current_table["StageList"].append(stage)
+                        current_table["FlowList"].append(discharge)
 
         if current_table:
             rating_tables.append(current_table)
 
-        # Convert data to pandas DataFrame
+        # Build each table's DataFrame once from its two columns
         for table in rating_tables:
-            table["Data"] = pd.DataFrame(table["Data"])
+            table["Data"] = pd.DataFrame({
+                "Stage": np.asarray(table.pop("StageList"), dtype=np.float64),
+                "Flow": np.asarray(table.pop("FlowList"), dtype=np.float64),
+            })
 
     except Exception as e:
         print(f"An error occurred while processing the file: {str(e)}")
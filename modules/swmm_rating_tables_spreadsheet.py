@@ -1,12 +1,17 @@
 import os
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_pdf import PdfPages
-from openpyxl import Workbook
-from openpyxl.chart import ScatterChart, Reference, Series
-from openpyxl.chart.marker import Marker
-from modules.utilities import time_function
+import xlsxwriter
+from modules.utilities import sanitize_sheet_name, time_function
 from modules.swmm_rating_tables_extraction import extract_swmm_rating_tables
 
+# Rating curve chart options shared by every table's sheet
+CHART_TYPE = {'type': 'scatter', 'subtype': 'smooth_with_markers'}
+CHART_X_AXIS = {'name': 'Flow (cfs)'}
+CHART_Y_AXIS = {'name': 'Stage (ft)'}
+SERIES_LINE = {'color': '#4472C4', 'width': 1.5}
+SERIES_MARKER = {'type': 'circle', 'size': 7, 'fill': {'color': '#4472C4'}, 'border': {'color': '#4472C4'}}
+
 @time_function
 def plot_rating_tables_to_pdf(rating_tables, pdf_filename):
     """
@@ -36,12 +41,11 @@ def plot_rating_tables_to_pdf(rating_tables, pdf_filename):
             # Move to next plot position
             plot_count += 1
             
-            # If we've filled the 2x2 grid, save the page and start a new one
+            # If we've filled the 2x2 grid, save the page and clear the axes for the next one
             if plot_count == num_plots_per_page:
                 pdf.savefig(fig)
-                plt.close(fig)
-                fig, axes = plt.subplots(2, 2, figsize=(8.5, 11))
-                fig.subplots_adjust(hspace=0.3, wspace=0.3)
+                for ax in axes.flat:
+                    ax.clear()
                 plot_count = 0
         
         # Save any remaining plots on the final page
@@ -49,7 +53,7 @@ def plot_rating_tables_to_pdf(rating_tables, pdf_filename):
             for remaining in range(plot_count, num_plots_per_page):
                 axes[remaining // 2, remaining % 2].axis('off')  # Turn off unused subplots
             pdf.savefig(fig)
-            plt.close(fig)
+        plt.close(fig)
 
 @time_function
 def create_rating_tables_spreadsheet(rating_tables, excel_filename):
@@ -61,46 +65,39 @@ def create_rating_tables_spreadsheet(rating_tables, excel_filename):
     rating_tables (list): A list of dictionaries containing table names and data.
     excel_filename (str): The output file path for the Excel spreadsheet.
     """
-    wb = Workbook()
-    wb.remove(wb.active)  # Remove the default sheet
-
-    for table in rating_tables:
-        table_name = table["Table"]
-        data = table["Data"]
-
-        # Create a new worksheet for each table
-        ws = wb.create_sheet(title=table_name)
-
-        # Write data to the worksheet
-        ws.append(["Stage (ft)", "Flow (cfs)"])
-        for _, row in data.iterrows():
-            ws.append([row["Stage"], row["Flow"]])
-
-        # Create a scatter plot
-        chart = ScatterChart()
-        chart.title = f"Rating Curve - {table_name}"
-        chart.x_axis.title = "Flow (cfs)"
-        chart.y_axis.title = "Stage (ft)"
-
-        # Define data ranges for the chart
-        x_values = Reference(ws, min_col=2, min_row=2, max_row=len(data) + 1)
-        y_values = Reference(ws, min_col=1, min_row=2, max_row=len(data) + 1)
-
-        # Create a single series for both line and points
-        series = Series(y_values, x_values, title="Stage vs Flow")
-        series.marker = Marker(symbol='circle', size=7)
-        series.marker.graphicalProperties.solidFill = "4472C4"  # Blue color
-        series.marker.graphicalProperties.line.solidFill = "4472C4"  # Blue outline
-        series.graphicalProperties.line.solidFill = "4472C4"  # Blue line
-        series.graphicalProperties.line.width = 20000  # Adjust line width (in EMUs)
-        series.smooth = True  # This creates a smoothed line
-        chart.series.append(series)
-
-        # Add the chart to the worksheet
-        ws.add_chart(chart, "D2")
-
-    # Save the workbook
-    wb.save(excel_filename)
+    # Columns and charts stream out through xlsxwriter instead of openpyxl's per-cell objects
+    workbook = xlsxwriter.Workbook(excel_filename)
+    header_format = workbook.add_format({'bold': True, 'border': 1, 'align': 'center', 'valign': 'top'})
+    sheet_names = set()
+    try:
+        for table in rating_tables:
+            table_name = table["Table"]
+            data = table["Data"]
+
+            # Create a new worksheet for each table and write its data
+            sheet_name = sanitize_sheet_name(table_name, sheet_names)
+            worksheet = workbook.add_worksheet(sheet_name)
+            worksheet.write_row(0, 0, ["Stage (ft)", "Flow (cfs)"], header_format)
+            worksheet.write_column(1, 0, data["Stage"].to_numpy().tolist())
+            worksheet.write_column(1, 1, data["Flow"].to_numpy().tolist())
+
+            # Create a smoothed scatter plot with a single series for both line and points
+            chart = workbook.add_chart(CHART_TYPE)
+            chart.add_series({
+                'name': 'Stage vs Flow',
+                'categories': [sheet_name, 1, 1, len(data), 1],
+                'values': [sheet_name, 1, 0, len(data), 0],
+                'line': SERIES_LINE,
+                'marker': SERIES_MARKER,
+            })
+            chart.set_title({'name': f"Rating Curve - {table_name}"})
+            chart.set_x_axis(CHART_X_AXIS)
+            chart.set_y_axis(CHART_Y_AXIS)
+
+            # Add the chart to the worksheet
+            worksheet.insert_chart('D2', chart)
+    finally:
+        workbook.close()
 
 @time_function
 def swmm_rating_tables_and_plots(file_path, rating_tables):
@@ -1,35 +1,40 @@
 import pandas as pd
+import numpy as np
+import re
+from contextlib import nullcontext
+from modules.utilities import mapped_file
 
-def extract_time_out_data(file_path):
+TIME_OUT_HEADER = b"FLOODPLAIN NODES    NUMBER OF TIMES EXCEEDED"
+
+# A table runs from the header line to the next line starting with "THE LAST"
+TABLE_END_PATTERN = re.compile(rb'^[ \t]*THE LAST', re.MULTILINE)
+
+# Data rows are exactly two integer fields: floodplain node (grid id) and number of times exceeded
+TIME_OUT_ROW_PATTERN = re.compile(rb'^[ \t]*(-?\d+)[ \t]+(-?\d+)[ \t]*\r?$', re.MULTILINE)
+
+def extract_time_out_data(file_path, content=None):
     """
     Extracts data from the TIME.OUT file.
 
     Args:
         file_path (str): Path to the TIME.OUT file.
+        content (bytes): File contents already read from file_path, if available.
 
     Returns:
         pandas.DataFrame: DataFrame containing the extracted data.
     """
-    grid_ids = []
-    num_time_decrements = []
-
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-        
-    extract_data = False
-    for line in lines:
-        if line.strip().startswith("FLOODPLAIN NODES    NUMBER OF TIMES EXCEEDED"):
-            extract_data = True
-            continue
-
-        if line.strip().startswith("THE LAST"):
-            extract_data = False
-            continue
-        
-        if extract_data and line.strip():
-            parts = line.split()
-            if len(parts) == 2:
-                grid_ids.append(int(parts[0]))
-                num_time_decrements.append(int(parts[1]))
+    rows = []
+    with (nullcontext(content) if content is not None else mapped_file(file_path)) as buffer:
+        # Rows are only read between each header line and the end of its table
+        header_pos = buffer.find(TIME_OUT_HEADER)
+        while header_pos >= 0:
+            data_start = buffer.find(b"\n", header_pos) + 1
+            if data_start == 0:
+                break
+            table_end = TABLE_END_PATTERN.search(buffer, data_start)
+            data_end = table_end.start() if table_end else len(buffer)
+            rows.extend(TIME_OUT_ROW_PATTERN.findall(buffer, data_start, data_end))
+            header_pos = buffer.find(TIME_OUT_HEADER, data_end)
 
-    return pd.DataFrame({'grid_id': grid_ids, 'num_time_decrements': num_time_decrements})
+    values = np.array(rows, dtype=bytes).reshape(-1, 2).astype(np.int64)
+    return pd.DataFrame({'grid_id': values[:, 0].astype(np.int32), 'num_time_decrements': values[:, 1]})
@@ -1,21 +1,116 @@
 # utilities.py
 
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
 from functools import wraps
+import mmap
+import re
+import tempfile
 import time
 import os
 
-# Decorator for timing functions
-def time_function(func):
+try:
+    import pypdf  # optional; enables rendering PDF pages in worker processes
+    HAS_PYPDF = True
+except ImportError:
+    HAS_PYPDF = False
+
+# Function timing is only reported when FLO2D_TIMING is set (checked once, at import)
+TIMING_ENABLED = bool(os.environ.get('FLO2D_TIMING'))
+
+def _timed(func):
     @wraps(func)
     def wrapper(*args, **kwargs):
-        start_time = time.time()
+        start_time = time.perf_counter()
         result = func(*args, **kwargs)
-        end_time = time.time()
+        end_time = time.perf_counter()
         print(f"Finished {func.__name__!r} in {end_time - start_time:.3f} seconds")
         return result
     return wrapper
 
+# Decorator for timing functions; returns the function unchanged when timing is disabled
+def time_function(func):
+    return _timed(func) if TIMING_ENABLED else func
+
+# Matplotlib settings for PDF plot writers: long hydrographs and rating curves drop vertices
+# within a pixel of the drawn line, and Agg splits very long paths into chunks
+PDF_PLOT_RC = {
+    'path.simplify': True,
+    'path.simplify_threshold': 1.0,
+    'agg.path.chunksize': 10000,
+}
+
+# Most worker processes render_pdf_pages starts; folder worker processes lower it with set_pdf_pool_size
+PDF_POOL_SIZE = os.cpu_count() or 1
+
+# Process pool initializer: folders processed in parallel share the CPUs, so the PDF pools of all
+# folder_workers processes together stay at about the CPU count
+def set_pdf_pool_size(folder_workers):
+    global PDF_POOL_SIZE
+    PDF_POOL_SIZE = max(1, (os.cpu_count() or 1) // folder_workers)
+
+# Render each page to its own single-page PDF with render_page(page, path) in worker processes,
+# then merge them into output_pdf_path in page order (requires pypdf, see HAS_PYPDF)
+def render_pdf_pages(render_page, pages, output_pdf_path):
+    with tempfile.TemporaryDirectory() as tmpdir:
+        paths = [os.path.join(tmpdir, f'page_{page_num:05d}.pdf') for page_num in range(len(pages))]
+        with ProcessPoolExecutor(max_workers=min(PDF_POOL_SIZE, len(pages))) as executor:
+            list(executor.map(render_page, pages, paths))
+
+        writer = pypdf.PdfWriter()
+        for path in paths:
+            writer.append(path)
+        with open(output_pdf_path, 'wb') as output:
+            writer.write(output)
+
 # Create folders for shapefile, raster and spreadsheet outputs
 def create_required_folders(folders):
     for folder in folders:
         os.makedirs(folder, exist_ok=True)
+
+# Buffer size for line-oriented reads of large FLO-2D text files; fewer, larger reads than the 8 KiB default
+READ_BUFFER_SIZE = 1 << 20
+
+# Read a text file's lines, or split bytes that were already read (e.g. prefetched) the same way
+def read_text_lines(file_path, content=None):
+    if content is None:
+        with open(file_path, 'r', buffering=READ_BUFFER_SIZE) as file:
+            return file.readlines()
+    return content.decode().splitlines(keepends=True)
+
+# Memory-map a file read-only so it can be scanned as bytes without copying it into a Python string
+@contextmanager
+def mapped_file(file_path):
+    with open(file_path, 'rb') as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            yield b''  # Empty files cannot be mapped
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield mapped
+
+# Excel worksheet names are at most 31 characters; []:*?/\ are not allowed in them
+MAX_SHEET_NAME_LENGTH = 31
+INVALID_SHEET_NAME_CHARS = re.compile(r'[\[\]:*?/\\]')
+
+# Turn a structure, inlet or table name into a valid worksheet name not yet in used_names (lower-cased names)
+def sanitize_sheet_name(name, used_names):
+    # Names may not start or end with an apostrophe, and 'History' is reserved by Excel
+    base = INVALID_SHEET_NAME_CHARS.sub('_', str(name))[:MAX_SHEET_NAME_LENGTH].strip("'") or 'Sheet'
+    sheet_name = base
+    suffix = 1
+    while sheet_name.lower() in used_names or sheet_name.lower() == 'history':
+        suffix += 1
+        tag = f"_{suffix}"
+        sheet_name = base[:MAX_SHEET_NAME_LENGTH - len(tag)] + tag
+    used_names.add(sheet_name.lower())
+    return sheet_name
+
+# Write a DataFrame (without its index) to a new xlsxwriter worksheet; works with constant_memory workbooks
+def write_sheet_rows(workbook, sheet_name, df, header_format):
+    # constant_memory only keeps the current row, so cells must be written row by row (to_excel writes by column)
+    worksheet = workbook.add_worksheet(sheet_name)
+    worksheet.write_row(0, 0, [str(column) for column in df.columns], header_format)
+    values = df.astype(object).where(df.notna(), None)  # NaN becomes an empty cell, as with to_excel
+    for row_idx, row in enumerate(values.itertuples(index=False, name=None), start=1):
+        worksheet.write_row(row_idx, 0, row)
+    return worksheet
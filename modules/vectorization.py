@@ -1,7 +1,3 @@
-import dask.dataframe as dd
-import geopandas as gpd
-import dask_geopandas as dgpd
-
 def convert_gdf_to_shapefile(geo_df, output_path, coord_system):
     """
     Convert a GeoDataFrame to a shapefile with only grid_id and flow_direction fields.
@@ -18,14 +14,7 @@ def convert_gdf_to_shapefile(geo_df, output_path, coord_system):
     # Select only grid_id and flow_direction columns
     geo_df = geo_df[['grid_id', 'flow_direction', 'geometry']]
 
-    # Convert to Dask GeoDataFrame for parallel processing
-    npartitions = 10  # Adjust the number of partitions based on your data size and available memory
-    dask_geo_df = dgpd.from_geopandas(geo_df, npartitions=npartitions)
-
-    # Compute the Dask GeoDataFrame to get a GeoDataFrame
-    computed_df = dask_geo_df.compute()
-
-    # Write to file
-    computed_df.to_file(output_path, driver='ESRI Shapefile')
+    # Write to file through GDAL's bulk write path
+    geo_df.to_file(output_path, driver='ESRI Shapefile', engine='pyogrio')
 
-    return computed_df
+    return geo_df
@@ -0,0 +1,31 @@
+import math
+
+from modules.hycross_extraction import extract_max_wse
+
+def hydrograph(rows):
+    return b''.join(b'  %.2f  1.00  2.00  %.2f\n' % row for row in rows)
+
+def test_max_wse_per_end_row():
+    content = b' TIME  DISCHARGE  FLOW AREA  WS ELEV\n' + hydrograph([
+        (1.0, 7.0),    # End row before any section has no maximum
+        (0.0, 10.0),   # Section 1
+        (0.5, 12.0),
+        (1.0, 11.0),   # End row: the end row's own WSE is not counted
+        (0.5, 30.0),   # Trailing row after the end; must not reach section 2
+        (0.0, 20.0),   # Section 2
+        (1.0, 5.0),
+        (0.5, 25.0),
+        (1.0, 3.0),    # Second end row in the same section includes the row before it
+        (0.0, 50.0),   # Section without an end row reports nothing
+    ])
+
+    wse_max = extract_max_wse(content, 0.0, 1.0)
+
+    assert len(wse_max) == 4
+    assert math.isnan(wse_max[0])
+    assert wse_max[1:] == [12.0, 20.0, 25.0]
+
+def test_max_wse_without_time_range():
+    content = hydrograph([(0.0, 10.0), (0.0, 12.0)])
+    assert extract_max_wse(content, 0.0, 0.0) == []
+    assert extract_max_wse(content, None, None) == []
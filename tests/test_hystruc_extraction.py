@@ -0,0 +1,42 @@
+import pandas as pd
+
+from modules.hystruc_extraction import extract_hystruc_results
+
+HYSTRUC_DAT = (
+    "S  CULV1 1 0 10 20 0 100.5 50 3\n"
+    "F 1 2 0.02 0.5 1\n"
+    "T 0 0\n"
+    "T 1.5 20\n"
+    "S WEIR2\n"
+    "T 0.0 0.0\n"
+    "T 2.0 35.5\n"
+)
+
+HYDROSTRUCT_OUT = (
+    " THE MAXIMUM DISCHARGE FOR: CULV1 IS:     20.00 CFS AT TIME:      1.50\n"
+    " THE MAXIMUM DISCHARGE FOR: WEIR2 IS:     35.50 CFS AT TIME:      2.00\n"
+)
+
+def write_project(tmp_path):
+    (tmp_path / "HYSTRUC.DAT").write_text(HYSTRUC_DAT)
+    (tmp_path / "HYDROSTRUCT.OUT").write_text(HYDROSTRUCT_OUT)
+    return str(tmp_path)
+
+def test_short_structure_record_starts_its_own_rating_curve(tmp_path):
+    df, rating_curves = extract_hystruc_results(write_project(tmp_path))
+
+    assert [curve["Structure"] for curve in rating_curves] == ["CULV1", "WEIR2"]
+    assert rating_curves[0]["Data"].values.tolist() == [[0.0, 0.0], [1.5, 20.0]]
+    assert rating_curves[1]["Data"].values.tolist() == [[0.0, 0.0], [2.0, 35.5]]
+
+    weir = df.set_index("Structure Name").loc["WEIR2"]
+    assert pd.isna(weir["CDIAMETER"])
+    assert weir["Qpeak_cfs"] == 35.5
+
+def test_full_structure_record_fields(tmp_path):
+    df, _ = extract_hystruc_results(write_project(tmp_path))
+
+    culvert = df.set_index("Structure Name").loc["CULV1"]
+    assert culvert["Inflow Node"] == 10
+    assert culvert["HEADREFEL"] == 100.5
+    assert culvert["CUBASE"] == 1.0
@@ -0,0 +1,26 @@
+from modules.swmm_extraction import extract_swmm_data
+
+SWMM_INP = (
+    b"[TITLE]\r\n"
+    b"Caf\xe9 drainage model\r\n"
+    b"\r\n"
+    b"[JUNCTIONS]\r\n"
+    b";;Name Elevation MaxDepth InitDepth SurDepth Aponded\r\n"
+    b"J1 100.0 5.0 0 0 0 ;inlet at the caf\xe9\r\n"
+    b"J2 98.5 4.0 0 0 0\r\n"
+    b"\r\n"
+    b"[COORDINATES]\r\n"
+    b"J1 1000.0 2000.0\r\n"
+    b"J2 1010.0 2010.0\r\n"
+)
+
+def test_non_utf8_bytes_do_not_fail_extraction(tmp_path):
+    inp_file = tmp_path / "SWMM.INP"
+    inp_file.write_bytes(SWMM_INP)
+
+    results = extract_swmm_data(str(inp_file), 2224)
+
+    junctions = results['junctions']
+    assert junctions['Name'].tolist() == ['J1', 'J2']
+    assert junctions['Invert_Elevation'].tolist() == [100.0, 98.5]
+    assert junctions['X_Coord'].tolist() == [1000.0, 1010.0]
@@ -0,0 +1,28 @@
+from modules.utilities import MAX_SHEET_NAME_LENGTH, sanitize_sheet_name
+
+def test_sheet_name_invalid_characters_are_replaced():
+    assert sanitize_sheet_name("CULV[1]:A*B?C/D\\E", set()) == "CULV_1__A_B_C_D_E"
+
+def test_sheet_name_is_truncated():
+    name = sanitize_sheet_name("X" * 40, set())
+    assert name == "X" * MAX_SHEET_NAME_LENGTH
+
+def test_sheet_names_are_deduplicated_case_insensitively():
+    used_names = set()
+    long_name = "STRUCTURE_WITH_A_VERY_LONG_NAME_1"
+    names = [
+        sanitize_sheet_name("Weir", used_names),
+        sanitize_sheet_name("WEIR", used_names),
+        sanitize_sheet_name(long_name, used_names),
+        sanitize_sheet_name(long_name, used_names),
+    ]
+    assert names[:2] == ["Weir", "WEIR_2"]
+    assert names[2] == long_name[:MAX_SHEET_NAME_LENGTH]
+    assert names[3] == long_name[:MAX_SHEET_NAME_LENGTH - 2] + "_2"
+    assert all(len(name) <= MAX_SHEET_NAME_LENGTH for name in names)
+
+def test_sheet_name_edge_cases():
+    used_names = set()
+    assert sanitize_sheet_name("'quoted'", used_names) == "quoted"
+    assert sanitize_sheet_name("", used_names) == "Sheet"
+    assert sanitize_sheet_name("History", used_names) == "History_2"